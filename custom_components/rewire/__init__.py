@@ -1,27 +1,95 @@
 """RewIRe integration."""
 import logging
 
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryError
+from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN, PLATFORMS
+from .code_store import async_get_code_store
+from .codes import collect_codes, inline_codes, normalize_codes, strip_codes
+from .const import CONF_PROFILE, DOMAIN, PLATFORMS
 from .coordinator import RewireCoordinator
+from .feedback import async_track_feedback
+from .migration import migrate_legacy_config
+from .profiles import async_get_profiles, async_prune_codes
+from .services import async_setup_services
+from .timing import async_get_timing
 
 _LOGGER = logging.getLogger(__name__)
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the RewIRe services, the learned send timing, the IR codes and the device profiles."""
+    async_setup_services(hass)
+    await async_get_timing(hass).async_load()
+    await async_get_code_store(hass).async_load()
+    await async_get_profiles(hass).async_load()
+    return True
+
+
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Migrate an entry from an older version."""
+    if entry.version > 3:
+        # Downgraded from a future version
+        return False
+
+    if entry.version < 3:
+        data = migrate_legacy_config(dict(entry.data), hass.config.units.temperature_unit)
+        # Data and version in one update; Home Assistant saves the entries of one startup together
+        hass.config_entries.async_update_entry(entry, data=data, version=3)
+        _LOGGER.debug("Migrated RewIRe entry %s to version 3", entry.entry_id)
+
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up RewIRe from a config entry."""
     hass.data.setdefault(DOMAIN, {})
 
+    # Codes are checked once here; sends use the stored canonical strings as they are
+    store = async_get_code_store(hass)
+    try:
+        data = normalize_codes(inline_codes(dict(entry.data), store.get))
+    except vol.Invalid as err:
+        path = ".".join(str(part) for part in err.path)
+        raise ConfigEntryError(f"Invalid IR code in {path}: {err.msg}") from err
+
+    # Inline codes (new entries, entries from older versions) move to the code store; the entry keeps their hashes
+    await store.async_add(collect_codes(data))
+    if (stripped := strip_codes(data)) != entry.data:
+        hass.config_entries.async_update_entry(entry, data=stripped)
+
+    device_profile = None
+    if (profile_id := data.get(CONF_PROFILE)) is not None:
+        # Entries of one profile share its resolved actions and their parsed form
+        profiles = async_get_profiles(hass)
+        try:
+            profile = profiles.resolve(profile_id)
+            device_profile = profiles.device_profile(profile_id)
+        except vol.Invalid as err:
+            raise ConfigEntryError(f"Invalid IR code in profile {profile_id}: {err.msg}") from err
+        if profile is None:
+            raise ConfigEntryError(f"Unknown device profile {profile_id}")
+        data = {**data, **profile}
+
     _LOGGER.debug("Setting up RewIRe entry %s with data: %s", entry.entry_id, entry.data)
-    coordinator = RewireCoordinator(hass, entry)
+    # Codes, ranges and entity layout are parsed once, here, for all platforms
+    coordinator = RewireCoordinator(hass, entry, data, device_profile)
     await coordinator.async_config_entry_first_refresh()
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+    entry.async_on_unload(coordinator.async_attach_blasters())
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    entry.async_on_unload(async_track_feedback(hass, coordinator))
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
     return True
 
 
@@ -31,3 +99,13 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.data[DOMAIN].pop(entry.entry_id)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the IR codes no other entry or profile uses."""
+    await async_prune_codes(hass, entry.entry_id)
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
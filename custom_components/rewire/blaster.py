@@ -0,0 +1,570 @@
+"""Shared IR blaster dispatch for RewIRe."""
+import asyncio
+import copy
+import logging
+import random
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any, NamedTuple, Optional
+
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.core import CALLBACK_TYPE, Context, Event, HomeAssistant, callback
+from homeassistant.exceptions import ServiceNotFound
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import async_call_later, async_track_state_change_event
+
+from .const import (
+    CALIBRATION_TIMEOUT_FACTOR,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+    CONF_BLASTER_ACTION,
+    CONF_COMMAND_TIMEOUT,
+    CONF_RETRY_ATTEMPTS,
+    CONF_RETRY_BACKOFF,
+    DATA_BLASTERS,
+    DEFAULT_BLASTER_LATENCY,
+    DEFAULT_COMMAND_TIMEOUT,
+    DEFAULT_RETRY_ATTEMPTS,
+    DEFAULT_RETRY_BACKOFF,
+    EVENT_COMMAND_FAILED,
+    LATENCY_EWMA_ALPHA,
+)
+from .timing import async_get_timing, latency_profile
+from .trace import CommandSpan
+from .transport import Transport
+
+_LOGGER = logging.getLogger(__name__)
+
+# Errors that will not go away by sending again
+PERMANENT_ERRORS = (ServiceNotFound, vol.Invalid)
+
+
+class RetryPolicy:
+    """Retry settings for the commands of one config entry."""
+
+    __slots__ = ("attempts", "backoff", "timeout")
+
+    def __init__(self, attempts: int, backoff: float, timeout: float) -> None:
+        """Initialize the policy."""
+        self.attempts = max(0, int(attempts))
+        self.backoff = max(0.0, float(backoff))
+        self.timeout = max(0.1, float(timeout))
+
+    @classmethod
+    def from_entry(cls, entry: ConfigEntry) -> "RetryPolicy":
+        """Build the policy from the entry options."""
+        options = entry.options
+        return cls(
+            options.get(CONF_RETRY_ATTEMPTS, DEFAULT_RETRY_ATTEMPTS),
+            options.get(CONF_RETRY_BACKOFF, DEFAULT_RETRY_BACKOFF),
+            options.get(CONF_COMMAND_TIMEOUT, DEFAULT_COMMAND_TIMEOUT),
+        )
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Return the jittered delay before retry number `attempt` (1-based)."""
+        # Exponential backoff with "full jitter"
+        return random.uniform(0, self.backoff * (2 ** (attempt - 1)))
+
+
+def blaster_key(data: Mapping[str, Any]) -> str:
+    """Return the key identifying the physical blaster of an entry."""
+    if device_id := data.get("blaster_device_id"):
+        return device_id
+
+    # Older entries have no device; fall back to the targets of the actions
+    targets = []
+    for action in data.get(CONF_BLASTER_ACTION, []):
+        target = action.get("target") or action.get("data") or {}
+        targets.append(str(target.get("entity_id") or target.get("device_id") or action.get("service")))
+    return "|".join(sorted(targets)) or "default"
+
+
+def _blaster_entity_ids(hass: HomeAssistant, data: Mapping[str, Any]) -> set[str]:
+    """Return the entities whose state reflects the health of the blaster."""
+    entity_ids: set[str] = set()
+    if device_id := data.get("blaster_device_id"):
+        registry = er.async_get(hass)
+        entity_ids.update(entry.entity_id for entry in er.async_entries_for_device(registry, device_id))
+
+    for action in data.get(CONF_BLASTER_ACTION, []):
+        target = action.get("target") or {}
+        entity_id = target.get("entity_id")
+        if isinstance(entity_id, str):
+            entity_ids.add(entity_id)
+        elif isinstance(entity_id, list):
+            entity_ids.update(entity_id)
+    return entity_ids
+
+
+def retarget_actions(
+    hass: HomeAssistant, actions: list[dict[str, Any]], device_id: str
+) -> Optional[list[dict[str, Any]]]:
+    """Return the blaster actions pointed at another blaster device, or None if they can't be.
+
+    Device targets are swapped for the other device; entity targets for its
+    entity of the same domain (e.g. its remote or text entity). Actions
+    without such a target (an MQTT topic, a script) would still reach the
+    primary blaster, so they can't be retargeted.
+    """
+    entries = er.async_entries_for_device(er.async_get(hass), device_id)
+    retargeted = []
+    for action in actions:
+        action = copy.deepcopy(action)
+        target = action.get("target")
+        if isinstance(target, dict) and "device_id" in target:
+            target["device_id"] = device_id
+        elif isinstance(target, dict) and isinstance(target.get("entity_id"), str):
+            domain = target["entity_id"].split(".", 1)[0]
+            if not (matches := [entry.entity_id for entry in entries if entry.domain == domain]):
+                return None
+            target["entity_id"] = matches[0]
+        else:
+            return None
+        retargeted.append(action)
+    return retargeted
+
+
+def async_get_blaster(hass: HomeAssistant, entry: ConfigEntry) -> "RewireBlaster":
+    """Return the blaster shared by every entry that targets the same device."""
+    return async_get_blaster_by_key(hass, blaster_key(entry.data))
+
+
+def async_get_blaster_by_key(hass: HomeAssistant, key: str) -> "RewireBlaster":
+    """Return the blaster with the given key, creating it on first use."""
+    blasters: dict[str, RewireBlaster] = hass.data.setdefault(DATA_BLASTERS, {})
+    if (blaster := blasters.get(key)) is None:
+        blaster = blasters[key] = RewireBlaster(hass, key)
+    return blaster
+
+
+class BlasterRoute(NamedTuple):
+    """A blaster of an entry's pool and the transports that reach it."""
+
+    blaster: "RewireBlaster"
+    transports: list[Transport]
+
+
+class RewireBlaster:
+    """Serializes and dispatches IR commands for one physical blaster.
+
+    Also tracks the health of the blaster: its entities going unavailable park
+    commands until it is back, and repeated failures open a circuit breaker
+    that fails commands fast until a trial command gets through.
+    """
+
+    def __init__(self, hass: HomeAssistant, key: str) -> None:
+        """Initialize the blaster."""
+        self.hass = hass
+        self.key = key
+        # asyncio.Lock wakes waiters in FIFO order, so commands (and their
+        # retries) leave the blaster in the order they were issued
+        self._lock = asyncio.Lock()
+
+        self._entries: dict[str, CALLBACK_TYPE] = {}
+        self._tracked: dict[str, set[str]] = {}
+        self._unsub_state: Optional[CALLBACK_TYPE] = None
+        self._unsub_reset: Optional[CALLBACK_TYPE] = None
+
+        self._online = asyncio.Event()
+        self._online.set()
+        self._failures = 0
+        self._circuit_open = False
+        self._timing = async_get_timing(hass)
+        # Loop time at which the last frame left the blaster
+        self._last_frame = 0.0
+        # Commands queued or in flight, and a moving average of the round trip
+        self._pending = 0
+        profile = self._timing.latency(key)
+        self._latency = profile["p50_ms"] / 1000 if profile and profile.get("p50_ms") else DEFAULT_BLASTER_LATENCY
+        # Broadcast group -> (code, sender entry id, result) of its last transmission
+        self._broadcasts: dict[str, tuple[str, Optional[str], asyncio.Future[bool]]] = {}
+
+    @property
+    def available(self) -> bool:
+        """Return True if commands can currently be sent."""
+        return self._online.is_set() and not self._circuit_open
+
+    @property
+    def cost(self) -> float:
+        """Return the expected wait for a new command: queued commands times the typical round trip."""
+        return (self._pending + 1) * self._latency
+
+    @callback
+    def async_attach(
+        self, entry: ConfigEntry, update_callback: CALLBACK_TYPE, data: Optional[Mapping[str, Any]] = None
+    ) -> CALLBACK_TYPE:
+        """Attach an entry; `update_callback` runs whenever availability changes.
+
+        `data` replaces the entry data for blasters the entry uses as a backup.
+        """
+        self._entries[entry.entry_id] = update_callback
+        self._tracked[entry.entry_id] = _blaster_entity_ids(self.hass, entry.data if data is None else data)
+        self._async_track_states()
+
+        @callback
+        def detach() -> None:
+            self._entries.pop(entry.entry_id, None)
+            self._tracked.pop(entry.entry_id, None)
+            if self._entries:
+                self._async_track_states()
+                return
+            self._async_shutdown()
+
+        return detach
+
+    @callback
+    def _async_track_states(self) -> None:
+        """(Re)subscribe to state changes of the blaster entities."""
+        if self._unsub_state:
+            self._unsub_state()
+            self._unsub_state = None
+
+        entity_ids = set().union(*self._tracked.values())
+        if entity_ids:
+            self._unsub_state = async_track_state_change_event(self.hass, entity_ids, self._async_state_changed)
+        self._async_update_online()
+
+    @callback
+    def _async_shutdown(self) -> None:
+        """Release listeners once no entry uses this blaster."""
+        if self._unsub_state:
+            self._unsub_state()
+            self._unsub_state = None
+        if self._unsub_reset:
+            self._unsub_reset()
+            self._unsub_reset = None
+        self.hass.data.get(DATA_BLASTERS, {}).pop(self.key, None)
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        """Handle a state change of a blaster entity."""
+        self._async_update_online()
+
+    @callback
+    def _async_update_online(self) -> None:
+        """Derive blaster availability from the state of its entities."""
+        states = [self.hass.states.get(entity_id) for entity_id in set().union(*self._tracked.values())]
+        # Entities that have not been loaded yet don't count against the blaster
+        known = [state for state in states if state is not None]
+        online = not known or any(state.state != STATE_UNAVAILABLE for state in known)
+
+        if online == self._online.is_set():
+            return
+        if online:
+            _LOGGER.info("Blaster %s is available again", self.key)
+            self._online.set()
+        else:
+            _LOGGER.warning("Blaster %s became unavailable", self.key)
+            self._online.clear()
+        self._async_notify()
+
+    @callback
+    def _async_notify(self) -> None:
+        """Notify attached entries of an availability change."""
+        for update_callback in list(self._entries.values()):
+            update_callback()
+
+    @callback
+    def _async_record_result(self, success: bool) -> None:
+        """Update the circuit breaker with the outcome of a command."""
+        if success:
+            self._failures = 0
+            if self._unsub_reset:
+                self._unsub_reset()
+                self._unsub_reset = None
+            if self._circuit_open:
+                self._circuit_open = False
+                self._async_notify()
+            return
+
+        self._failures += 1
+        # While half-open a single failure is enough to open the breaker again
+        if self._failures < CIRCUIT_FAILURE_THRESHOLD:
+            return
+
+        _LOGGER.warning("Circuit for blaster %s opened after %s failed commands", self.key, self._failures)
+        self._circuit_open = True
+        if self._unsub_reset:
+            self._unsub_reset()
+        self._unsub_reset = async_call_later(self.hass, CIRCUIT_RESET_TIMEOUT, self._async_half_open)
+        self._async_notify()
+
+    @callback
+    def _async_half_open(self, _now: datetime) -> None:
+        """Let a trial command through once the reset timeout has passed."""
+        self._unsub_reset = None
+        self._circuit_open = False
+        self._async_notify()
+
+    @callback
+    def _async_fail_fast(self, span: CommandSpan, reason: str) -> bool:
+        """Reject a command without touching the blaster."""
+        _LOGGER.debug("Rejecting %s for blaster %s: %s", span.trace_id, self.key, reason)
+        self.hass.bus.async_fire(
+            EVENT_COMMAND_FAILED,
+            {
+                "trace_id": span.trace_id,
+                "entity_id": span.entity_id,
+                "blaster": self.key,
+                "attempts": 0,
+                "error": reason,
+            },
+        )
+        return False
+
+    async def async_send(
+        self,
+        transports: list[Transport],
+        code: str,
+        *,
+        span: CommandSpan,
+        policy: RetryPolicy,
+        repeats: int = 1,
+        delay: float = 0.0,
+        context: Optional[Context] = None,
+        group: Optional[str] = None,
+        sender: Optional[str] = None,
+        quorum: Optional[int] = None,
+    ) -> bool:
+        """Send a code through the transports of an entry, retrying transient failures.
+
+        Entries in the same broadcast `group` share transmissions: the same code
+        sent by another member (`sender`) while it is still in flight is not sent
+        again and its result is shared. Repeats of one member are always sent,
+        as a toggle code sent twice is meant to flip the device twice. With a
+        `quorum` (mirror mode) all transports are dispatched at once and the
+        command succeeds when at least that many deliver it; otherwise they run
+        in order and every one must succeed. Returns False if the code could not
+        be delivered before the deadline.
+        """
+        if group is None:
+            return await self._async_send_command(transports, code, span, policy, repeats, delay, context, quorum)
+
+        if (last := self._broadcasts.get(group)) is not None:
+            last_code, last_sender, result = last
+            if last_code == code and last_sender != sender and not result.done():
+                _LOGGER.debug("Merging %s into the %s broadcast on %s", span.trace_id, group, self.key)
+                return await asyncio.shield(result)
+
+        result = asyncio.get_running_loop().create_future()
+        self._broadcasts[group] = (code, sender, result)
+        success = False
+        try:
+            success = await self._async_send_command(transports, code, span, policy, repeats, delay, context, quorum)
+        finally:
+            result.set_result(success)
+        return success
+
+    async def _async_send_command(
+        self,
+        transports: list[Transport],
+        code: str,
+        span: CommandSpan,
+        policy: RetryPolicy,
+        repeats: int,
+        delay: float,
+        context: Optional[Context],
+        quorum: Optional[int],
+    ) -> bool:
+        """Send a single command, waiting for the blaster and its lock."""
+        self._pending += 1
+        try:
+            return await self._async_send_queued(transports, code, span, policy, repeats, delay, context, quorum)
+        finally:
+            self._pending -= 1
+
+    async def _async_send_queued(
+        self,
+        transports: list[Transport],
+        code: str,
+        span: CommandSpan,
+        policy: RetryPolicy,
+        repeats: int,
+        delay: float,
+        context: Optional[Context],
+        quorum: Optional[int],
+    ) -> bool:
+        """Send a single command once it is counted as pending."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._command_timeout(policy)
+
+        if self._circuit_open:
+            return self._async_fail_fast(span, "circuit open")
+
+        if not self._online.is_set():
+            # Park the command until the blaster comes back, within its deadline
+            try:
+                async with asyncio.timeout_at(deadline):
+                    await self._online.wait()
+            except TimeoutError:
+                return self._async_fail_fast(span, "blaster unavailable")
+
+        async with self._lock:
+            # Commands queued behind the one that opened the breaker fail fast too
+            if self._circuit_open:
+                return self._async_fail_fast(span, "circuit open")
+
+            success = await self._async_send_locked(
+                transports, code, span, policy, deadline, repeats, delay, context, quorum
+            )
+            self._async_record_result(success)
+            return success
+
+    def _command_timeout(self, policy: RetryPolicy) -> float:
+        """Return the command deadline, stretched for blasters calibrated as slow."""
+        if (profile := self._timing.latency(self.key)) is None or not profile.get("p95_ms"):
+            return policy.timeout
+        per_attempt = profile["p95_ms"] / 1000 * CALIBRATION_TIMEOUT_FACTOR
+        return max(policy.timeout, per_attempt * (policy.attempts + 1))
+
+    async def async_calibrate(
+        self,
+        transports: list[Transport],
+        code: str,
+        count: int,
+        policy: RetryPolicy,
+        context: Optional[Context] = None,
+    ) -> dict[str, Any]:
+        """Send a code `count` times and store the round-trip latency profile."""
+        loop = asyncio.get_running_loop()
+        samples: list[float] = []
+        failures = 0
+        async with self._lock:
+            gap = self._timing.frame_gap(self.key)
+            for _ in range(count):
+                if (wait := self._last_frame + gap - loop.time()) > 0:
+                    await asyncio.sleep(wait)
+                start = loop.time()
+                try:
+                    async with asyncio.timeout(policy.timeout):
+                        for transport in transports:
+                            await transport.async_send(code, context)
+                except Exception as err:  # pylint: disable=broad-except
+                    failures += 1
+                    _LOGGER.debug("Calibration probe on %s failed: %s", self.key, err)
+                else:
+                    samples.append(loop.time() - start)
+                self._last_frame = loop.time()
+
+        profile = latency_profile(samples, failures)
+        _LOGGER.info("Calibrated blaster %s: %s", self.key, profile)
+        self._timing.async_set_latency(self.key, profile)
+        self._async_notify()
+        return profile
+
+    async def _async_send_locked(
+        self,
+        transports: list[Transport],
+        code: str,
+        span: CommandSpan,
+        policy: RetryPolicy,
+        deadline: float,
+        repeats: int,
+        delay: float,
+        context: Optional[Context],
+        quorum: Optional[int],
+    ) -> bool:
+        """Send all repeats of a command while holding the blaster lock."""
+        loop = asyncio.get_running_loop()
+        gap = self._timing.frame_gap(self.key)
+        for i in range(repeats):
+            if quorum is not None:
+                spacing = max(gap, delay) if i > 0 else gap
+                if (wait := self._last_frame + spacing - loop.time()) > 0:
+                    await asyncio.sleep(wait)
+                success = await self._async_mirror(transports, code, span, policy, deadline, context, quorum)
+                self._last_frame = loop.time()
+                if not success:
+                    return False
+                continue
+
+            for transport in transports:
+                # Keep the learned minimum gap between frames (and the requested delay between repeats)
+                spacing = max(gap, delay) if i > 0 else gap
+                if (wait := self._last_frame + spacing - loop.time()) > 0:
+                    await asyncio.sleep(wait)
+                success = await self._async_run_action(transport, code, span, policy, deadline, context)
+                self._last_frame = loop.time()
+                if not success:
+                    return False
+        return True
+
+    async def _async_mirror(
+        self,
+        transports: list[Transport],
+        code: str,
+        span: CommandSpan,
+        policy: RetryPolicy,
+        deadline: float,
+        context: Optional[Context],
+        quorum: int,
+    ) -> bool:
+        """Dispatch a code through all transports at once, sharing the deadline."""
+        results = await asyncio.gather(
+            *(self._async_run_action(transport, code, span, policy, deadline, context) for transport in transports)
+        )
+        delivered = sum(results)
+        needed = min(quorum, len(transports))
+        if delivered < len(transports):
+            _LOGGER.log(
+                logging.WARNING if delivered < needed else logging.DEBUG,
+                "Mirrored %s reached %s of %s targets on %s (quorum %s)",
+                span.trace_id,
+                delivered,
+                len(transports),
+                self.key,
+                needed,
+            )
+        return delivered >= needed
+
+    async def _async_run_action(
+        self,
+        transport: Transport,
+        code: str,
+        span: CommandSpan,
+        policy: RetryPolicy,
+        deadline: float,
+        context: Optional[Context],
+    ) -> bool:
+        """Run a single blaster action with retries."""
+        loop = asyncio.get_running_loop()
+        tries = 0
+        while True:
+            tries += 1
+            span.mark_dispatched()
+            start = loop.time()
+            try:
+                async with asyncio.timeout_at(deadline):
+                    await transport.async_send(code, context)
+                self._latency += LATENCY_EWMA_ALPHA * (loop.time() - start - self._latency)
+                self._timing.async_record_frame(self.key, True)
+                return True
+            except PERMANENT_ERRORS as err:
+                error: BaseException = err
+                break
+            except Exception as err:  # pylint: disable=broad-except
+                # Transport errors and timeouts say nothing about lost frames: the gap is left alone
+                error = err
+
+            if tries > policy.attempts:
+                break
+            wait = policy.backoff_delay(tries)
+            if loop.time() + wait >= deadline:
+                break
+            _LOGGER.debug("Retrying %s on %s in %.2fs (retry %s): %s", span.trace_id, self.key, wait, tries, error)
+            await asyncio.sleep(wait)
+
+        _LOGGER.error("Failed to send %s via %s: %s", span.trace_id, transport.describe(), error)
+        self.hass.bus.async_fire(
+            EVENT_COMMAND_FAILED,
+            {
+                "trace_id": span.trace_id,
+                "entity_id": span.entity_id,
+                "blaster": self.key,
+                "attempts": tries,
+                "error": str(error) or type(error).__name__,
+            },
+        )
+        return False
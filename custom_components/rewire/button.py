@@ -1,24 +1,22 @@
-import copy
+import asyncio
 import logging
-from typing import Any
+from typing import Any, Mapping, Optional
 
 from homeassistant.components.button import ButtonEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers import script
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import (
-    ACTION_TYPE_BUTTON,
     CONF_ACTION_CODE,
     CONF_ACTION_NAME,
-    CONF_ACTION_TYPE,
-    CONF_ACTIONS,
-    CONF_BLASTER_ACTION,
+    CONF_MACRO_STEPS,
     DOMAIN,
 )
 from .coordinator import RewireCoordinator
-from .entity import RewireEntity
+from .entity import RewireEntity, device_command
+from .macro import compile_macro
+from .trace import traced_command
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -30,12 +28,14 @@ async def async_setup_entry(
 ) -> None:
     """Set up button entity."""
     coordinator: RewireCoordinator = hass.data[DOMAIN][config_entry.entry_id]
-    actions = config_entry.data.get(CONF_ACTIONS, [])
+    profile = coordinator.device_profile
 
-    entities = []
-    for action in actions:
-        if action.get(CONF_ACTION_TYPE) == ACTION_TYPE_BUTTON:
-            entities.append(RewireButton(coordinator, config_entry.entry_id, action))
+    entities: list[ButtonEntity] = [
+        RewireButton(coordinator, config_entry.entry_id, action) for action in profile.buttons
+    ]
+    entities.extend(
+        RewireMacroButton(coordinator, config_entry.entry_id, action, plan) for action, plan in profile.macros
+    )
 
     async_add_entities(entities)
 
@@ -43,7 +43,7 @@ async def async_setup_entry(
 class RewireButton(RewireEntity, ButtonEntity):
     """Button representation of a stateless button."""
 
-    def __init__(self, coordinator: RewireCoordinator, entry_id: str, action: dict[str, Any]) -> None:
+    def __init__(self, coordinator: RewireCoordinator, entry_id: str, action: Mapping[str, Any]) -> None:
         """Initialize the button."""
         super().__init__(coordinator, entry_id)
         self._action_name = action[CONF_ACTION_NAME]
@@ -53,74 +53,58 @@ class RewireButton(RewireEntity, ButtonEntity):
         self._attr_name = f"{coordinator.config_entry.data.get('name')} {self._action_name}"
         self._attr_unique_id = f"{DOMAIN}_{entry_id}_{self._action_name.lower().replace(' ', '_')}"
 
-        # Load blaster config (now a list of actions from ActionSelector)
-        self._blaster_actions = coordinator.config_entry.data.get(CONF_BLASTER_ACTION, [])
-
+    @device_command
     async def async_press(self) -> None:
         """Handle the button press."""
-        _LOGGER.debug("Button pressed: %s. Blaster actions: %s", self.name, self._blaster_actions)
         if not self._blaster_actions:
             _LOGGER.error("No blaster actions configured")
             return
 
-        actions = copy.deepcopy(self._blaster_actions)
-
-        def inject_code(obj: Any) -> None:
-            """Recursively inject IR code into action data."""
-            if isinstance(obj, dict):
-                for key, value in obj.items():
-                    if key in ("command", "code", "value", "payload") and value == "IR_CODE":
-                        obj[key] = [self._action_code] if key == "command" else self._action_code
-                        _LOGGER.debug("Injected IR code into %s: %s", key, obj[key])
-                    elif isinstance(value, (dict, list)):
-                        inject_code(value)
-            elif isinstance(obj, list):
-                for item in obj:
-                    inject_code(item)
-
-        inject_code(actions)
-
-        _LOGGER.debug("Blaster actions to execute after injection: %s", actions)
-
-        # Execute actions
-        for action in actions:
-            # Handle Service Call (preferred for new config flow)
-            if "service" in action:
-                try:
-                    domain, service_name = action["service"].split(".", 1)
-                    target = action.get("target")
-                    data = action.get("data")
-
-                    _LOGGER.debug(
-                        "Calling service %s.%s with data %s and target %s",
-                        domain,
-                        service_name,
-                        data,
-                        target,
-                    )
-
-                    await self.hass.services.async_call(
-                        domain,
-                        service_name,
-                        service_data=data,
-                        target=target,
-                        context=self._context,
-                        blocking=True,
-                    )
-                except Exception as err:
-                    _LOGGER.error("Failed to execute service call %s: %s", action["service"], err)
-
-            # Fallback for Device Actions or other script syntax (Old Config)
-            else:
-                try:
-                    # Wrap single action in list for script
-                    script_obj = script.Script(
-                        self.hass,
-                        [action],
-                        self.name,
-                        DOMAIN,
-                    )
-                    await script_obj.async_run(context=self._context)
-                except Exception as err:
-                    _LOGGER.error("Failed to execute script action %s: %s", action, err)
-            _LOGGER.debug("Executed blaster actions for %s", self._action_name)
+        await self._send_code(self._action_code)
+
+    @callback
+    def async_start_press_hold(self, interval: float, max_duration: float) -> None:
+        """Keep sending the code until stopped."""
+
+        @traced_command
+        async def hold() -> bool:
+            return await self._send_code(self._action_code)
+
+        self.async_start_hold(hold, interval, max_duration)
+
+
+class RewireMacroButton(RewireEntity, ButtonEntity):
+    """Button that plays a timed sequence of IR codes."""
+
+    def __init__(
+        self,
+        coordinator: RewireCoordinator,
+        entry_id: str,
+        action: Mapping[str, Any],
+        plan: Optional[tuple[tuple[float, str], ...]] = None,
+    ) -> None:
+        """Initialize the macro button, with its steps compiled by the device profile if given."""
+        super().__init__(coordinator, entry_id)
+        self._action_name = action[CONF_ACTION_NAME]
+        # Compiled once; every press replays the same plan
+        self._plan = compile_macro(action[CONF_MACRO_STEPS]) if plan is None else plan
+
+        self._attr_name = f"{coordinator.config_entry.data.get('name')} {self._action_name}"
+        self._attr_unique_id = f"{DOMAIN}_{entry_id}_{self._action_name.lower().replace(' ', '_')}"
+
+    @device_command
+    async def async_press(self) -> None:
+        """Play the macro."""
+        if not self._blaster_actions:
+            _LOGGER.error("No blaster actions configured")
+            return
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for offset, code in self._plan:
+            # Deadline-based: each code is due at a fixed offset from the start
+            if (wait := start + offset - loop.time()) > 0:
+                await asyncio.sleep(wait)
+            if not await self._send_code(code):
+                _LOGGER.warning("Macro %s aborted, code could not be sent", self.name)
+                return
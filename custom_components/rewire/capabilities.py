@@ -0,0 +1,152 @@
+"""Capability index of blaster devices for the RewIRe config flow.
+
+Picking how to send codes through a blaster means scanning the entity registry
+for its entities and the service registry for the services of their domains.
+The result is cached per device, so onboarding many devices on one blaster (or
+re-rendering the form) scans once. Registry updates and service
+(un)registration drop the affected devices from the cache.
+"""
+import logging
+from typing import NamedTuple
+
+from homeassistant.const import EVENT_SERVICE_REGISTERED, EVENT_SERVICE_REMOVED
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+
+from .const import DATA_CAPABILITIES
+
+_LOGGER = logging.getLogger(__name__)
+
+# Entity domains whose set_value service sends a code
+TEXT_DOMAINS = ("text", "input_text")
+
+# Send services with a direct transport (see transport.py), by the transport they need
+SEND_SERVICES = {
+    "remote.send_command": "remote",
+    "text.set_value": "text",
+    "input_text.set_value": "text",
+    "mqtt.publish": "mqtt",
+}
+
+# Used when no service of the device's domains is registered
+FALLBACK_SEND_SERVICE = "remote.send_command"
+
+
+class BlasterCapabilities(NamedTuple):
+    """What a blaster device can send IR codes with."""
+
+    # Entity domains and integrations of the device; their services are candidates
+    domains: frozenset[str]
+    # Direct transports the device has a target for
+    transports: frozenset[str]
+    # (entity_id, label) of its text entities
+    text_entities: tuple[tuple[str, str], ...]
+    # Candidate send services, the most likely first
+    send_services: tuple[str, ...]
+
+    def options(self) -> list[dict[str, str]]:
+        """Return the select options of the blaster action step: text entities if any, else the send services."""
+        if self.text_entities:
+            return [{"label": label, "value": entity_id} for entity_id, label in self.text_entities]
+        return [{"label": service, "value": service} for service in self.send_services]
+
+
+def _service_rank(service: str, transports: frozenset[str]) -> tuple[int, str]:
+    """Return the sort key of a candidate send service."""
+    if (transport := SEND_SERVICES.get(service)) is not None and transport in transports:
+        return (0, service)
+    if "send" in service.split(".", 1)[1]:
+        return (1, service)
+    if transport is not None:
+        return (2, service)
+    return (3, service)
+
+
+@callback
+def async_get_capability_index(hass: HomeAssistant) -> "BlasterCapabilityIndex":
+    """Return the capability index shared by all config flows."""
+    if (index := hass.data.get(DATA_CAPABILITIES)) is None:
+        index = hass.data[DATA_CAPABILITIES] = BlasterCapabilityIndex(hass)
+    return index
+
+
+class BlasterCapabilityIndex:
+    """Capabilities of blaster devices by device id, scanned on first use."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize an empty index that follows registry and service changes."""
+        self.hass = hass
+        self._devices: dict[str, BlasterCapabilities] = {}
+        hass.bus.async_listen(er.EVENT_ENTITY_REGISTRY_UPDATED, self._async_entity_registry_updated)
+        hass.bus.async_listen(dr.EVENT_DEVICE_REGISTRY_UPDATED, self._async_device_registry_updated)
+        hass.bus.async_listen(EVENT_SERVICE_REGISTERED, self._async_services_changed)
+        hass.bus.async_listen(EVENT_SERVICE_REMOVED, self._async_services_changed)
+
+    @callback
+    def async_get(self, device_id: str) -> BlasterCapabilities:
+        """Return the capabilities of a device."""
+        if (capabilities := self._devices.get(device_id)) is None:
+            capabilities = self._devices[device_id] = self._async_scan(device_id)
+        return capabilities
+
+    @callback
+    def _async_scan(self, device_id: str) -> BlasterCapabilities:
+        """Scan the entities of a device and the services of their domains."""
+        entries = er.async_entries_for_device(er.async_get(self.hass), device_id)
+        entity_domains = {entry.domain for entry in entries}
+        domains = frozenset(entity_domains | {entry.platform for entry in entries} | {"remote"})
+
+        transports = set()
+        if "remote" in entity_domains:
+            transports.add("remote")
+        if entity_domains.intersection(TEXT_DOMAINS):
+            transports.add("text")
+        if "mqtt" in domains:
+            transports.add("mqtt")
+
+        text_entities = sorted(
+            (
+                (entry.entity_id, f"{entry.original_name or entry.name or entry.entity_id} ({entry.entity_id})")
+                for entry in entries
+                if entry.domain in TEXT_DOMAINS
+            ),
+            key=lambda item: item[1],
+        )
+
+        services = [
+            f"{domain}.{service}"
+            for domain in domains
+            for service in self.hass.services.async_services_for_domain(domain)
+        ] or [FALLBACK_SEND_SERVICE]
+        frozen_transports = frozenset(transports)
+        services.sort(key=lambda service: _service_rank(service, frozen_transports))
+
+        _LOGGER.debug("Blaster %s can send through %s", device_id, sorted(transports) or "services only")
+        return BlasterCapabilities(domains, frozen_transports, tuple(text_entities), tuple(services))
+
+    @callback
+    def _async_entity_registry_updated(self, event: Event) -> None:
+        """Drop the devices an added, changed or removed entity belongs (or belonged) to."""
+        if event.data["action"] == "remove":
+            # The entity is gone, and with it the device it belonged to
+            self._devices.clear()
+            return
+        device_ids = {event.data.get("changes", {}).get("device_id")}
+        if (entry := er.async_get(self.hass).async_get(event.data["entity_id"])) is not None:
+            device_ids.add(entry.device_id)
+        for device_id in device_ids:
+            if device_id is not None:
+                self._devices.pop(device_id, None)
+
+    @callback
+    def _async_device_registry_updated(self, event: Event) -> None:
+        """Drop a changed or removed device."""
+        self._devices.pop(event.data["device_id"], None)
+
+    @callback
+    def _async_services_changed(self, event: Event) -> None:
+        """Drop the devices that have the domain of a registered or removed service."""
+        domain = event.data["domain"]
+        for device_id in [device_id for device_id, caps in self._devices.items() if domain in caps.domains]:
+            del self._devices[device_id]
@@ -0,0 +1,97 @@
+"""Content-addressed storage of the IR codes of all RewIRe entries.
+
+Config entries keep only the hashes of their codes (see codes.py). The codes
+themselves live in one `.storage` file, which is loaded in a single read when
+the integration starts, so long Broadlink and raw-timing codes do not bloat
+`core.config_entries`. Codes shared by several entries are stored once, and
+long codes are stored zlib-compressed.
+"""
+import base64
+import logging
+import zlib
+from typing import Any, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import CODE_COMPRESS_MIN_LENGTH, CODE_STORAGE_KEY, CODE_STORAGE_VERSION, DATA_CODES
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _compress(code: str) -> Optional[str]:
+    """Return the compressed form of a code, or None if compressing does not make it shorter."""
+    compressed = base64.b64encode(zlib.compress(code.encode(), 9)).decode()
+    return compressed if len(compressed) < len(code) else None
+
+
+def _decompress(compressed: str) -> str:
+    """Return a code from its compressed form."""
+    return zlib.decompress(base64.b64decode(compressed)).decode()
+
+
+@callback
+def async_get_code_store(hass: HomeAssistant) -> "CodeStore":
+    """Return the code store shared by all entries."""
+    if (store := hass.data.get(DATA_CODES)) is None:
+        store = hass.data[DATA_CODES] = CodeStore(hass)
+    return store
+
+
+class CodeStore:
+    """IR codes by content hash."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize an empty store until the stored codes are loaded."""
+        self._store: Store[dict[str, Any]] = Store(hass, CODE_STORAGE_VERSION, CODE_STORAGE_KEY)
+        self._codes: dict[str, str] = {}
+        self._loaded = False
+
+    async def async_load(self) -> None:
+        """Load all codes."""
+        if self._loaded:
+            return
+        self._loaded = True
+        if (data := await self._store.async_load()) is None:
+            return
+        self._codes.update(data.get("codes", {}))
+        for digest, compressed in data.get("compressed", {}).items():
+            self._codes[digest] = _decompress(compressed)
+
+    def get(self, digest: str) -> Optional[str]:
+        """Return the code with a hash, if stored."""
+        return self._codes.get(digest)
+
+    async def async_add(self, codes: dict[str, str]) -> None:
+        """Store codes by hash, and wait until they are on disk.
+
+        Entries drop their inline codes only after this returns, so a crash in
+        between cannot lose a code.
+        """
+        await self.async_load()
+        if all(digest in self._codes for digest in codes):
+            return
+        self._codes.update(codes)
+        await self._store.async_save(self._data_to_save())
+
+    async def async_prune(self, used: set[str]) -> None:
+        """Remove the codes no entry refers to anymore."""
+        await self.async_load()
+        if not (unused := set(self._codes) - used):
+            return
+        _LOGGER.debug("Removing %s unused IR codes", len(unused))
+        for digest in unused:
+            del self._codes[digest]
+        await self._store.async_save(self._data_to_save())
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to store."""
+        codes: dict[str, str] = {}
+        compressed: dict[str, str] = {}
+        for digest, code in self._codes.items():
+            if len(code) >= CODE_COMPRESS_MIN_LENGTH and (packed := _compress(code)) is not None:
+                compressed[digest] = packed
+            else:
+                codes[digest] = code
+        return {"codes": codes, "compressed": compressed}
@@ -0,0 +1,172 @@
+"""IR code normalization for RewIRe.
+
+Codes are checked and brought into one canonical form when they are
+configured, so a malformed code is reported in the config flow instead of
+failing a send, and the blaster gets exactly the stored string on every send.
+Accepted are Broadlink base64 codes (with or without the `b64:` prefix), Pronto
+hex, raw timings and the names of codes learned by the blaster.
+"""
+import base64
+import binascii
+import hashlib
+import re
+from typing import Any, Callable, Optional
+
+import voluptuous as vol
+
+from .const import CODE_FIELDS, CONF_ACTIONS, CONF_CODE_HASHES, CONF_MACRO_STEPS
+
+BASE64_PREFIX = "b64:"
+
+_BASE64 = re.compile(r"[A-Za-z0-9+/]+={0,2}")
+_PRONTO_WORD = re.compile(r"[0-9A-Fa-f]{4}")
+_RAW_TIMING = re.compile(r"[+-]?\d+")
+# Control characters other than whitespace: payloads and names may span lines
+_CONTROL = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+
+
+def _normalize_base64(code: str) -> str:
+    """Return a base64 code without whitespace and with its padding, or raise vol.Invalid."""
+    code = "".join(code.split())
+    code += "=" * (-len(code) % 4)
+    try:
+        payload = base64.b64decode(code, validate=True)
+    except binascii.Error as err:
+        raise vol.Invalid(f"Invalid base64 IR code: {err}") from err
+    if not payload:
+        raise vol.Invalid("Empty base64 IR code")
+    return base64.b64encode(payload).decode()
+
+
+def _normalize_pronto(words: list[str]) -> str:
+    """Return a Pronto hex code in upper case, or raise vol.Invalid if its length fields don't match."""
+    once, repeat = int(words[2], 16), int(words[3], 16)
+    if len(words) != 4 + 2 * (once + repeat):
+        raise vol.Invalid(f"Pronto code announces {once + repeat} burst pairs but has {(len(words) - 4) / 2:g}")
+    return " ".join(word.upper() for word in words)
+
+
+def normalize_code(code: Any) -> str:
+    """Return the canonical form of an IR code, or raise vol.Invalid."""
+    if not isinstance(code, str) or not (code := code.strip()):
+        raise vol.Invalid("IR code is empty")
+
+    if code[: len(BASE64_PREFIX)].lower() == BASE64_PREFIX:
+        return BASE64_PREFIX + _normalize_base64(code[len(BASE64_PREFIX) :])
+
+    words = code.replace(",", " ").split()
+    # Learned Pronto codes start with a 0000 word, which no raw timing can be
+    if len(words) >= 6 and words[0] == "0000" and all(_PRONTO_WORD.fullmatch(word) for word in words):
+        return _normalize_pronto(words)
+    if len(words) >= 2 and all(_RAW_TIMING.fullmatch(word) for word in words):
+        if any(int(word) == 0 for word in words):
+            raise vol.Invalid("Raw IR timings cannot be zero")
+        # Blasters differ in the separators and signs they expect: keep them as entered
+        return code
+
+    # Broadlink codes are often pasted wrapped over several lines
+    unwrapped = "".join(code.splitlines())
+    if len(unwrapped) >= 16 and len(unwrapped) % 4 == 0 and _BASE64.fullmatch(unwrapped):
+        return _normalize_base64(unwrapped)
+
+    if _CONTROL.search(code):
+        raise vol.Invalid("IR code contains control characters")
+    # Anything else is the name of a code learned by the blaster
+    return code
+
+
+def code_hash(code: str) -> str:
+    """Return the content hash of a canonical IR code."""
+    return hashlib.sha256(code.encode()).hexdigest()[:16]
+
+
+def _map_configs(config: dict[str, Any], func: Callable[[dict[str, Any]], None]) -> dict[str, Any]:
+    """Return a copy of entry data or an action with `func` applied to it and to its actions and macro steps.
+
+    A vol.Invalid raised by `func` gets the path of the offending dict prepended.
+    """
+    result = dict(config)
+    func(result)
+    for key in (CONF_ACTIONS, CONF_MACRO_STEPS):
+        if not isinstance(result.get(key), list):
+            continue
+        items = []
+        for index, item in enumerate(result[key]):
+            try:
+                items.append(_map_configs(item, func))
+            except vol.Invalid as err:
+                raise vol.Invalid(err.msg, path=[key, index, *err.path]) from err
+        result[key] = items
+    return result
+
+
+def _normalize(config: dict[str, Any]) -> None:
+    """Normalize the codes of one dict in place and update their hashes."""
+    hashes = dict(config.get(CONF_CODE_HASHES, {}))
+    for field in CODE_FIELDS:
+        if not config.get(field):
+            continue
+        try:
+            config[field] = normalize_code(config[field])
+        except vol.Invalid as err:
+            raise vol.Invalid(err.msg, path=[field]) from err
+        hashes[field] = code_hash(config[field])
+    if hashes:
+        config[CONF_CODE_HASHES] = hashes
+
+
+def normalize_codes(config: dict[str, Any]) -> dict[str, Any]:
+    """Return a copy of entry data or an action with canonical codes and their hashes.
+
+    Actions and macro steps are normalized recursively; codes kept only as a
+    hash are left alone. Raises vol.Invalid, with the path of the offending
+    code, on the first malformed one.
+    """
+    return _map_configs(config, _normalize)
+
+
+def collect_codes(config: dict[str, Any]) -> dict[str, str]:
+    """Return the normalized codes held inline in entry data, by hash."""
+    codes: dict[str, str] = {}
+
+    def collect(item: dict[str, Any]) -> None:
+        for field, digest in item.get(CONF_CODE_HASHES, {}).items():
+            if item.get(field):
+                codes[digest] = item[field]
+
+    _map_configs(config, collect)
+    return codes
+
+
+def referenced_hashes(config: dict[str, Any]) -> set[str]:
+    """Return the hashes of all codes of entry data, inline or not."""
+    hashes: set[str] = set()
+    _map_configs(config, lambda item: hashes.update(item.get(CONF_CODE_HASHES, {}).values()))
+    return hashes
+
+
+def strip_codes(config: dict[str, Any]) -> dict[str, Any]:
+    """Return a copy of normalized entry data that keeps only the hashes of its codes."""
+
+    def strip(item: dict[str, Any]) -> None:
+        for field in item.get(CONF_CODE_HASHES, {}):
+            item.pop(field, None)
+
+    return _map_configs(config, strip)
+
+
+def inline_codes(config: dict[str, Any], lookup: Callable[[str], Optional[str]]) -> dict[str, Any]:
+    """Return a copy of entry data with the codes kept as a hash filled in by `lookup`.
+
+    Raises vol.Invalid if a hash is unknown.
+    """
+
+    def inline(item: dict[str, Any]) -> None:
+        for field, digest in item.get(CONF_CODE_HASHES, {}).items():
+            if item.get(field):
+                continue
+            if (code := lookup(digest)) is None:
+                raise vol.Invalid(f"Unknown IR code {digest}", path=[field])
+            item[field] = code
+
+    return _map_configs(config, inline)
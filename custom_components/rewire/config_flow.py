@@ -8,10 +8,13 @@ from homeassistant.const import UnitOfTemperature
 from homeassistant.core import callback
 from homeassistant.helpers import selector
 
+from .capabilities import async_get_capability_index
+from .codes import normalize_codes
 from .const import (
     ACTION_TYPE_BRIGHTNESS,
     ACTION_TYPE_BUTTON,
     ACTION_TYPE_INC_DEC,
+    ACTION_TYPE_MACRO,
     ACTION_TYPE_MODE,
     ACTION_TYPE_OSCILLATE,
     ACTION_TYPE_POWER,
@@ -25,67 +28,117 @@ from .const import (
     CONF_ACTION_NAME,
     CONF_ACTION_TYPE,
     CONF_ACTIONS,
+    CONF_BACKUP_BLASTERS,
     CONF_BLASTER_ACTION,
     CONF_BRIGHTNESS_DEC_CODE,
     CONF_BRIGHTNESS_INC_CODE,
+    CONF_BROADCAST_GROUP,
+    CONF_COMMAND_TIMEOUT,
+    CONF_DEDUP_WINDOW,
     CONF_DEVICE_TYPE,
+    CONF_FEEDBACK_POWER_ENTITY,
+    CONF_FEEDBACK_POWER_THRESHOLD,
+    CONF_FEEDBACK_SPEED_ENTITY,
+    CONF_FEEDBACK_TEMPERATURE_ENTITY,
     CONF_INITIAL_STATE,
+    CONF_MACRO_STEPS,
     CONF_MAX_SPEED,
     CONF_MAX_TEMP,
     CONF_MAX_VALUE,
     CONF_MIN_SPEED,
     CONF_MIN_TEMP,
     CONF_MIN_VALUE,
+    CONF_MIRROR_MODE,
+    CONF_MIRROR_QUORUM,
     CONF_POWER_OFF_CODE,
     CONF_POWER_ON_CODE,
+    CONF_PROFILE,
+    CONF_PROFILE_NAME,
+    CONF_RETRY_ATTEMPTS,
+    CONF_RETRY_BACKOFF,
     CONF_SPEED_DEC_CODE,
     CONF_SPEED_INC_CODE,
     CONF_SPEED_STEP,
     CONF_STEP_VALUE,
+    CONF_SUPPRESS_REDUNDANT,
     CONF_TEMP_DEC_CODE,
     CONF_TEMP_INC_CODE,
     CONF_TEMP_STEP,
     CONF_TEMP_UNIT,
+    CONF_UPDATE_INTERVAL,
+    DEFAULT_COMMAND_TIMEOUT,
+    DEFAULT_DEDUP_WINDOW,
+    DEFAULT_FEEDBACK_POWER_THRESHOLD,
+    DEFAULT_MIRROR_MODE,
+    DEFAULT_MIRROR_QUORUM,
+    DEFAULT_RETRY_ATTEMPTS,
+    DEFAULT_RETRY_BACKOFF,
+    DEFAULT_SUPPRESS_REDUNDANT,
     DEVICE_TYPE_AC,
     DEVICE_TYPE_FAN,
     DEVICE_TYPE_LIGHT,
     DEVICE_TYPES,
     DOMAIN,
 )
+from .macro import parse_macro
+from .profiles import async_get_profiles
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _validate_codes(user_input: Dict[str, Any]) -> tuple[Dict[str, Any], Dict[str, str]]:
+    """Return the action with normalized codes, or the form errors of the malformed ones."""
+    try:
+        return normalize_codes(user_input), {}
+    except vol.Invalid as err:
+        return user_input, {str(err.path[0]): "invalid_ir_code"}
+
+
 class RewireConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle config flow for RewIRe."""
 
-    VERSION = 2
+    # Version 3: codes of fans, ACs and lights are in actions, see migration.py
+    VERSION = 3
 
     def __init__(self) -> None:
         """Initialize config flow."""
         self.config_data: Dict[str, Any] = {}
         self.actions: list[Dict[str, Any]] = []
         self.current_action_type: Optional[str] = None
+        # Name of the profile to save the actions as, if any
+        self.profile_name: Optional[str] = None
 
     async def async_step_user(self, user_input: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Step 1: Device Name and Type."""
         errors = {}
+        profiles = async_get_profiles(self.hass)
+        await profiles.async_load()
         if user_input is not None:
             self.config_data.update(user_input)
+            if (profile := profiles.get(user_input.get(CONF_PROFILE, ""))) is not None:
+                # Identical devices take type and actions from the profile
+                self.config_data[CONF_DEVICE_TYPE] = profile[CONF_DEVICE_TYPE]
+                self.actions = list(profile[CONF_ACTIONS])
             return await self.async_step_blaster_device()
 
-        schema = vol.Schema(
-            {
-                vol.Required("name", default="My Device"): str,
-                vol.Required(CONF_DEVICE_TYPE, default=DEVICE_TYPE_FAN): selector.SelectSelector(
-                    selector.SelectSelectorConfig(
-                        options=DEVICE_TYPES + ["other"],
-                        translation_key="device_type",
-                        mode=selector.SelectSelectorMode.DROPDOWN,
-                    )
-                ),
-            }
-        )
+        schema_dict = {
+            vol.Required("name", default="My Device"): str,
+            vol.Required(CONF_DEVICE_TYPE, default=DEVICE_TYPE_FAN): selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=DEVICE_TYPES + ["other"],
+                    translation_key="device_type",
+                    mode=selector.SelectSelectorMode.DROPDOWN,
+                )
+            ),
+        }
+        if names := profiles.names():
+            schema_dict[vol.Optional(CONF_PROFILE)] = selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=[{"label": name, "value": profile_id} for profile_id, name in names.items()],
+                    mode=selector.SelectSelectorMode.DROPDOWN,
+                )
+            )
+        schema = vol.Schema(schema_dict)
 
         return self.async_show_form(step_id="user", data_schema=schema, errors=errors)
 
@@ -132,37 +185,17 @@ class RewireConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
             self.config_data[CONF_BLASTER_ACTION] = [action_config]
 
+            if CONF_PROFILE in self.config_data:
+                return await self.async_step_initial_state()
+
             # Route based on device type
             # device_type = self.config_data.get(CONF_DEVICE_TYPE)
             # All device types now go to the generic action builder
             return await self.async_step_actions()
 
-        # ... (Device discovery logic same as before) ...
-        device_id = self.config_data["blaster_device_id"]
-        from homeassistant.helpers import entity_registry as er
-
-        entity_registry = er.async_get(self.hass)
-        device_entities = er.async_entries_for_device(entity_registry, device_id)
-        options = []
-        text_entities = [e for e in device_entities if e.domain in ("text", "input_text")]
-        for e in text_entities:
-            label = f"{e.original_name or e.name or e.entity_id} ({e.entity_id})"
-            options.append({"label": label, "value": e.entity_id})
-
-        if not options:
-            domains = set(e.domain for e in device_entities)
-            domains.add("remote")
-            all_services = self.hass.services.async_services()
-            for domain in domains:
-                if domain_services := all_services.get(domain):
-                    for service_name in domain_services:
-                        full_service = f"{domain}.{service_name}"
-                        options.append({"label": full_service, "value": full_service})
-
-        if not options:
-            options.append({"label": "remote.send_command", "value": "remote.send_command"})
-
-        options.sort(key=lambda x: x["label"])
+        # Scanned once per blaster device and cached; the likeliest send service comes first
+        capabilities = async_get_capability_index(self.hass).async_get(self.config_data["blaster_device_id"])
+        options = capabilities.options()
 
         schema = vol.Schema(
             {
@@ -176,11 +209,14 @@ class RewireConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     async def async_step_configure_power(self, user_input: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Configure Power action."""
+        errors = {}
         if user_input is not None:
-            user_input[CONF_ACTION_TYPE] = ACTION_TYPE_POWER
-            user_input[CONF_ACTION_NAME] = "Power"
-            self.actions.append(user_input)
-            return await self.async_step_actions()
+            action, errors = _validate_codes(user_input)
+            if not errors:
+                action[CONF_ACTION_TYPE] = ACTION_TYPE_POWER
+                action[CONF_ACTION_NAME] = "Power"
+                self.actions.append(action)
+                return await self.async_step_actions()
 
         schema = vol.Schema(
             {
@@ -189,15 +225,18 @@ class RewireConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 vol.Optional(CONF_POWER_OFF_CODE): str,
             }
         )
-        return self.async_show_form(step_id="configure_power", data_schema=schema)
+        return self.async_show_form(step_id="configure_power", data_schema=schema, errors=errors)
 
     async def async_step_configure_temperature(self, user_input: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Configure Temperature action."""
+        errors = {}
         if user_input is not None:
-            user_input[CONF_ACTION_TYPE] = ACTION_TYPE_TEMP
-            user_input[CONF_ACTION_NAME] = "Temperature"
-            self.actions.append(user_input)
-            return await self.async_step_actions()
+            action, errors = _validate_codes(user_input)
+            if not errors:
+                action[CONF_ACTION_TYPE] = ACTION_TYPE_TEMP
+                action[CONF_ACTION_NAME] = "Temperature"
+                self.actions.append(action)
+                return await self.async_step_actions()
 
         default_min = 16 if self.hass.config.units.temperature_unit == UnitOfTemperature.CELSIUS else 60
         default_max = 30 if self.hass.config.units.temperature_unit == UnitOfTemperature.CELSIUS else 86
@@ -229,14 +268,17 @@ class RewireConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 ),
             }
         )
-        return self.async_show_form(step_id="configure_temperature", data_schema=schema)
+        return self.async_show_form(step_id="configure_temperature", data_schema=schema, errors=errors)
 
     async def async_step_configure_toggle(self, user_input: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Configure Toggle action."""
+        errors = {}
         if user_input is not None:
-            user_input[CONF_ACTION_TYPE] = ACTION_TYPE_TOGGLE
-            self.actions.append(user_input)
-            return await self.async_step_actions()
+            action, errors = _validate_codes(user_input)
+            if not errors:
+                action[CONF_ACTION_TYPE] = ACTION_TYPE_TOGGLE
+                self.actions.append(action)
+                return await self.async_step_actions()
 
         schema = vol.Schema(
             {
@@ -245,15 +287,18 @@ class RewireConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             }
         )
 
-        return self.async_show_form(step_id="configure_toggle", data_schema=schema)
+        return self.async_show_form(step_id="configure_toggle", data_schema=schema, errors=errors)
 
     async def async_step_configure_speed(self, user_input: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Configure Speed action."""
+        errors = {}
         if user_input is not None:
-            user_input[CONF_ACTION_TYPE] = ACTION_TYPE_SPEED
-            user_input[CONF_ACTION_NAME] = "Speed"
-            self.actions.append(user_input)
-            return await self.async_step_actions()
+            action, errors = _validate_codes(user_input)
+            if not errors:
+                action[CONF_ACTION_TYPE] = ACTION_TYPE_SPEED
+                action[CONF_ACTION_NAME] = "Speed"
+                self.actions.append(action)
+                return await self.async_step_actions()
 
         schema = vol.Schema(
             {
@@ -264,25 +309,28 @@ class RewireConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 vol.Required(CONF_SPEED_STEP, default=1): int,
             }
         )
-        return self.async_show_form(step_id="configure_speed", data_schema=schema)
+        return self.async_show_form(step_id="configure_speed", data_schema=schema, errors=errors)
 
     async def async_step_configure_mode(self, user_input: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Configure Mode action."""
+        errors = {}
         if user_input is not None:
-            # Mode handling might need to be loop-based if multiple modes are added one by one
-            # But for now, let's assume one separate action entry per mode?
-            # Or one action entry containing ALL modes?
-            # The plan was: "Implement async_step_configure_mode (Heat/Cool/Custom + Temp Overrides)"
-            # If we follow the pattern, one "Mode" action containing a list of modes?
-            # Or user adds "Heat" mode action, "Cool" mode action?
-            # Let's align with "Action-Based": Defining a "Mode" Capability.
-            # But usually a device has "Mode" button which cycles, OR discrete codes.
-            # If discrete, we need a map.
-            # Let's assume discrete modes for now as separate actions?
-            # "Action Name: Heat", "Code: ...". Type: Mode.
-            user_input[CONF_ACTION_TYPE] = ACTION_TYPE_MODE
-            self.actions.append(user_input)
-            return await self.async_step_actions()
+            action, errors = _validate_codes(user_input)
+            if not errors:
+                # Mode handling might need to be loop-based if multiple modes are added one by one
+                # But for now, let's assume one separate action entry per mode?
+                # Or one action entry containing ALL modes?
+                # The plan was: "Implement async_step_configure_mode (Heat/Cool/Custom + Temp Overrides)"
+                # If we follow the pattern, one "Mode" action containing a list of modes?
+                # Or user adds "Heat" mode action, "Cool" mode action?
+                # Let's align with "Action-Based": Defining a "Mode" Capability.
+                # But usually a device has "Mode" button which cycles, OR discrete codes.
+                # If discrete, we need a map.
+                # Let's assume discrete modes for now as separate actions?
+                # "Action Name: Heat", "Code: ...". Type: Mode.
+                action[CONF_ACTION_TYPE] = ACTION_TYPE_MODE
+                self.actions.append(action)
+                return await self.async_step_actions()
 
         schema = vol.Schema(
             {
@@ -296,14 +344,17 @@ class RewireConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 vol.Required(CONF_ACTION_CODE): str,
             }
         )
-        return self.async_show_form(step_id="configure_mode", data_schema=schema)
+        return self.async_show_form(step_id="configure_mode", data_schema=schema, errors=errors)
 
     async def async_step_configure_oscillate(self, user_input: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Configure Oscillate action."""
+        errors = {}
         if user_input is not None:
-            user_input[CONF_ACTION_TYPE] = ACTION_TYPE_OSCILLATE
-            self.actions.append(user_input)
-            return await self.async_step_actions()
+            action, errors = _validate_codes(user_input)
+            if not errors:
+                action[CONF_ACTION_TYPE] = ACTION_TYPE_OSCILLATE
+                self.actions.append(action)
+                return await self.async_step_actions()
 
         schema = vol.Schema(
             {
@@ -311,15 +362,18 @@ class RewireConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 vol.Required(CONF_ACTION_CODE): str,
             }
         )
-        return self.async_show_form(step_id="configure_oscillate", data_schema=schema)
+        return self.async_show_form(step_id="configure_oscillate", data_schema=schema, errors=errors)
 
     async def async_step_configure_brightness(self, user_input: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Configure Brightness action."""
+        errors = {}
         if user_input is not None:
-            user_input[CONF_ACTION_TYPE] = ACTION_TYPE_BRIGHTNESS
-            user_input[CONF_ACTION_NAME] = "Brightness"
-            self.actions.append(user_input)
-            return await self.async_step_actions()
+            action, errors = _validate_codes(user_input)
+            if not errors:
+                action[CONF_ACTION_TYPE] = ACTION_TYPE_BRIGHTNESS
+                action[CONF_ACTION_NAME] = "Brightness"
+                self.actions.append(action)
+                return await self.async_step_actions()
 
         schema = vol.Schema(
             {
@@ -327,7 +381,35 @@ class RewireConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 vol.Required(CONF_BRIGHTNESS_DEC_CODE): str,
             }
         )
-        return self.async_show_form(step_id="configure_brightness", data_schema=schema)
+        return self.async_show_form(step_id="configure_brightness", data_schema=schema, errors=errors)
+
+    async def async_step_configure_macro(self, user_input: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Configure Macro action (timed sequence of codes)."""
+        errors = {}
+        if user_input is not None:
+            try:
+                steps = parse_macro(user_input[CONF_MACRO_STEPS])
+            except vol.Invalid:
+                errors[CONF_MACRO_STEPS] = "invalid_macro"
+            else:
+                action, errors = _validate_codes(
+                    {
+                        CONF_ACTION_NAME: user_input[CONF_ACTION_NAME],
+                        CONF_ACTION_TYPE: ACTION_TYPE_MACRO,
+                        CONF_MACRO_STEPS: steps,
+                    }
+                )
+                if not errors:
+                    self.actions.append(action)
+                    return await self.async_step_actions()
+
+        schema = vol.Schema(
+            {
+                vol.Required(CONF_ACTION_NAME): str,
+                vol.Required(CONF_MACRO_STEPS): selector.TextSelector(selector.TextSelectorConfig(multiline=True)),
+            }
+        )
+        return self.async_show_form(step_id="configure_macro", data_schema=schema, errors=errors)
 
     def _get_available_actions(self, exclude_power: bool = False) -> list[str]:
         """Get list of available actions based on device type."""
@@ -337,7 +419,7 @@ class RewireConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         allowed = set(ACTION_TYPES)
 
         if device_type == DEVICE_TYPE_AC:
-            # AC: Power, Temp, Mode, Speed, Oscillate, Toggle
+            # AC: Power, Temp, Mode, Speed, Oscillate, Toggle, Macro
             allowed = {
                 ACTION_TYPE_POWER,
                 ACTION_TYPE_TEMP,
@@ -345,21 +427,24 @@ class RewireConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 ACTION_TYPE_SPEED,
                 ACTION_TYPE_OSCILLATE,
                 ACTION_TYPE_TOGGLE,
+                ACTION_TYPE_MACRO,
             }
         elif device_type == DEVICE_TYPE_FAN:
-            # Fan: Power, Speed, Oscillate, Toggle
+            # Fan: Power, Speed, Oscillate, Toggle, Macro
             allowed = {
                 ACTION_TYPE_POWER,
                 ACTION_TYPE_SPEED,
                 ACTION_TYPE_OSCILLATE,
                 ACTION_TYPE_TOGGLE,
+                ACTION_TYPE_MACRO,
             }
         elif device_type == DEVICE_TYPE_LIGHT:
-            # Light: Power, Brightness, Toggle
+            # Light: Power, Brightness, Toggle, Macro
             allowed = {
                 ACTION_TYPE_POWER,
                 ACTION_TYPE_BRIGHTNESS,
                 ACTION_TYPE_TOGGLE,
+                ACTION_TYPE_MACRO,
             }
         else:  # Other
             # Other: All Actions
@@ -407,6 +492,7 @@ class RewireConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
                 if not errors:
                     self.config_data[CONF_ACTIONS] = self.actions
+                    self.profile_name = user_input.get(CONF_PROFILE_NAME) or None
                     return await self.async_step_initial_state()
 
         actions_str = (
@@ -418,6 +504,7 @@ class RewireConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         }
 
         if self.actions:
+            schema_dict[vol.Optional(CONF_PROFILE_NAME)] = str
             schema_dict[vol.Optional("remove_action")] = selector.SelectSelector(
                 selector.SelectSelectorConfig(
                     options=[
@@ -472,6 +559,8 @@ class RewireConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 return await self.async_step_configure_brightness()
             elif self.current_action_type == ACTION_TYPE_TOGGLE:
                 return await self.async_step_configure_toggle()
+            elif self.current_action_type == ACTION_TYPE_MACRO:
+                return await self.async_step_configure_macro()
 
             return await self.async_step_configure_action()
 
@@ -492,10 +581,13 @@ class RewireConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     async def async_step_configure_action(self, user_input: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Configure Generic details (Button, Inc/Dec)."""
+        errors = {}
         if user_input is not None:
-            user_input[CONF_ACTION_TYPE] = self.current_action_type
-            self.actions.append(user_input)
-            return await self.async_step_actions()
+            action, errors = _validate_codes(user_input)
+            if not errors:
+                action[CONF_ACTION_TYPE] = self.current_action_type
+                self.actions.append(action)
+                return await self.async_step_actions()
 
         data_schema = {vol.Required(CONF_ACTION_NAME): str}
 
@@ -516,12 +608,18 @@ class RewireConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             step_id="configure_action",
             data_schema=vol.Schema(data_schema),
             description_placeholders={"type": self.current_action_type},
+            errors=errors,
         )
 
     async def async_step_initial_state(self, user_input: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Configure initial state of the device."""
         if user_input is not None:
             self.config_data[CONF_INITIAL_STATE] = user_input
+            if self.profile_name:
+                # The actions go to a new profile that more devices can use
+                self.config_data[CONF_PROFILE] = await async_get_profiles(self.hass).async_save(
+                    None, self.profile_name, self.config_data.get(CONF_DEVICE_TYPE), self.config_data.pop(CONF_ACTIONS)
+                )
             return self.async_create_entry(title=self.config_data["name"], data=self.config_data)
 
         # Build schema dynamically based on configured actions
@@ -656,12 +754,67 @@ class RewireOptionsFlow(config_entries.OptionsFlow):
         if user_input is not None:
             return self.async_create_entry(title="", data=user_input)
 
+        options = self.config_entry.options
         options_schema = vol.Schema(
             {
                 vol.Optional(
-                    "update_interval",
-                    default=self.config_entry.options.get("update_interval", 300),
+                    CONF_UPDATE_INTERVAL,
+                    default=options.get(CONF_UPDATE_INTERVAL, 300),
                 ): int,
+                vol.Optional(
+                    CONF_RETRY_ATTEMPTS,
+                    default=options.get(CONF_RETRY_ATTEMPTS, DEFAULT_RETRY_ATTEMPTS),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=10)),
+                vol.Optional(
+                    CONF_RETRY_BACKOFF,
+                    default=options.get(CONF_RETRY_BACKOFF, DEFAULT_RETRY_BACKOFF),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=10)),
+                vol.Optional(
+                    CONF_COMMAND_TIMEOUT,
+                    default=options.get(CONF_COMMAND_TIMEOUT, DEFAULT_COMMAND_TIMEOUT),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0.5, max=120)),
+                vol.Optional(
+                    CONF_SUPPRESS_REDUNDANT,
+                    default=options.get(CONF_SUPPRESS_REDUNDANT, DEFAULT_SUPPRESS_REDUNDANT),
+                ): bool,
+                vol.Optional(
+                    CONF_DEDUP_WINDOW,
+                    default=options.get(CONF_DEDUP_WINDOW, DEFAULT_DEDUP_WINDOW),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=60)),
+                vol.Optional(
+                    CONF_MIRROR_MODE,
+                    default=options.get(CONF_MIRROR_MODE, DEFAULT_MIRROR_MODE),
+                ): bool,
+                vol.Optional(
+                    CONF_MIRROR_QUORUM,
+                    default=options.get(CONF_MIRROR_QUORUM, DEFAULT_MIRROR_QUORUM),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=10)),
+                vol.Optional(
+                    CONF_BACKUP_BLASTERS,
+                    default=options.get(CONF_BACKUP_BLASTERS, []),
+                ): selector.DeviceSelector(selector.DeviceSelectorConfig(multiple=True)),
+                vol.Optional(
+                    CONF_BROADCAST_GROUP,
+                    description={"suggested_value": options.get(CONF_BROADCAST_GROUP)},
+                ): selector.TextSelector(),
+                vol.Optional(
+                    CONF_FEEDBACK_POWER_ENTITY,
+                    description={"suggested_value": options.get(CONF_FEEDBACK_POWER_ENTITY)},
+                ): selector.EntitySelector(
+                    selector.EntitySelectorConfig(domain=["binary_sensor", "sensor", "switch", "input_boolean"])
+                ),
+                vol.Optional(
+                    CONF_FEEDBACK_POWER_THRESHOLD,
+                    default=options.get(CONF_FEEDBACK_POWER_THRESHOLD, DEFAULT_FEEDBACK_POWER_THRESHOLD),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_FEEDBACK_SPEED_ENTITY,
+                    description={"suggested_value": options.get(CONF_FEEDBACK_SPEED_ENTITY)},
+                ): selector.EntitySelector(selector.EntitySelectorConfig(domain=["sensor", "input_number"])),
+                vol.Optional(
+                    CONF_FEEDBACK_TEMPERATURE_ENTITY,
+                    description={"suggested_value": options.get(CONF_FEEDBACK_TEMPERATURE_ENTITY)},
+                ): selector.EntitySelector(selector.EntitySelectorConfig(domain="sensor")),
             }
         )
 
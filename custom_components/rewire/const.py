@@ -10,6 +10,7 @@ PLATFORMS: Final[list[str]] = [
     "fan",
     "climate",
     "light",
+    "sensor",
 ]
 
 # Device types
@@ -42,6 +43,10 @@ CONF_MIN_SPEED = "min_speed"
 CONF_MAX_SPEED = "max_speed"
 CONF_SPEED_STEP = "speed_step"
 CONF_TEMP_UNIT = "temp_unit"
+CONF_MACRO_STEPS = "steps"
+CONF_MACRO_DELAY = "delay"
+CONF_PROFILE = "profile"
+CONF_PROFILE_NAME = "profile_name"
 
 # Action Types
 ACTION_TYPE_BUTTON = "button"
@@ -53,6 +58,7 @@ ACTION_TYPE_SPEED = "speed"
 ACTION_TYPE_OSCILLATE = "oscillate"
 ACTION_TYPE_BRIGHTNESS = "brightness"
 ACTION_TYPE_INC_DEC = "inc_dec"
+ACTION_TYPE_MACRO = "macro"
 
 ACTION_TYPES = [
     ACTION_TYPE_BUTTON,
@@ -64,6 +70,7 @@ ACTION_TYPES = [
     ACTION_TYPE_OSCILLATE,
     ACTION_TYPE_BRIGHTNESS,
     ACTION_TYPE_INC_DEC,
+    ACTION_TYPE_MACRO,
 ]
 
 # Speed settings
@@ -75,6 +82,120 @@ SPEED_HIGH = 100
 # Update intervals (seconds)
 COORDINATOR_UPDATE_INTERVAL = 300
 
+# Command tracing
+EVENT_COMMAND = "rewire_command"
+EVENT_COMMAND_FAILED = "rewire_command_failed"
+TRACE_BUFFER_SIZE = 100
+
+# hass.data key for blasters shared between entries
+DATA_BLASTERS = f"{DOMAIN}_blasters"
+DATA_TIMING = f"{DOMAIN}_timing"
+
+# Learned send timing, persisted in .storage
+TIMING_STORAGE_KEY = f"{DOMAIN}.timing"
+TIMING_STORAGE_VERSION = 1
+TIMING_SAVE_DELAY = 30
+# Minimum gap between two frames on a blaster (seconds)
+DEFAULT_FRAME_GAP = 0.1
+MIN_FRAME_GAP = 0.04
+MAX_FRAME_GAP = 1.0
+FRAME_GAP_STEP = 0.01
+# Clean sends needed before the gap is lowered by one step
+FRAME_GAP_DECREASE_AFTER = 20
+# Repeats of discrete codes for devices that miss frames
+MAX_CODE_REPEATS = 3
+# Confirmed commands needed before the repeats are lowered again
+REPEATS_DECREASE_AFTER = 20
+# A feedback contradiction this soon after a command counts as a lost frame
+FEEDBACK_LOSS_WINDOW = 10.0
+
+# IR codes of all entries by content hash, persisted in .storage
+DATA_CODES = f"{DOMAIN}_codes"
+CODE_STORAGE_KEY = f"{DOMAIN}.codes"
+CODE_STORAGE_VERSION = 1
+# Codes at least this long are stored compressed when that makes them shorter
+CODE_COMPRESS_MIN_LENGTH = 128
+
+# Device profiles shared by entries, persisted in .storage
+DATA_PROFILES = f"{DOMAIN}_profiles"
+PROFILE_STORAGE_KEY = f"{DOMAIN}.profiles"
+PROFILE_STORAGE_VERSION = 1
+
+# Capabilities of blaster devices, cached for the config flow
+DATA_CAPABILITIES = f"{DOMAIN}_capabilities"
+
+# Options
+CONF_UPDATE_INTERVAL = "update_interval"
+CONF_RETRY_ATTEMPTS = "retry_attempts"
+CONF_RETRY_BACKOFF = "retry_backoff"
+CONF_COMMAND_TIMEOUT = "command_timeout"
+CONF_SUPPRESS_REDUNDANT = "suppress_redundant"
+CONF_DEDUP_WINDOW = "dedup_window"
+CONF_BROADCAST_GROUP = "broadcast_group"
+CONF_BACKUP_BLASTERS = "backup_blasters"
+CONF_MIRROR_MODE = "mirror_mode"
+CONF_MIRROR_QUORUM = "mirror_quorum"
+
+CONF_FEEDBACK_POWER_ENTITY = "feedback_power_entity"
+CONF_FEEDBACK_POWER_THRESHOLD = "feedback_power_threshold"
+CONF_FEEDBACK_SPEED_ENTITY = "feedback_speed_entity"
+CONF_FEEDBACK_TEMPERATURE_ENTITY = "feedback_temperature_entity"
+
+DEFAULT_RETRY_ATTEMPTS = 2
+DEFAULT_RETRY_BACKOFF = 0.2
+DEFAULT_COMMAND_TIMEOUT = 10.0
+DEFAULT_FEEDBACK_POWER_THRESHOLD = 5.0
+DEFAULT_SUPPRESS_REDUNDANT = False
+DEFAULT_MIRROR_MODE = False
+DEFAULT_MIRROR_QUORUM = 1
+# Seconds during which an identical discrete code is sent only once (0 disables)
+DEFAULT_DEDUP_WINDOW = 0.0
+
+# Dispatcher signal for sensor corrections, formatted with the entry id
+SIGNAL_FEEDBACK = f"{DOMAIN}_feedback_{{}}"
+
+# Blaster circuit breaker
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_RESET_TIMEOUT = 30
+
+# Assumed round trip of a blaster until one is measured (seconds), and the weight of new samples
+DEFAULT_BLASTER_LATENCY = 0.1
+LATENCY_EWMA_ALPHA = 0.2
+
+# Services
+SERVICE_SET_MANY = "set_many"
+SERVICE_START_HOLD = "start_hold"
+SERVICE_STOP_HOLD = "stop_hold"
+SERVICE_CALIBRATE_BLASTER = "calibrate_blaster"
+SERVICE_UPDATE_PROFILE = "update_profile"
+ATTR_TARGETS = "targets"
+ATTR_DIRECTION = "direction"
+ATTR_INTERVAL = "interval"
+ATTR_MAX_DURATION = "max_duration"
+ATTR_CODE = "code"
+ATTR_COUNT = "count"
+# set_many target attributes, named as in the entity platforms, which services.py does not import up front
+ATTR_HVAC_MODE = "hvac_mode"
+ATTR_FAN_MODE = "fan_mode"
+ATTR_SWING_MODE = "swing_mode"
+ATTR_PERCENTAGE = "percentage"
+ATTR_OSCILLATING = "oscillating"
+ATTR_BRIGHTNESS = "brightness"
+ATTR_VALUE = "value"
+DIRECTION_INCREASE = "increase"
+DIRECTION_DECREASE = "decrease"
+
+# Hold-to-repeat defaults (seconds)
+DEFAULT_HOLD_INTERVAL = 0.2
+DEFAULT_HOLD_MAX_DURATION = 10.0
+HOLD_MAX_DURATION_LIMIT = 60.0
+
+# Blaster calibration
+DEFAULT_CALIBRATION_COUNT = 5
+MAX_CALIBRATION_COUNT = 50
+# A command deadline is at least this many times the calibrated p95 latency per attempt
+CALIBRATION_TIMEOUT_FACTOR = 3
+
 # Device attributes
 ATTR_OSCILLATING = "oscillating"
 ATTR_SPEED = "speed"
@@ -97,3 +218,24 @@ CONF_TEMP_DEC_CODE = "temp_dec_code"
 # Light Specific
 CONF_BRIGHTNESS_INC_CODE = "brightness_inc_code"
 CONF_BRIGHTNESS_DEC_CODE = "brightness_dec_code"
+
+# Every key holding an IR code, in actions and macro steps
+CODE_FIELDS: Final[tuple[str, ...]] = (
+    CONF_ACTION_CODE,
+    CONF_ACTION_CODE_ON,
+    CONF_ACTION_CODE_OFF,
+    CONF_ACTION_CODE_INC,
+    CONF_ACTION_CODE_DEC,
+    CONF_POWER_ON_CODE,
+    CONF_POWER_OFF_CODE,
+    CONF_POWER_TOGGLE_CODE,
+    CONF_OSCILLATE_CODE,
+    CONF_SPEED_INC_CODE,
+    CONF_SPEED_DEC_CODE,
+    CONF_TEMP_INC_CODE,
+    CONF_TEMP_DEC_CODE,
+    CONF_BRIGHTNESS_INC_CODE,
+    CONF_BRIGHTNESS_DEC_CODE,
+)
+# Content hashes of the normalized codes, next to the codes they cover
+CONF_CODE_HASHES = "code_hashes"
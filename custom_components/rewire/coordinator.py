@@ -1,35 +1,174 @@
 """Data coordinator for RewIRe devices."""
+import asyncio
 import logging
 from datetime import timedelta
-from typing import Any, Dict
+from typing import Any, Dict, Mapping, Optional, TypedDict
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
+from .blaster import BlasterRoute, RetryPolicy, async_get_blaster, async_get_blaster_by_key, retarget_actions
+from .const import (
+    CONF_BACKUP_BLASTERS,
+    CONF_BLASTER_ACTION,
+    CONF_BROADCAST_GROUP,
+    CONF_DEDUP_WINDOW,
+    CONF_MIRROR_MODE,
+    CONF_MIRROR_QUORUM,
+    CONF_SUPPRESS_REDUNDANT,
+    CONF_UPDATE_INTERVAL,
+    DEFAULT_DEDUP_WINDOW,
+    DEFAULT_MIRROR_MODE,
+    DEFAULT_MIRROR_QUORUM,
+    DEFAULT_SUPPRESS_REDUNDANT,
+    DOMAIN,
+    FEEDBACK_LOSS_WINDOW,
+    SIGNAL_FEEDBACK,
+)
+from .device_profile import DeviceProfile
+from .timing import async_get_timing
+from .trace import CommandTracer
+from .transport import async_build_transports
+
 _LOGGER = logging.getLogger(__name__)
 
 
+class DeviceState(TypedDict, total=False):
+    """Assumed state of an IR device, shared by all entities of its entry."""
+
+    power: bool
+    hvac_mode: str
+    temperature: float
+    current_temperature: float
+    speed: float
+    oscillating: bool
+    brightness: int
+    heat: bool
+
+
 class RewireCoordinator(DataUpdateCoordinator):
     """Class to manage fetching data from the API."""
 
-    def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry) -> None:
-        """Initialize."""
-        self.config_entry = config_entry
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        config: Optional[Mapping[str, Any]] = None,
+        device_profile: Optional[DeviceProfile] = None,
+    ) -> None:
+        """Initialize.
+
+        `config` is the entry data with its IR codes filled in from the code
+        store; entries that still hold their codes inline can leave it out.
+        `device_profile` is the parsed config, shared by the entries of a
+        stored profile; it is parsed here if not given.
+        """
         super().__init__(
             hass,
             _LOGGER,
             name="RewIRe",
-            update_interval=timedelta(seconds=config_entry.options.get("update_interval", 300)),
+            update_interval=timedelta(seconds=config_entry.options.get(CONF_UPDATE_INTERVAL, 300)),
         )
-        self._device_state: Dict[str, Any] = {
+        # Set after super().__init__, which would otherwise reset it outside of entry setup
+        self.config_entry = config_entry
+        self.config: Mapping[str, Any] = config_entry.data if config is None else config
+        self.device_profile = DeviceProfile(self.config) if device_profile is None else device_profile
+        # Single source of truth: entities read from here and only the coordinator applies changes
+        self._device_state: DeviceState = {
             "power": False,
-            "speed": 0,
             "oscillating": False,
             "heat": False,
         }
+        # Serializes the entity commands of this device, see entity.device_command
+        self.command_lock = asyncio.Lock()
+        # Last values reported by feedback sensors since the last command
+        self._feedback: Dict[str, Any] = {}
+        # State keys set by the last command and its loop time, to learn from feedback
+        self._commanded: set[str] = set()
+        self._last_command = 0.0
+        self.timing = async_get_timing(hass)
+        self.feedback_signal = SIGNAL_FEEDBACK.format(config_entry.entry_id)
+        self.tracer = CommandTracer(hass)
+        # Entities of this entry by entity_id, for the services
+        self.entities: Dict[str, Any] = {}
+        self.blaster = async_get_blaster(hass, config_entry)
+        self.retry_policy = RetryPolicy.from_entry(config_entry)
+        self.transports = async_build_transports(
+            hass, config_entry.data.get(CONF_BLASTER_ACTION, []), config_entry.data.get("name", DOMAIN)
+        )
+        # Primary blaster first, then the backups that can be reached with the same actions
+        self.pool = [BlasterRoute(self.blaster, self.transports)]
+        self._backup_data: Dict[str, Dict[str, Any]] = {}
+        self._async_build_backups()
+
+        options = config_entry.options
+        self.suppress_redundant = bool(options.get(CONF_SUPPRESS_REDUNDANT, DEFAULT_SUPPRESS_REDUNDANT))
+        self.dedup_window = float(options.get(CONF_DEDUP_WINDOW, DEFAULT_DEDUP_WINDOW))
+        # Mirror mode: all blaster actions at once, successful when this many deliver
+        self.mirror_quorum: Optional[int] = None
+        if options.get(CONF_MIRROR_MODE, DEFAULT_MIRROR_MODE):
+            self.mirror_quorum = max(1, int(options.get(CONF_MIRROR_QUORUM, DEFAULT_MIRROR_QUORUM)))
+        # Entries on the same blaster with the same group share transmissions
+        self.broadcast_group: Optional[str] = options.get(CONF_BROADCAST_GROUP) or None
+        # Commands that were not sent because they would not change the device
+        self.suppressed: Dict[str, int] = {"redundant": 0, "deduplicated": 0}
+        # (code, loop time, result) of the last discrete code sent
+        self._last_send: Optional[tuple[str, float, asyncio.Future[bool]]] = None
+
+    def _async_build_backups(self) -> None:
+        """Add the backup blasters from the options to the pool."""
+        data = self.config_entry.data
+        actions = data.get(CONF_BLASTER_ACTION, [])
+        for device_id in self.config_entry.options.get(CONF_BACKUP_BLASTERS, []):
+            if device_id == self.blaster.key or device_id in self._backup_data:
+                continue
+            if (backup_actions := retarget_actions(self.hass, actions, device_id)) is None:
+                _LOGGER.warning(
+                    "Skipping backup blaster %s of %s: its blaster actions can't be pointed at that device",
+                    device_id,
+                    data.get("name"),
+                )
+                continue
+            self._backup_data[device_id] = {
+                **data,
+                "blaster_device_id": device_id,
+                CONF_BLASTER_ACTION: backup_actions,
+            }
+            transports = async_build_transports(self.hass, backup_actions, data.get("name", DOMAIN))
+            self.pool.append(BlasterRoute(async_get_blaster_by_key(self.hass, device_id), transports))
+
+    @callback
+    def async_attach_blasters(self) -> CALLBACK_TYPE:
+        """Attach the entry to every blaster of its pool."""
+        detach = [self.blaster.async_attach(self.config_entry, self.async_update_listeners)]
+        detach.extend(
+            route.blaster.async_attach(
+                self.config_entry, self.async_update_listeners, self._backup_data[route.blaster.key]
+            )
+            for route in self.pool[1:]
+        )
+
+        @callback
+        def detach_all() -> None:
+            for unsub in detach:
+                unsub()
+
+        return detach_all
 
-    async def _async_update_data(self) -> Dict[str, Any]:
+    @property
+    def blasters_available(self) -> bool:
+        """Return True if any blaster of the pool can send."""
+        return any(route.blaster.available for route in self.pool)
+
+    def async_routes(self) -> list[BlasterRoute]:
+        """Return the pool in the order to try: healthy first, then cheapest, the primary on ties."""
+        if len(self.pool) == 1:
+            return self.pool
+        return sorted(self.pool, key=lambda route: (not route.blaster.available, route.blaster.cost))
+
+    async def _async_update_data(self) -> DeviceState:
         """Fetch data from device."""
         try:
             # Coordinator maintains local state since IR is fire-and-forget
@@ -37,7 +176,72 @@ class RewireCoordinator(DataUpdateCoordinator):
         except Exception as err:
             raise UpdateFailed(f"Error updating RewIRe: {err}") from err
 
+    @property
+    def device_state(self) -> DeviceState:
+        """Return the assumed device state."""
+        return self._device_state
+
+    def seed_device_state(self, state: Dict[str, Any]) -> None:
+        """Set initial values for keys that are not known yet."""
+        for key, value in state.items():
+            self._device_state.setdefault(key, value)
+
+    @callback
+    def restore_device_state(self, state: Dict[str, Any]) -> None:
+        """Adopt state that was not commanded, e.g. restored or derived from feedback."""
+        if all(self._device_state.get(key) == value for key, value in state.items()):
+            return
+        self._device_state.update(state)
+        self.async_set_updated_data(self._device_state)
+
     def set_device_state(self, state: Dict[str, Any]) -> None:
-        """Update internal device state."""
+        """Apply the state change of a command sent to the device."""
+        # Feedback contradicting a command just sent is stale until the sensor reports again
+        for key, value in state.items():
+            if self._feedback.get(key, value) != value:
+                del self._feedback[key]
+        self._commanded = set(state)
+        self._last_command = self.hass.loop.time()
         self._device_state.update(state)
         self.async_set_updated_data(self._device_state)
+
+    def confirmed_state(self, key: str) -> Any:
+        """Return the value a feedback sensor reported for key, or None if unknown."""
+        return self._feedback.get(key)
+
+    def pending_send(self, code: str) -> Optional[asyncio.Future[bool]]:
+        """Return the result of the same code sent within the de-dup window, if any."""
+        if self._last_send is None:
+            return None
+        last_code, sent, result = self._last_send
+        if last_code != code or self.hass.loop.time() - sent > self.dedup_window:
+            return None
+        # A failed send must not swallow the retry of an automation
+        if result.done() and not result.result():
+            return None
+        return result
+
+    def register_send(self, code: str) -> asyncio.Future[bool]:
+        """Record a discrete code about to be sent and return its result future."""
+        result = self.hass.loop.create_future()
+        self._last_send = (code, self.hass.loop.time(), result)
+        return result
+
+    @callback
+    def apply_feedback(self, key: str, value: Any) -> None:
+        """Confirm or correct the device state from a feedback sensor."""
+        self._feedback[key] = value
+        if key in self._commanded and self.hass.loop.time() - self._last_command <= FEEDBACK_LOSS_WINDOW:
+            # First report after a command: did the frame reach the device?
+            self._commanded.discard(key)
+            delivered = self._device_state.get(key) == value
+            self.timing.async_record_delivery(self.config_entry.entry_id, delivered)
+            if not delivered:
+                self.timing.async_record_frame(self.blaster.key, False)
+        if self._device_state.get(key) == value:
+            return
+
+        _LOGGER.debug("Feedback corrected %s of %s to %s", key, self.config_entry.entry_id, value)
+        self._device_state[key] = value
+        async_dispatcher_send(self.hass, self.feedback_signal, key, value)
+        self.async_set_updated_data(self._device_state)
@@ -0,0 +1,254 @@
+"""Parsed, read-only view of the codes and entity layout of a RewIRe device.
+
+The entry config (or a shared profile) is parsed once in `async_setup_entry`.
+Platforms read codes, ranges and lookup tables from the result instead of each
+scanning the actions, and entries of one stored profile share one instance.
+"""
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from homeassistant.const import UnitOfTemperature
+from homeassistant.util.percentage import percentage_to_ranged_value, ranged_value_to_percentage
+
+from .const import (
+    ACTION_TYPE_BRIGHTNESS,
+    ACTION_TYPE_BUTTON,
+    ACTION_TYPE_INC_DEC,
+    ACTION_TYPE_MACRO,
+    ACTION_TYPE_MODE,
+    ACTION_TYPE_OSCILLATE,
+    ACTION_TYPE_POWER,
+    ACTION_TYPE_SPEED,
+    ACTION_TYPE_TEMP,
+    ACTION_TYPE_TOGGLE,
+    CONF_ACTION_CODE,
+    CONF_ACTION_CODE_DEC,
+    CONF_ACTION_CODE_INC,
+    CONF_ACTION_NAME,
+    CONF_ACTION_TYPE,
+    CONF_ACTIONS,
+    CONF_BRIGHTNESS_DEC_CODE,
+    CONF_BRIGHTNESS_INC_CODE,
+    CONF_DEVICE_TYPE,
+    CONF_MACRO_STEPS,
+    CONF_MAX_SPEED,
+    CONF_MAX_TEMP,
+    CONF_MAX_VALUE,
+    CONF_MIN_SPEED,
+    CONF_MIN_TEMP,
+    CONF_MIN_VALUE,
+    CONF_POWER_OFF_CODE,
+    CONF_POWER_ON_CODE,
+    CONF_SPEED_DEC_CODE,
+    CONF_SPEED_INC_CODE,
+    CONF_SPEED_STEP,
+    CONF_STEP_VALUE,
+    CONF_TEMP_DEC_CODE,
+    CONF_TEMP_INC_CODE,
+    CONF_TEMP_STEP,
+    CONF_TEMP_UNIT,
+    DEVICE_TYPE_AC,
+    DEVICE_TYPE_FAN,
+    DEVICE_TYPE_LIGHT,
+)
+from .macro import compile_macro
+
+# Device types with a main entity, which covers their power action and the inc/dec actions named like these
+_MAIN_ENTITY_INC_DEC: Mapping[str, tuple[str, ...]] = {
+    DEVICE_TYPE_FAN: ("speed",),
+    DEVICE_TYPE_AC: ("temp", "climate"),
+    DEVICE_TYPE_LIGHT: ("brightness",),
+}
+
+
+class DeviceProfile:
+    """Codes, ranges, lookup tables and per-platform actions of a device.
+
+    Immutable once built; actions are exposed as read-only mappings.
+    """
+
+    __slots__ = (
+        "device_type",
+        "power_on_code",
+        "power_off_code",
+        "power_discrete",
+        "temp_inc_code",
+        "temp_dec_code",
+        "min_temp",
+        "max_temp",
+        "temp_step",
+        "temp_unit",
+        "speed_inc_code",
+        "speed_dec_code",
+        "min_speed",
+        "max_speed",
+        "speed_step",
+        "speed_levels",
+        "fan_modes",
+        "fan_mode_index",
+        "level_percentages",
+        "percentage_levels",
+        "oscillate_code",
+        "hvac_mode_codes",
+        "brightness_inc_code",
+        "brightness_dec_code",
+        "buttons",
+        "macros",
+        "switches",
+        "numbers",
+    )
+
+    def __init__(self, config: Mapping[str, Any]) -> None:
+        """Parse the device type and actions of an entry config."""
+        values: dict[str, Any] = dict.fromkeys(self.__slots__)
+        values.update(
+            device_type=config.get(CONF_DEVICE_TYPE),
+            min_temp=16,
+            max_temp=30,
+            temp_step=1,
+            min_speed=1,
+            max_speed=10,
+            speed_step=1,
+        )
+        hvac_mode_codes: dict[str, str] = {}
+        buttons = []
+        macros = []
+        switches = []
+        numbers = []
+
+        for action in config.get(CONF_ACTIONS, []):
+            atype = action.get(CONF_ACTION_TYPE)
+            if atype == ACTION_TYPE_POWER:
+                values["power_on_code"] = action.get(CONF_POWER_ON_CODE)
+                values["power_off_code"] = action.get(CONF_POWER_OFF_CODE)
+            elif atype == ACTION_TYPE_TEMP:
+                values["temp_inc_code"] = action.get(CONF_TEMP_INC_CODE)
+                values["temp_dec_code"] = action.get(CONF_TEMP_DEC_CODE)
+                values["min_temp"] = action.get(CONF_MIN_TEMP, values["min_temp"])
+                values["max_temp"] = action.get(CONF_MAX_TEMP, values["max_temp"])
+                values["temp_step"] = action.get(CONF_TEMP_STEP, values["temp_step"])
+                values["temp_unit"] = (
+                    UnitOfTemperature.CELSIUS
+                    if action.get(CONF_TEMP_UNIT, "celsius") == "celsius"
+                    else UnitOfTemperature.FAHRENHEIT
+                )
+            elif atype == ACTION_TYPE_SPEED:
+                values["speed_inc_code"] = action.get(CONF_SPEED_INC_CODE)
+                values["speed_dec_code"] = action.get(CONF_SPEED_DEC_CODE)
+                values["min_speed"] = action.get(CONF_MIN_SPEED, values["min_speed"])
+                values["max_speed"] = action.get(CONF_MAX_SPEED, values["max_speed"])
+                values["speed_step"] = action.get(CONF_SPEED_STEP, values["speed_step"])
+            elif atype == ACTION_TYPE_OSCILLATE:
+                values["oscillate_code"] = action.get(CONF_ACTION_CODE)
+            elif atype == ACTION_TYPE_MODE:
+                if action.get("mode_name") and action.get(CONF_ACTION_CODE):
+                    hvac_mode_codes[action["mode_name"]] = action[CONF_ACTION_CODE]
+            elif atype == ACTION_TYPE_BRIGHTNESS:
+                values["brightness_inc_code"] = action.get(CONF_BRIGHTNESS_INC_CODE)
+                values["brightness_dec_code"] = action.get(CONF_BRIGHTNESS_DEC_CODE)
+            elif atype == ACTION_TYPE_INC_DEC and "brightness" in action.get("name", "").lower():
+                values["brightness_inc_code"] = action.get(CONF_ACTION_CODE_INC)
+                values["brightness_dec_code"] = action.get(CONF_ACTION_CODE_DEC)
+
+            # Actions that get an entity of their own
+            name = action.get(CONF_ACTION_NAME, "").lower()
+            if atype == ACTION_TYPE_BUTTON:
+                buttons.append(MappingProxyType(action))
+            elif atype == ACTION_TYPE_MACRO:
+                macros.append((MappingProxyType(action), compile_macro(action[CONF_MACRO_STEPS])))
+            elif atype == ACTION_TYPE_TOGGLE or (
+                atype == ACTION_TYPE_POWER and values["device_type"] not in _MAIN_ENTITY_INC_DEC
+            ):
+                switches.append(MappingProxyType(action))
+            elif atype == ACTION_TYPE_INC_DEC and not any(
+                word in name for word in _MAIN_ENTITY_INC_DEC.get(values["device_type"], ())
+            ):
+                numbers.append((MappingProxyType(action), None))
+
+        if (
+            values["device_type"] == DEVICE_TYPE_AC
+            and values["speed_inc_code"]
+            and values["speed_dec_code"]
+            and not any(action[CONF_ACTION_NAME].lower() == "fan speed" for action, _ in numbers)
+        ):
+            # AC Fan Speed number, sharing the speed with the fan mode of the climate entity
+            action = {
+                CONF_ACTION_NAME: "Fan Speed",
+                CONF_ACTION_CODE_INC: values["speed_inc_code"],
+                CONF_ACTION_CODE_DEC: values["speed_dec_code"],
+                CONF_MIN_VALUE: values["min_speed"],
+                CONF_MAX_VALUE: values["max_speed"],
+                CONF_STEP_VALUE: values["speed_step"],
+            }
+            numbers.append((MappingProxyType(action), "speed"))
+
+        # Only two different codes are discrete; one shared (or a single) code is a toggle and must always be sent
+        values["power_discrete"] = bool(
+            values["power_on_code"] and values["power_off_code"] and values["power_on_code"] != values["power_off_code"]
+        )
+        values["hvac_mode_codes"] = MappingProxyType(hvac_mode_codes)
+
+        # Speed levels with their fan mode names "1", "2", ... and percentages
+        levels: tuple[float, ...] = ()
+        if values["speed_inc_code"] and values["speed_dec_code"]:
+            min_speed, max_speed, step = values["min_speed"], values["max_speed"], values["speed_step"]
+            levels = tuple(min_speed + idx * step for idx in range(int((max_speed - min_speed) / step) + 1))
+        values["speed_levels"] = levels
+        values["fan_modes"] = tuple(str(idx) for idx in range(1, len(levels) + 1))
+        values["fan_mode_index"] = MappingProxyType({mode: idx for idx, mode in enumerate(values["fan_modes"])})
+        speed_range = (values["min_speed"], values["max_speed"])
+        values["level_percentages"] = MappingProxyType(
+            {level: ranged_value_to_percentage(speed_range, min(values["max_speed"], level)) for level in levels}
+        )
+        values["percentage_levels"] = (
+            tuple(percentage_to_ranged_value(speed_range, percentage) for percentage in range(101)) if levels else ()
+        )
+
+        values["buttons"] = tuple(buttons)
+        values["macros"] = tuple(macros)
+        values["switches"] = tuple(switches)
+        values["numbers"] = tuple(numbers)
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Refuse changes; the profile may be shared by several entries."""
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        """Refuse changes; the profile may be shared by several entries."""
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    @property
+    def has_temperature(self) -> bool:
+        """Return True if the target temperature can be stepped."""
+        return bool(self.temp_inc_code and self.temp_dec_code)
+
+    @property
+    def has_speed(self) -> bool:
+        """Return True if the speed can be stepped."""
+        return bool(self.speed_levels)
+
+    @property
+    def has_brightness(self) -> bool:
+        """Return True if the brightness can be stepped."""
+        return bool(self.brightness_inc_code and self.brightness_dec_code)
+
+    def speed_index(self, speed: float) -> int:
+        """Return the index of the speed level closest to a speed."""
+        idx = round((speed - self.min_speed) / self.speed_step)
+        return max(0, min(len(self.speed_levels) - 1, idx))
+
+    def speed_percentage(self, speed: float) -> int:
+        """Return a speed as a percentage of the speed range, 0 below it."""
+        if speed < self.min_speed:
+            return 0
+        if (percentage := self.level_percentages.get(speed)) is not None:
+            return percentage
+        return ranged_value_to_percentage((self.min_speed, self.max_speed), min(self.max_speed, speed))
+
+    def percentage_speed(self, percentage: int) -> float:
+        """Return the speed of a percentage of the speed range."""
+        if isinstance(percentage, int) and 0 <= percentage <= 100:
+            return self.percentage_levels[percentage]
+        return percentage_to_ranged_value((self.min_speed, self.max_speed), percentage)
@@ -0,0 +1,24 @@
+"""Diagnostics support for RewIRe."""
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import RewireCoordinator
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: RewireCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    return {
+        "entry": {
+            "data": dict(entry.data),
+            "options": dict(entry.options),
+        },
+        "device_state": dict(coordinator.data or {}),
+        "suppressed_commands": dict(coordinator.suppressed),
+        "timing": coordinator.timing.as_dict(coordinator.blaster.key, entry.entry_id),
+        "command_traces": coordinator.tracer.export(),
+    }
@@ -1,9 +1,55 @@
 """Base entity for RewIRe devices."""
+import asyncio
+import functools
+import logging
+import math
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, NamedTuple, Optional, TypeVar
+
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
+from .const import CONF_BLASTER_ACTION, CONF_DEVICE_TYPE, DOMAIN
 from .coordinator import RewireCoordinator
+from .trace import traced_command
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+class _CommandScope(NamedTuple):
+    """A device command in progress and the entities whose state write waits for it to end."""
+
+    coordinator: RewireCoordinator
+    task: Optional["asyncio.Task[Any]"]
+    writes: dict[int, "RewireEntity"]
+
+
+# Set while an entity command holds its device's command lock. Tasks and listeners started meanwhile inherit
+# the context, so it only applies to the device and task that own it.
+_COMMAND_SCOPE: ContextVar[Optional[_CommandScope]] = ContextVar("rewire_command_scope", default=None)
+
+
+def device_command(func: Callable[..., Awaitable[_T]]) -> Callable[..., Awaitable[_T]]:
+    """Trace an entity command and run it atomically with the other commands of its device.
+
+    Reading the assumed state, sending the code and applying the change happen
+    under the coordinator's command lock, so concurrent calls (two automations
+    stepping the temperature, two toggles) cannot act on a stale state. Nested
+    calls, e.g. turn_off -> set_hvac_mode, run under the outer call's lock.
+    State writes made during the command are coalesced into one per entity
+    when the outermost call ends.
+    """
+    traced = traced_command(func)
+
+    @functools.wraps(func)
+    async def wrapper(self: "RewireEntity", *args: Any, **kwargs: Any) -> _T:
+        return await self.async_run_command(lambda: traced(self, *args, **kwargs))
+
+    return wrapper
 
 
 class RewireEntity(CoordinatorEntity[RewireCoordinator]):
@@ -15,6 +61,119 @@ class RewireEntity(CoordinatorEntity[RewireCoordinator]):
         self._entry_id = entry_id
         self._attr_unique_id = f"{DOMAIN}_{entry_id}"
 
+        # Load blaster config (a list of actions from ActionSelector)
+        self._blaster_actions = coordinator.config_entry.data.get(CONF_BLASTER_ACTION, [])
+        self._hold_task: Optional[asyncio.Task[None]] = None
+        # State and attributes of the last write, to skip writes that change nothing
+        self._last_written: Optional[tuple[Any, ...]] = None
+
+    async def async_added_to_hass(self) -> None:
+        """Register the entity with its coordinator."""
+        await super().async_added_to_hass()
+        self.coordinator.entities[self.entity_id] = self
+        self.async_on_remove(
+            async_dispatcher_connect(self.hass, self.coordinator.feedback_signal, self._async_handle_feedback)
+        )
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Unregister the entity from its coordinator."""
+        self.coordinator.entities.pop(self.entity_id, None)
+        self.async_stop_hold()
+        await super().async_will_remove_from_hass()
+
+    async def async_run_command(self, command: Callable[[], Awaitable[_T]]) -> _T:
+        """Run a command while holding the device's command lock."""
+        if self._deferred_writes() is not None:
+            # Nested in a command of this device in this task, which holds the lock already
+            return await command()
+
+        deferred: dict[int, RewireEntity] = {}
+        token = _COMMAND_SCOPE.set(_CommandScope(self.coordinator, asyncio.current_task(), deferred))
+        try:
+            async with self.coordinator.command_lock:
+                return await command()
+        finally:
+            _COMMAND_SCOPE.reset(token)
+            # One write per entity for the whole command, however many steps it took
+            for entity in deferred.values():
+                if entity.hass is not None and entity._state_fingerprint() != entity._last_written:
+                    entity.async_write_ha_state()
+
+    def _deferred_writes(self) -> Optional[dict[int, "RewireEntity"]]:
+        """Return the pending writes of the command of this device running in the current task, if any."""
+        if (
+            (scope := _COMMAND_SCOPE.get()) is None
+            or scope.coordinator is not self.coordinator
+            or scope.task is not asyncio.current_task()
+        ):
+            return None
+        return scope.writes
+
+    def _state_fingerprint(self) -> tuple[Any, ...]:
+        """Return what a state write would record: availability, state and attributes."""
+        if not self.available:
+            return (False,)
+        return (True, self.state, self.state_attributes, self.extra_state_attributes)
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state, or defer it to the end of the running device command."""
+        if (deferred := self._deferred_writes()) is not None:
+            deferred[id(self)] = self
+            return
+        self._last_written = self._state_fingerprint()
+        super().async_write_ha_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state if a coordinator update changed it."""
+        if self._deferred_writes() is None and self._state_fingerprint() == self._last_written:
+            return
+        self.async_write_ha_state()
+
+    @callback
+    def async_start_hold(self, step: Callable[[], Awaitable[bool]], interval: float, max_duration: float) -> None:
+        """Run `step` every `interval` seconds until stopped, it fails or `max_duration` passes."""
+        self.async_stop_hold()
+        self._hold_task = self.hass.async_create_background_task(
+            self._async_hold(step, interval, max_duration), f"{DOMAIN} hold {self.entity_id}"
+        )
+
+    @callback
+    def async_stop_hold(self) -> bool:
+        """Stop a running hold; returns False if none was running."""
+        if self._hold_task is None or self._hold_task.done():
+            return False
+        self._hold_task.cancel()
+        self._hold_task = None
+        return True
+
+    async def _async_hold(self, step: Callable[[], Awaitable[bool]], interval: float, max_duration: float) -> None:
+        """Repeat a step on a fixed schedule."""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        end = start + max_duration
+        tick = 0
+        while (due := start + tick * interval) < end:
+            # Deadline-based: repeats are due at fixed offsets, so slow sends don't drift the rate
+            if (wait := due - loop.time()) > 0:
+                await asyncio.sleep(wait)
+            if not await self.async_run_command(step):
+                _LOGGER.debug("Hold on %s ended after %s repeats", self.entity_id, tick + 1)
+                return
+            # Slots missed by a slow send are skipped instead of sent in a burst
+            tick = max(tick + 1, math.ceil((loop.time() - start) / interval))
+        _LOGGER.debug("Hold on %s reached its maximum duration", self.entity_id)
+
+    @callback
+    def _async_handle_feedback(self, key: str, value: Any) -> None:
+        """Adopt a state correction reported by a feedback sensor."""
+
+    @property
+    def available(self) -> bool:
+        """Return True if the entity and its blaster are available."""
+        return super().available and self.coordinator.blasters_available
+
     @property
     def device_info(self) -> DeviceInfo:
         """Return device info."""
@@ -22,5 +181,70 @@ class RewireEntity(CoordinatorEntity[RewireCoordinator]):
             identifiers={(DOMAIN, self._entry_id)},
             name=self.coordinator.config_entry.data.get("name", "IR Device"),
             manufacturer="IR Remote Control",
-            model=self.coordinator.config_entry.data.get("device_type", "Generic"),
+            model=self.coordinator.config.get(CONF_DEVICE_TYPE, "Generic"),
         )
+
+    def _is_redundant(self, current: Any, target: Any) -> bool:
+        """Return True if a discrete code can be skipped because the target is the known state."""
+        if not self.coordinator.suppress_redundant or current != target:
+            return False
+        self.coordinator.suppressed["redundant"] += 1
+        _LOGGER.debug("%s is already %s, not sending", self.entity_id, target)
+        return True
+
+    async def _send_code(self, code: str, repeats: int = 1, delay: float = 0.0, discrete: bool = False) -> bool:
+        """Helper to send the IR code.
+
+        Discrete (non-toggle) codes sent again within the de-dup window share the
+        result of the first send. Returns False if the code could not be delivered
+        to the blaster.
+        """
+        if not self.coordinator.transports or not code:
+            return True
+
+        coordinator = self.coordinator
+        if discrete:
+            # Devices that were seen missing frames get discrete codes more than once
+            repeats = max(repeats, coordinator.timing.code_repeats(self._entry_id))
+        if not discrete or not coordinator.dedup_window:
+            return await self._async_transmit(code, repeats, delay)
+
+        if (pending := coordinator.pending_send(code)) is not None:
+            coordinator.suppressed["deduplicated"] += 1
+            _LOGGER.debug("%s: identical code already sent, sharing its result", self.entity_id)
+            return await asyncio.shield(pending)
+
+        result = coordinator.register_send(code)
+        success = False
+        try:
+            success = await self._async_transmit(code, repeats, delay)
+        finally:
+            result.set_result(success)
+        return success
+
+    async def _async_transmit(self, code: str, repeats: int, delay: float) -> bool:
+        """Send the IR code through the blaster pool with a trace span."""
+        tracer = self.coordinator.tracer
+        span = tracer.start(self.entity_id)
+        # Transports are prepared at setup; only the code is filled in per send
+        span.mark_built()
+
+        success = False
+        # Healthy, least-loaded blaster first; the rest of the pool is tried in turn if it fails
+        for route in self.coordinator.async_routes():
+            success = await route.blaster.async_send(
+                route.transports,
+                code,
+                span=span,
+                policy=self.coordinator.retry_policy,
+                repeats=repeats,
+                delay=delay,
+                context=self._context,
+                group=self.coordinator.broadcast_group,
+                sender=self.coordinator.config_entry.entry_id,
+                quorum=self.coordinator.mirror_quorum,
+            )
+            if success:
+                break
+        tracer.finish(span, success)
+        return success
@@ -1,4 +1,3 @@
-import copy
 import logging
 from typing import Any, Optional
 
@@ -8,33 +7,15 @@ from homeassistant.components.fan import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers import script
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.util.percentage import (
-    percentage_to_ranged_value,
-)
 
 from .const import (
-    ACTION_TYPE_OSCILLATE,
-    ACTION_TYPE_POWER,
-    ACTION_TYPE_SPEED,
-    CONF_ACTION_TYPE,
-    CONF_ACTIONS,
-    CONF_BLASTER_ACTION,
     CONF_DEVICE_TYPE,
-    CONF_MAX_SPEED,
-    CONF_MIN_SPEED,
-    CONF_OSCILLATE_CODE,
-    CONF_POWER_OFF_CODE,
-    CONF_POWER_ON_CODE,
-    CONF_SPEED_DEC_CODE,
-    CONF_SPEED_INC_CODE,
-    CONF_SPEED_STEP,
     DEVICE_TYPE_FAN,
     DOMAIN,
 )
 from .coordinator import RewireCoordinator
-from .entity import RewireEntity
+from .entity import RewireEntity, device_command
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -46,7 +27,7 @@ async def async_setup_entry(
 ) -> None:
     """Set up fan entity."""
     coordinator: RewireCoordinator = hass.data[DOMAIN][config_entry.entry_id]
-    device_type = config_entry.data.get(CONF_DEVICE_TYPE)
+    device_type = coordinator.config.get(CONF_DEVICE_TYPE)
 
     if device_type != DEVICE_TYPE_FAN:
         return
@@ -65,124 +46,57 @@ class RewireFan(RewireEntity, FanEntity):
         """Initialize the fan."""
         super().__init__(coordinator, entry_id)
 
-        data = coordinator.config_entry.data
-        self._actions = data.get(CONF_ACTIONS, [])
-
-        self._power_on_code = None
-        self._power_off_code = None
-        self._oscillate_code = None
-        self._speed_inc_code = None
-        self._speed_dec_code = None
-        min_speed = 1
-        max_speed = 10
-        speed_step = 1
-
-        if self._actions:
-            for action in self._actions:
-                atype = action.get(CONF_ACTION_TYPE)
-                if atype == ACTION_TYPE_POWER:
-                    self._power_on_code = action.get(CONF_POWER_ON_CODE)
-                    self._power_off_code = action.get(CONF_POWER_OFF_CODE)
-                elif atype == ACTION_TYPE_SPEED:
-                    self._speed_inc_code = action.get(CONF_SPEED_INC_CODE)
-                    self._speed_dec_code = action.get(CONF_SPEED_DEC_CODE)
-                    min_speed = action.get(CONF_MIN_SPEED, min_speed)
-                    max_speed = action.get(CONF_MAX_SPEED, max_speed)
-                    speed_step = action.get(CONF_SPEED_STEP, speed_step)
-                elif atype == ACTION_TYPE_OSCILLATE:
-                    self._oscillate_code = action.get("ir_code")
-        else:
-            self._power_on_code = data.get(CONF_POWER_ON_CODE)
-            self._power_off_code = data.get(CONF_POWER_OFF_CODE)
-            self._oscillate_code = data.get(CONF_OSCILLATE_CODE)
-            self._speed_inc_code = data.get(CONF_SPEED_INC_CODE)
-            self._speed_dec_code = data.get(CONF_SPEED_DEC_CODE)
-            min_speed = data.get(CONF_MIN_SPEED, 1)
-            max_speed = data.get(CONF_MAX_SPEED, 10)
-            speed_step = data.get(CONF_SPEED_STEP, 1)
-
-        # Unique ID based on the entry
+        data = coordinator.config
+        profile = self._profile = coordinator.device_profile
+
         self._attr_unique_id = f"{DOMAIN}_{entry_id}_fan"
         self._attr_name = data.get("name")
         self._attr_supported_features = FanEntityFeature(0)
 
-        if self._power_on_code and self._power_off_code:
+        if profile.power_on_code and profile.power_off_code:
             self._attr_supported_features |= FanEntityFeature.TURN_ON | FanEntityFeature.TURN_OFF
 
-        if self._oscillate_code:
+        if profile.oscillate_code:
             self._attr_supported_features |= FanEntityFeature.OSCILLATE
 
-        if self._speed_inc_code and self._speed_dec_code:
+        if profile.has_speed:
             self._attr_supported_features |= FanEntityFeature.SET_SPEED
-            self._speed_min = min_speed
-            self._speed_max = max_speed
-            self._speed_step = speed_step
-            self._speed_range = (self._speed_min, self._speed_max)
 
-        self._attr_is_on = False
-        self._attr_oscillating = False
-        self._attr_percentage = 0
-
-        self._blaster_actions = data.get(CONF_BLASTER_ACTION, [])
+        # Initial values of the shared device state; a speed of 0 is below the range, i.e. unknown
+        seed: dict[str, Any] = {"power": False, "oscillating": False, "speed": 0}
 
         # Apply initial state if configured
         initial_state = data.get("initial_state", {})
         if initial_state:
             if "power_state" in initial_state and initial_state["power_state"]:
-                self._attr_is_on = True
+                seed["power"] = True
 
             if "current_speed" in initial_state:
-                # Map numeric speed to percentage
-                speed_val = initial_state["current_speed"]
-                self._attr_percentage = int(((speed_val - self._min_speed) / (self._max_speed - self._min_speed)) * 100)
+                seed["speed"] = initial_state["current_speed"]
 
             if "oscillating" in initial_state:
-                self._attr_oscillating = initial_state["oscillating"]
+                seed["oscillating"] = bool(initial_state["oscillating"])
 
-    async def _send_code(self, code: str, repeats: int = 1, delay: float = 0.0) -> None:
-        """Helper to send the IR code."""
-        if not self._blaster_actions or not code:
-            return
+        coordinator.seed_device_state(seed)
 
-        import asyncio
-
-        actions = copy.deepcopy(self._blaster_actions)
-
-        def inject_code(obj: Any) -> None:
-            if isinstance(obj, dict):
-                for key, value in obj.items():
-                    if key in ("command", "code", "value", "payload") and value == "IR_CODE":
-                        obj[key] = [code] if key == "command" else code
-                    elif isinstance(value, (dict, list)):
-                        inject_code(value)
-            elif isinstance(obj, list):
-                for item in obj:
-                    inject_code(item)
-
-        inject_code(actions)
-
-        for i in range(repeats):
-            if delay > 0 and i > 0:
-                await asyncio.sleep(delay)
-
-            for action in actions:
-                if "service" in action:
-                    try:
-                        domain, service_name = action["service"].split(".", 1)
-                        target = action.get("target")
-                        data = action.get("data")
-                        await self.hass.services.async_call(
-                            domain, service_name, service_data=data, target=target, blocking=True
-                        )
-                    except Exception as err:
-                        _LOGGER.error("Failed call %s: %s", action["service"], err)
-                else:
-                    try:
-                        script_obj = script.Script(self.hass, [action], self.name, DOMAIN)
-                        await script_obj.async_run()
-                    except Exception as err:
-                        _LOGGER.error("Failed script: %s", err)
+    @property
+    def is_on(self) -> bool:
+        """Return the assumed power state."""
+        return bool(self.coordinator.device_state.get("power"))
 
+    @property
+    def oscillating(self) -> bool:
+        """Return the assumed oscillation state."""
+        return bool(self.coordinator.device_state.get("oscillating"))
+
+    @property
+    def percentage(self) -> Optional[int]:
+        """Return the assumed speed as a percentage."""
+        if not self._attr_supported_features & FanEntityFeature.SET_SPEED:
+            return 0
+        return self._profile.speed_percentage(self.coordinator.device_state.get("speed", 0))
+
+    @device_command
     async def async_turn_on(
         self,
         percentage: Optional[int] = None,
@@ -190,45 +104,60 @@ class RewireFan(RewireEntity, FanEntity):
         **kwargs: Any,
     ) -> None:
         """Turn on the fan."""
-        if self._power_on_code:
-            await self._send_code(self._power_on_code)
+        # Skip the code if a feedback sensor confirms the fan is already on
+        if (
+            self._profile.power_on_code
+            and self.coordinator.confirmed_state("power") is not True
+            and not (self._profile.power_discrete and self._is_redundant(self.is_on, True))
+        ):
+            if not await self._send_code(self._profile.power_on_code, discrete=self._profile.power_discrete):
+                return
 
-        self._attr_is_on = True
+        self.coordinator.set_device_state({"power": True})
 
         if percentage is not None:
             await self.async_set_percentage(percentage)
 
         self.async_write_ha_state()
 
+    @device_command
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the fan off."""
-        if self._power_off_code:
-            await self._send_code(self._power_off_code)
-
-        self._attr_is_on = False
+        if (
+            self._profile.power_off_code
+            and self.coordinator.confirmed_state("power") is not False
+            and not (self._profile.power_discrete and self._is_redundant(self.is_on, False))
+        ):
+            if not await self._send_code(self._profile.power_off_code, discrete=self._profile.power_discrete):
+                return
+
+        self.coordinator.set_device_state({"power": False})
         self.async_write_ha_state()
 
+    @device_command
     async def async_oscillate(self, oscillating: bool) -> None:
         """Oscillate the fan."""
-        if self._oscillate_code:
+        if self._profile.oscillate_code:
             # Assumes toggle behavior
-            await self._send_code(self._oscillate_code)
-            self._attr_oscillating = oscillating
+            if not await self._send_code(self._profile.oscillate_code):
+                return
+            self.coordinator.set_device_state({"oscillating": oscillating})
             self.async_write_ha_state()
 
+    @device_command
     async def async_set_percentage(self, percentage: int) -> None:
         """Set the speed percentage of the fan."""
         if percentage == 0:
             await self.async_turn_off()
             return
 
-        if not self._speed_inc_code:
+        profile = self._profile
+        if not profile.has_speed:
             return
 
-        # Calculate target raw value from percentage
-        target_value = percentage_to_ranged_value(self._speed_range, percentage)
-        current_pct = self._attr_percentage or 0
-        current_value = percentage_to_ranged_value(self._speed_range, current_pct)
+        # Target raw value of the percentage, from the precomputed table
+        target_value = profile.percentage_speed(percentage)
+        current_value = self.coordinator.device_state.get("speed", 0)
 
         diff = target_value - current_value
         if diff == 0:
@@ -236,18 +165,15 @@ class RewireFan(RewireEntity, FanEntity):
 
         # Restrict to increasing/decreasing by only one step at a time
         direction = 1 if diff > 0 else -1
-        code = self._speed_inc_code if direction > 0 else self._speed_dec_code
+        code = profile.speed_inc_code if direction > 0 else profile.speed_dec_code
 
         if code:
-            await self._send_code(code, repeats=1)
+            if not await self._send_code(code, repeats=1):
+                return
 
-        new_value = current_value + (direction * self._speed_step)
+        new_value = current_value + (direction * profile.speed_step)
         # Clamp to range
-        new_value = max(self._speed_min, min(self._speed_max, new_value))
-
-        from homeassistant.util.percentage import (
-            ranged_value_to_percentage,
-        )
+        new_value = max(profile.min_speed, min(profile.max_speed, new_value))
 
-        self._attr_percentage = ranged_value_to_percentage(self._speed_range, new_value)
+        self.coordinator.set_device_state({"speed": new_value})
         self.async_write_ha_state()
@@ -0,0 +1,89 @@
+"""Sensor feedback bindings for RewIRe devices."""
+import logging
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from homeassistant.const import STATE_OFF, STATE_ON
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .const import (
+    CONF_FEEDBACK_POWER_ENTITY,
+    CONF_FEEDBACK_POWER_THRESHOLD,
+    CONF_FEEDBACK_SPEED_ENTITY,
+    CONF_FEEDBACK_TEMPERATURE_ENTITY,
+    DEFAULT_FEEDBACK_POWER_THRESHOLD,
+)
+
+if TYPE_CHECKING:
+    from .coordinator import RewireCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+Parser = Callable[[State], Optional[Any]]
+
+
+def _power_parser(threshold: float) -> Parser:
+    """Return a parser for on/off entities and power meters."""
+
+    def parse(state: State) -> Optional[bool]:
+        if state.state == STATE_ON:
+            return True
+        if state.state == STATE_OFF:
+            return False
+        # Power meter: the device is on while it draws more than the threshold
+        try:
+            return float(state.state) > threshold
+        except ValueError:
+            return None
+
+    return parse
+
+
+def _parse_number(state: State) -> Optional[float]:
+    """Parse a numeric sensor state."""
+    try:
+        return float(state.state)
+    except ValueError:
+        return None
+
+
+def _parse_speed(state: State) -> Optional[int]:
+    """Parse a speed level sensor state."""
+    value = _parse_number(state)
+    return None if value is None else int(round(value))
+
+
+@callback
+def async_track_feedback(hass: HomeAssistant, coordinator: "RewireCoordinator") -> CALLBACK_TYPE:
+    """Feed the state of the configured sensors into the coordinator."""
+    options = coordinator.config_entry.options
+    bindings: dict[str, tuple[str, Parser]] = {}
+
+    if entity_id := options.get(CONF_FEEDBACK_POWER_ENTITY):
+        threshold = float(options.get(CONF_FEEDBACK_POWER_THRESHOLD, DEFAULT_FEEDBACK_POWER_THRESHOLD))
+        bindings[entity_id] = ("power", _power_parser(threshold))
+    if entity_id := options.get(CONF_FEEDBACK_SPEED_ENTITY):
+        bindings[entity_id] = ("speed", _parse_speed)
+    if entity_id := options.get(CONF_FEEDBACK_TEMPERATURE_ENTITY):
+        bindings[entity_id] = ("current_temperature", _parse_number)
+
+    if not bindings:
+        return lambda: None
+
+    @callback
+    def apply(state: Optional[State]) -> None:
+        if state is None:
+            return
+        key, parse = bindings[state.entity_id]
+        if (value := parse(state)) is not None:
+            coordinator.apply_feedback(key, value)
+
+    @callback
+    def state_changed(event: Event) -> None:
+        apply(event.data.get("new_state"))
+
+    for entity_id in bindings:
+        apply(hass.states.get(entity_id))
+
+    _LOGGER.debug("Tracking feedback for %s: %s", coordinator.config_entry.entry_id, list(bindings))
+    return async_track_state_change_event(hass, list(bindings), state_changed)
@@ -1,6 +1,5 @@
-import copy
 import logging
-from typing import Any
+from typing import Any, Optional
 
 from homeassistant.components.light import (
     ColorMode,
@@ -8,28 +7,15 @@ from homeassistant.components.light import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers import script
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import (
-    ACTION_TYPE_BRIGHTNESS,
-    ACTION_TYPE_INC_DEC,
-    ACTION_TYPE_POWER,
-    CONF_ACTION_CODE_DEC,
-    CONF_ACTION_CODE_INC,
-    CONF_ACTION_TYPE,
-    CONF_ACTIONS,
-    CONF_BLASTER_ACTION,
-    CONF_BRIGHTNESS_DEC_CODE,
-    CONF_BRIGHTNESS_INC_CODE,
     CONF_DEVICE_TYPE,
-    CONF_POWER_OFF_CODE,
-    CONF_POWER_ON_CODE,
     DEVICE_TYPE_LIGHT,
     DOMAIN,
 )
 from .coordinator import RewireCoordinator
-from .entity import RewireEntity
+from .entity import RewireEntity, device_command
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -41,7 +27,7 @@ async def async_setup_entry(
 ) -> None:
     """Set up light entity."""
     coordinator: RewireCoordinator = hass.data[DOMAIN][config_entry.entry_id]
-    device_type = config_entry.data.get(CONF_DEVICE_TYPE)
+    device_type = coordinator.config.get(CONF_DEVICE_TYPE)
 
     if device_type != DEVICE_TYPE_LIGHT and device_type != "light":
         return
@@ -60,113 +46,72 @@ class RewireLight(RewireEntity, LightEntity):
         """Initialize the light."""
         super().__init__(coordinator, entry_id)
 
-        data = coordinator.config_entry.data
-        self._actions = data.get(CONF_ACTIONS, [])
-
-        self._power_on_code = None
-        self._power_off_code = None
-        self._brightness_inc_code = None
-        self._brightness_dec_code = None
-
-        if self._actions:
-            for action in self._actions:
-                atype = action.get(CONF_ACTION_TYPE)
-                if atype == ACTION_TYPE_POWER:
-                    self._power_on_code = action.get(CONF_POWER_ON_CODE)
-                    self._power_off_code = action.get(CONF_POWER_OFF_CODE)
-                elif atype == ACTION_TYPE_BRIGHTNESS:
-                    self._brightness_inc_code = action.get(CONF_BRIGHTNESS_INC_CODE)
-                    self._brightness_dec_code = action.get(CONF_BRIGHTNESS_DEC_CODE)
-                elif atype == ACTION_TYPE_INC_DEC and "brightness" in action.get("name", "").lower():
-                    # Legacy fallback or if user chose Inc/Dec
-                    self._brightness_inc_code = action.get(CONF_ACTION_CODE_INC)
-                    self._brightness_dec_code = action.get(CONF_ACTION_CODE_DEC)
-        else:
-            self._power_on_code = data.get(CONF_POWER_ON_CODE)
-            self._power_off_code = data.get(CONF_POWER_OFF_CODE)
-            self._brightness_inc_code = data.get(CONF_BRIGHTNESS_INC_CODE)
-            self._brightness_dec_code = data.get(CONF_BRIGHTNESS_DEC_CODE)
+        data = coordinator.config
+        self._profile = coordinator.device_profile
 
         self._attr_unique_id = f"{DOMAIN}_{entry_id}_light"
         self._attr_name = data.get("name")
         self._attr_supported_color_modes = {ColorMode.ONOFF}
         self._attr_color_mode = ColorMode.ONOFF
 
-        if self._brightness_inc_code and self._brightness_dec_code:
+        if self._profile.has_brightness:
             self._attr_supported_color_modes = {ColorMode.BRIGHTNESS}
             self._attr_color_mode = ColorMode.BRIGHTNESS
 
-        self._attr_is_on = False
-        self._attr_brightness = 255
-
-        self._blaster_actions = data.get(CONF_BLASTER_ACTION, [])
+        # Initial values of the shared device state
+        seed: dict[str, Any] = {"power": False, "brightness": 255}
 
         # Apply initial state if configured
         initial_state = data.get("initial_state", {})
         if initial_state:
             if "power_state" in initial_state and initial_state["power_state"]:
-                self._attr_is_on = True
+                seed["power"] = True
 
             if "current_brightness" in initial_state:
                 # Map 0-100 to 0-255
                 brightness_pct = initial_state["current_brightness"]
-                self._attr_brightness = int((brightness_pct / 100) * 255)
-
-    async def _send_code(self, code: str, repeats: int = 1) -> None:
-        """Helper to send the IR code."""
-        if not self._blaster_actions or not code:
-            return
-
-        actions = copy.deepcopy(self._blaster_actions)
-
-        def inject_code(obj: Any) -> None:
-            if isinstance(obj, dict):
-                for key, value in obj.items():
-                    if key in ("command", "code", "value", "payload") and value == "IR_CODE":
-                        obj[key] = [code] if key == "command" else code
-                    elif isinstance(value, (dict, list)):
-                        inject_code(value)
-            elif isinstance(obj, list):
-                for item in obj:
-                    inject_code(item)
-
-        inject_code(actions)
-
-        for _ in range(repeats):
-            for action in actions:
-                if "service" in action:
-                    try:
-                        domain, service_name = action["service"].split(".", 1)
-                        target = action.get("target")
-                        data = action.get("data")
-                        await self.hass.services.async_call(
-                            domain, service_name, service_data=data, target=target, blocking=True
-                        )
-                    except Exception as err:
-                        _LOGGER.error("Failed call %s: %s", action["service"], err)
-                else:
-                    try:
-                        script_obj = script.Script(self.hass, [action], self.name, DOMAIN)
-                        await script_obj.async_run()
-                    except Exception as err:
-                        _LOGGER.error("Failed script: %s", err)
+                seed["brightness"] = int((brightness_pct / 100) * 255)
 
-    async def async_turn_on(self, **kwargs: Any) -> None:
-        """Turn the light on."""
-        if self._power_on_code:
-            await self._send_code(self._power_on_code)
+        coordinator.seed_device_state(seed)
 
-        self._attr_is_on = True
+    @property
+    def is_on(self) -> bool:
+        """Return the assumed power state."""
+        return bool(self.coordinator.device_state.get("power"))
 
-        if (brightness := kwargs.get("brightness")) is not None:
-            self._attr_brightness = brightness
+    @property
+    def brightness(self) -> Optional[int]:
+        """Return the assumed brightness."""
+        return self.coordinator.device_state.get("brightness")
 
+    @device_command
+    async def async_turn_on(self, **kwargs: Any) -> None:
+        """Turn the light on."""
+        # Skip the code if a feedback sensor confirms the light is already on
+        if (
+            self._profile.power_on_code
+            and self.coordinator.confirmed_state("power") is not True
+            and not (self._profile.power_discrete and self._is_redundant(self.is_on, True))
+        ):
+            if not await self._send_code(self._profile.power_on_code, discrete=self._profile.power_discrete):
+                return
+
+        state: dict[str, Any] = {"power": True}
+        if (brightness := kwargs.get("brightness")) is not None:
+            state["brightness"] = brightness
+        self.coordinator.set_device_state(state)
         self.async_write_ha_state()
 
+    @device_command
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the light off."""
-        if self._power_off_code:
-            await self._send_code(self._power_off_code)
-
-        self._attr_is_on = False
+        if (
+            self._profile.power_off_code
+            and self.coordinator.confirmed_state("power") is not False
+            and not (self._profile.power_discrete and self._is_redundant(self.is_on, False))
+        ):
+            if not await self._send_code(self._profile.power_off_code, discrete=self._profile.power_discrete):
+                return
+
+        self.coordinator.set_device_state({"power": False})
         self.async_write_ha_state()
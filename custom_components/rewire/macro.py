@@ -0,0 +1,55 @@
+"""Timed IR code sequences (macros) for RewIRe."""
+from typing import Any
+
+import voluptuous as vol
+
+from .const import CONF_ACTION_CODE, CONF_MACRO_DELAY
+
+# Macro text lines starting with this keyword are pauses, e.g. "wait 1.5"
+WAIT_KEYWORD = "wait"
+
+
+def parse_macro(text: str) -> list[dict[str, Any]]:
+    """Parse macro text into stored steps.
+
+    Every non-empty line is an IR code, except `wait <seconds>` lines, which add
+    a pause after the preceding code. Raises vol.Invalid on malformed input.
+    """
+    steps: list[dict[str, Any]] = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+
+        keyword, _, value = line.partition(" ")
+        if keyword.lower() != WAIT_KEYWORD:
+            steps.append({CONF_ACTION_CODE: line, CONF_MACRO_DELAY: 0.0})
+            continue
+
+        if not steps:
+            raise vol.Invalid("A macro cannot start with a wait")
+        try:
+            delay = float(value)
+        except ValueError as err:
+            raise vol.Invalid(f"Invalid wait: {line}") from err
+        if delay < 0:
+            raise vol.Invalid(f"Invalid wait: {line}")
+        steps[-1][CONF_MACRO_DELAY] += delay
+
+    if not steps:
+        raise vol.Invalid("A macro needs at least one code")
+    return steps
+
+
+def compile_macro(steps: list[dict[str, Any]]) -> tuple[tuple[float, str], ...]:
+    """Compile stored steps into a send plan of (start offset, code) pairs.
+
+    Offsets are relative to the start of the macro, so a slow send does not
+    push back every later code.
+    """
+    plan = []
+    offset = 0.0
+    for step in steps:
+        plan.append((offset, step[CONF_ACTION_CODE]))
+        offset += float(step.get(CONF_MACRO_DELAY, 0.0))
+    return tuple(plan)
@@ -0,0 +1,116 @@
+"""Migration of RewIRe config entries to the current schema.
+
+Entries of the first versions kept the codes and ranges of fans, ACs and
+lights at the top level of their data. They are rewritten once, in
+`async_migrate_entry`, into the same power/temperature/speed/oscillate/
+brightness actions the config flow creates, so setup and the platforms only
+handle actions.
+"""
+from typing import Any
+
+from homeassistant.const import UnitOfTemperature
+
+from .const import (
+    ACTION_TYPE_BRIGHTNESS,
+    ACTION_TYPE_OSCILLATE,
+    ACTION_TYPE_POWER,
+    ACTION_TYPE_SPEED,
+    ACTION_TYPE_TEMP,
+    CONF_ACTION_CODE,
+    CONF_ACTION_NAME,
+    CONF_ACTION_TYPE,
+    CONF_ACTIONS,
+    CONF_BRIGHTNESS_DEC_CODE,
+    CONF_BRIGHTNESS_INC_CODE,
+    CONF_CODE_HASHES,
+    CONF_DEVICE_TYPE,
+    CONF_MAX_SPEED,
+    CONF_MAX_TEMP,
+    CONF_MIN_SPEED,
+    CONF_MIN_TEMP,
+    CONF_OSCILLATE_CODE,
+    CONF_POWER_OFF_CODE,
+    CONF_POWER_ON_CODE,
+    CONF_SPEED_DEC_CODE,
+    CONF_SPEED_INC_CODE,
+    CONF_SPEED_STEP,
+    CONF_TEMP_DEC_CODE,
+    CONF_TEMP_INC_CODE,
+    CONF_TEMP_STEP,
+    CONF_TEMP_UNIT,
+    DEVICE_TYPE_FAN,
+)
+
+# Action type, name, top-level code keys mapped to action keys, and the settings that move with them
+_LEGACY_ACTIONS: tuple[tuple[str, str, dict[str, str], tuple[str, ...]], ...] = (
+    (
+        ACTION_TYPE_POWER,
+        "Power",
+        {CONF_POWER_ON_CODE: CONF_POWER_ON_CODE, CONF_POWER_OFF_CODE: CONF_POWER_OFF_CODE},
+        (),
+    ),
+    (
+        ACTION_TYPE_TEMP,
+        "Temperature",
+        {CONF_TEMP_INC_CODE: CONF_TEMP_INC_CODE, CONF_TEMP_DEC_CODE: CONF_TEMP_DEC_CODE},
+        (CONF_MIN_TEMP, CONF_MAX_TEMP, CONF_TEMP_STEP),
+    ),
+    (
+        ACTION_TYPE_SPEED,
+        "Speed",
+        {CONF_SPEED_INC_CODE: CONF_SPEED_INC_CODE, CONF_SPEED_DEC_CODE: CONF_SPEED_DEC_CODE},
+        (CONF_MIN_SPEED, CONF_MAX_SPEED, CONF_SPEED_STEP),
+    ),
+    (ACTION_TYPE_OSCILLATE, "Oscillate", {CONF_OSCILLATE_CODE: CONF_ACTION_CODE}, ()),
+    (
+        ACTION_TYPE_BRIGHTNESS,
+        "Brightness",
+        {CONF_BRIGHTNESS_INC_CODE: CONF_BRIGHTNESS_INC_CODE, CONF_BRIGHTNESS_DEC_CODE: CONF_BRIGHTNESS_DEC_CODE},
+        (),
+    ),
+)
+
+# Legacy actions only some device types read; other types keep the keys in their data, unused as before
+_LEGACY_DEVICE_TYPES = {ACTION_TYPE_OSCILLATE: (DEVICE_TYPE_FAN,)}
+
+
+def migrate_legacy_config(data: dict[str, Any], temperature_unit: str) -> dict[str, Any]:
+    """Return entry data with its top-level codes and ranges moved into actions.
+
+    Codes move inline or as a hash, whichever the entry holds. Legacy ACs
+    followed the unit system, which `temperature_unit` pins in the new
+    temperature action. Data that already has actions is returned unchanged.
+    """
+    if data.get(CONF_ACTIONS):
+        return data
+
+    data = dict(data)
+    hashes = dict(data.pop(CONF_CODE_HASHES, {}))
+    actions = []
+    for action_type, name, codes, settings in _LEGACY_ACTIONS:
+        if action_type in _LEGACY_DEVICE_TYPES and data.get(CONF_DEVICE_TYPE) not in _LEGACY_DEVICE_TYPES[action_type]:
+            continue
+        action: dict[str, Any] = {CONF_ACTION_NAME: name, CONF_ACTION_TYPE: action_type}
+        action_hashes = {}
+        for key, action_key in codes.items():
+            if code := data.pop(key, None):
+                action[action_key] = code
+            if digest := hashes.pop(key, None):
+                action_hashes[action_key] = digest
+        if not action_hashes and not any(action_key in action for action_key in codes.values()):
+            # No action to move the settings into: they stay where they are
+            continue
+        for key in settings:
+            if key in data:
+                action[key] = data.pop(key)
+        if action_hashes:
+            action[CONF_CODE_HASHES] = action_hashes
+        if action_type == ACTION_TYPE_TEMP:
+            action[CONF_TEMP_UNIT] = "fahrenheit" if temperature_unit == UnitOfTemperature.FAHRENHEIT else "celsius"
+        actions.append(action)
+
+    if hashes:
+        data[CONF_CODE_HASHES] = hashes
+    if actions:
+        data[CONF_ACTIONS] = actions
+    return data
@@ -1,37 +1,25 @@
-import copy
 import logging
-from typing import Any
+from typing import Any, Mapping, Optional
 
 from homeassistant.components.number import NumberEntity, NumberMode
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers import script
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.restore_state import RestoreEntity
 
 from .const import (
-    ACTION_TYPE_INC_DEC,
     CONF_ACTION_CODE_DEC,
     CONF_ACTION_CODE_INC,
     CONF_ACTION_NAME,
-    CONF_ACTION_TYPE,
-    CONF_ACTIONS,
-    CONF_BLASTER_ACTION,
-    CONF_DEVICE_TYPE,
-    CONF_MAX_SPEED,
     CONF_MAX_VALUE,
-    CONF_MIN_SPEED,
     CONF_MIN_VALUE,
-    CONF_SPEED_DEC_CODE,
-    CONF_SPEED_INC_CODE,
-    CONF_SPEED_STEP,
     CONF_STEP_VALUE,
     DEVICE_TYPE_AC,
-    DEVICE_TYPE_FAN,
     DOMAIN,
 )
 from .coordinator import RewireCoordinator
-from .entity import RewireEntity
+from .entity import RewireEntity, device_command
+from .trace import traced_command
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -43,51 +31,32 @@ async def async_setup_entry(
 ) -> None:
     """Set up number entity."""
     coordinator: RewireCoordinator = hass.data[DOMAIN][config_entry.entry_id]
-    actions = config_entry.data.get(CONF_ACTIONS, [])
-
-    device_type = config_entry.data.get(CONF_DEVICE_TYPE)
-
-    entities = []
-    for action in actions:
-        if action.get(CONF_ACTION_TYPE) == ACTION_TYPE_INC_DEC:
-            name = action.get(CONF_ACTION_NAME, "").lower()
-            handled = False
-
-            if device_type == DEVICE_TYPE_FAN and "speed" in name:
-                handled = True
-            elif device_type == DEVICE_TYPE_AC and ("temp" in name or "climate" in name):
-                handled = True
-            elif device_type == "light" and "brightness" in name:
-                handled = True
-
-            if not handled:
-                entities.append(RewireNumber(coordinator, config_entry.entry_id, action))
-
-    async_add_entities(entities)
-
-    # Add AC Fan Speed if codes are present
-    if device_type == DEVICE_TYPE_AC:
-        data = config_entry.data
-        if data.get(CONF_SPEED_INC_CODE) and data.get(CONF_SPEED_DEC_CODE):
-            action = {
-                CONF_ACTION_NAME: "Fan Speed",
-                CONF_ACTION_CODE_INC: data.get(CONF_SPEED_INC_CODE),
-                CONF_ACTION_CODE_DEC: data.get(CONF_SPEED_DEC_CODE),
-                CONF_MIN_VALUE: data.get(CONF_MIN_SPEED, 1),
-                CONF_MAX_VALUE: data.get(CONF_MAX_SPEED, 10),
-                CONF_STEP_VALUE: data.get(CONF_SPEED_STEP, 1),
-            }
-            async_add_entities([RewireNumber(coordinator, config_entry.entry_id, action)])
+
+    # Inc/dec actions the main entity covers are left out; a number with a state key
+    # (the AC fan speed) shares that value with the main entity
+    async_add_entities(
+        [
+            RewireNumber(coordinator, config_entry.entry_id, action, state_key=state_key)
+            for action, state_key in coordinator.device_profile.numbers
+        ]
+    )
 
 
 class RewireNumber(RewireEntity, NumberEntity, RestoreEntity):
     """Number representation of inc/dec buttons."""
 
-    def __init__(self, coordinator: RewireCoordinator, entry_id: str, action: dict[str, Any]) -> None:
-        """Initialize the number."""
+    def __init__(
+        self,
+        coordinator: RewireCoordinator,
+        entry_id: str,
+        action: Mapping[str, Any],
+        state_key: Optional[str] = None,
+    ) -> None:
+        """Initialize the number, optionally bound to a key of the shared device state."""
         super().__init__(coordinator, entry_id)
         self._action = action
         self._action_name = action[CONF_ACTION_NAME]
+        self._state_key = state_key
 
         # Override unique_id and name
         self._attr_name = f"{coordinator.config_entry.data.get('name')} {self._action_name}"
@@ -101,86 +70,76 @@ class RewireNumber(RewireEntity, NumberEntity, RestoreEntity):
 
         # Default starting value (middle of range)
         self._attr_native_value = (self._attr_native_min_value + self._attr_native_max_value) / 2
-
-        # Load blaster config
-        self._blaster_actions = coordinator.config_entry.data.get(CONF_BLASTER_ACTION, [])
-        self._device_type = coordinator.config_entry.data.get(CONF_DEVICE_TYPE)
+        self._device_type = coordinator.device_profile.device_type
 
     @property
     def available(self) -> bool:
         """Return True if entity is available."""
+        if not super().available:
+            return False
         if self._device_type == DEVICE_TYPE_AC:
-            return self.coordinator.data.get("power", False)
+            return self.coordinator.device_state.get("power", False)
         return True
 
+    @property
+    def native_value(self) -> Optional[float]:
+        """Return the assumed value."""
+        if self._state_key is None:
+            return self._attr_native_value
+        return self.coordinator.device_state.get(self._state_key, self._attr_native_value)
+
+    def _set_value(self, value: float) -> None:
+        """Store a new assumed value."""
+        if self._state_key is None:
+            self._attr_native_value = value
+        else:
+            self.coordinator.set_device_state({self._state_key: value})
+
     async def async_added_to_hass(self) -> None:
         """Run when entity about to be added to hass."""
         await super().async_added_to_hass()
         if (last_state := await self.async_get_last_state()) is not None:
             try:
-                self._attr_native_value = float(last_state.state)
+                value = float(last_state.state)
             except ValueError:
-                pass
-
-    async def _send_code(self, code: str, repeats: int = 1, delay: float = 0.0) -> None:
-        """Helper to send the IR code."""
-        if not self._blaster_actions or not code:
-            return
-
-        import asyncio
-
-        base_actions = copy.deepcopy(self._blaster_actions)
-
-        def inject_code(obj: Any) -> None:
-            if isinstance(obj, dict):
-                for key, value in obj.items():
-                    if key in ("command", "code", "value", "payload") and value == "IR_CODE":
-                        obj[key] = [code] if key == "command" else code
-                    elif isinstance(value, (dict, list)):
-                        inject_code(value)
-            elif isinstance(obj, list):
-                for item in obj:
-                    inject_code(item)
-
-        inject_code(base_actions)
-
-        # Execute 'repeats' times
-        for i in range(repeats):
-            if delay > 0 and i > 0:
-                await asyncio.sleep(delay)
-
-            for action in base_actions:
-                # Handle Direct Service Call or Fallback
-                if "service" in action:
-                    try:
-                        domain, service_name = action["service"].split(".", 1)
-                        target = action.get("target")
-                        data = action.get("data")
-                        await self.hass.services.async_call(
-                            domain, service_name, service_data=data, target=target, blocking=True
-                        )
-                    except Exception as err:
-                        _LOGGER.error("Failed call %s: %s", action["service"], err)
-                else:
-                    try:
-                        script_obj = script.Script(self.hass, [action], self.name, DOMAIN)
-                        await script_obj.async_run()
-                    except Exception as err:
-                        _LOGGER.error("Failed script: %s", err)
+                return
+            if self._state_key is None:
+                self._attr_native_value = value
+            else:
+                self.coordinator.restore_device_state({self._state_key: value})
 
+    @device_command
     async def async_set_native_value(self, value: float) -> None:
         """Set new value."""
-        if value == self._attr_native_value:
+        if value == self.native_value:
             return
 
-        diff = value - self._attr_native_value
+        diff = value - self.native_value
 
         # Restrict to increasing/decreasing by only one step at a time
-        direction = 1 if diff > 0 else -1
+        await self._async_step(1 if diff > 0 else -1)
+
+    async def _async_step(self, direction: int) -> bool:
+        """Send one inc/dec code and move the value by one step."""
         code = self._action.get(CONF_ACTION_CODE_INC) if direction > 0 else self._action.get(CONF_ACTION_CODE_DEC)
 
         if code:
-            await self._send_code(code, repeats=1)
+            if not await self._send_code(code, repeats=1):
+                return False
 
-        self._attr_native_value += direction * self._attr_native_step
+        self._set_value(self.native_value + direction * self._attr_native_step)
         self.async_write_ha_state()
+        return True
+
+    @callback
+    def async_start_value_hold(self, direction: int, interval: float, max_duration: float) -> None:
+        """Keep stepping the value in one direction until stopped or at its limit."""
+
+        @traced_command
+        async def hold() -> bool:
+            target = self.native_value + direction * self._attr_native_step
+            if not self._attr_native_min_value <= target <= self._attr_native_max_value:
+                return False
+            return await self._async_step(direction)
+
+        self.async_start_hold(hold, interval, max_duration)
@@ -0,0 +1,150 @@
+"""Device profiles shared by several RewIRe entries.
+
+A profile holds the device type and actions of a device model. Entries for
+identical devices reference it by id (`CONF_PROFILE`) instead of each storing
+a copy, keeping only what differs per device: name, blaster and initial
+state. Like entries, profiles keep only the hashes of their codes. The
+resolved profile, with its codes filled in, and its parsed `DeviceProfile` are
+built once and shared by all entries that use it.
+"""
+import logging
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
+
+from .code_store import async_get_code_store
+from .codes import collect_codes, inline_codes, normalize_codes, referenced_hashes, strip_codes
+from .const import (
+    CONF_ACTIONS,
+    CONF_DEVICE_TYPE,
+    CONF_PROFILE,
+    DATA_PROFILES,
+    DOMAIN,
+    PROFILE_STORAGE_KEY,
+    PROFILE_STORAGE_VERSION,
+)
+from .device_profile import DeviceProfile
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@callback
+def async_get_profiles(hass: HomeAssistant) -> "ProfileStore":
+    """Return the profiles shared by all entries."""
+    if (profiles := hass.data.get(DATA_PROFILES)) is None:
+        profiles = hass.data[DATA_PROFILES] = ProfileStore(hass)
+    return profiles
+
+
+async def async_prune_codes(hass: HomeAssistant, removed_entry_id: Optional[str] = None) -> None:
+    """Remove the stored IR codes that no entry or profile refers to anymore."""
+    used = async_get_profiles(hass).referenced_hashes()
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if entry.entry_id != removed_entry_id:
+            used |= referenced_hashes(dict(entry.data))
+    await async_get_code_store(hass).async_prune(used)
+
+
+class ProfileStore:
+    """Device profiles by id."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize without profiles until the stored ones are loaded."""
+        self.hass = hass
+        self._store: Store[dict[str, Any]] = Store(hass, PROFILE_STORAGE_VERSION, PROFILE_STORAGE_KEY)
+        self._profiles: dict[str, dict[str, Any]] = {}
+        # Resolved profiles, shared by the entries using them
+        self._resolved: dict[str, Mapping[str, Any]] = {}
+        self._device_profiles: dict[str, DeviceProfile] = {}
+        self._loaded = False
+
+    async def async_load(self) -> None:
+        """Load the profiles."""
+        if self._loaded:
+            return
+        self._loaded = True
+        if (data := await self._store.async_load()) is None:
+            return
+        self._profiles.update(data.get("profiles", {}))
+
+    def get(self, profile_id: str) -> Optional[dict[str, Any]]:
+        """Return a stored profile, with the hashes of its codes."""
+        return self._profiles.get(profile_id)
+
+    def names(self) -> dict[str, str]:
+        """Return the names of all profiles by id."""
+        return {profile_id: profile["name"] for profile_id, profile in self._profiles.items()}
+
+    def referenced_hashes(self) -> set[str]:
+        """Return the hashes of the codes of all profiles."""
+        used: set[str] = set()
+        for profile in self._profiles.values():
+            used |= referenced_hashes(profile)
+        return used
+
+    def resolve(self, profile_id: str) -> Optional[Mapping[str, Any]]:
+        """Return the device type and actions of a profile with their codes, or None if unknown.
+
+        Raises vol.Invalid if a code is missing from the code store.
+        """
+        if (resolved := self._resolved.get(profile_id)) is not None:
+            return resolved
+        if (profile := self._profiles.get(profile_id)) is None:
+            return None
+        data = inline_codes(
+            {CONF_DEVICE_TYPE: profile[CONF_DEVICE_TYPE], CONF_ACTIONS: profile[CONF_ACTIONS]},
+            async_get_code_store(self.hass).get,
+        )
+        resolved = self._resolved[profile_id] = MappingProxyType(data)
+        return resolved
+
+    def device_profile(self, profile_id: str) -> Optional[DeviceProfile]:
+        """Return the parsed codes and entity layout of a profile, or None if unknown.
+
+        Raises vol.Invalid if a code is missing from the code store.
+        """
+        if (device_profile := self._device_profiles.get(profile_id)) is not None:
+            return device_profile
+        if (resolved := self.resolve(profile_id)) is None:
+            return None
+        device_profile = self._device_profiles[profile_id] = DeviceProfile(resolved)
+        return device_profile
+
+    async def async_save(
+        self, profile_id: Optional[str], name: str, device_type: Optional[str], actions: list[dict[str, Any]]
+    ) -> str:
+        """Create or replace a profile and return its id.
+
+        Codes are normalized and moved to the code store. Raises vol.Invalid
+        on a malformed code.
+        """
+        await self.async_load()
+        data = normalize_codes({CONF_ACTIONS: actions})
+        await async_get_code_store(self.hass).async_add(collect_codes(data))
+
+        if profile_id is None:
+            profile_id = base = slugify(name) or "profile"
+            suffix = 1
+            while profile_id in self._profiles:
+                suffix += 1
+                profile_id = f"{base}_{suffix}"
+        self._profiles[profile_id] = {
+            "name": name,
+            CONF_DEVICE_TYPE: device_type,
+            CONF_ACTIONS: strip_codes(data)[CONF_ACTIONS],
+        }
+        self._resolved.pop(profile_id, None)
+        self._device_profiles.pop(profile_id, None)
+        await self._store.async_save({"profiles": self._profiles})
+        _LOGGER.debug("Saved device profile %s", profile_id)
+        return profile_id
+
+    @callback
+    def async_reload_entries(self, profile_id: str) -> None:
+        """Reload the entries that use a profile, and only those."""
+        for entry in self.hass.config_entries.async_entries(DOMAIN):
+            if entry.data.get(CONF_PROFILE) == profile_id:
+                self.hass.config_entries.async_schedule_reload(entry.entry_id)
@@ -0,0 +1,68 @@
+import logging
+from typing import Any, Optional
+
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN
+from .coordinator import RewireCoordinator
+from .entity import RewireEntity
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up diagnostic sensors."""
+    coordinator: RewireCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+    async_add_entities([RewireBlasterLatencySensor(coordinator, config_entry.entry_id)])
+
+
+class RewireBlasterLatencySensor(RewireEntity, SensorEntity):
+    """Median round-trip latency of the blaster, from its last calibration."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    # The frame gap is relearned as codes are sent; the profile is in the timing store already
+    _unrecorded_attributes = frozenset(
+        {"frame_gap_ms", "samples", "failures", "mean_ms", "p95_ms", "max_ms", "jitter_ms", "calibrated_at"}
+    )
+
+    def __init__(self, coordinator: RewireCoordinator, entry_id: str) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entry_id)
+        self._attr_name = f"{coordinator.config_entry.data.get('name')} Blaster Latency"
+        self._attr_unique_id = f"{DOMAIN}_{entry_id}_blaster_latency"
+
+    @property
+    def available(self) -> bool:
+        """Return True if the coordinator is; the latency is known even while the blaster is offline."""
+        return self.coordinator.last_update_success
+
+    @property
+    def _profile(self) -> Optional[dict[str, Any]]:
+        """Return the latency profile of the blaster."""
+        return self.coordinator.timing.latency(self.coordinator.blaster.key)
+
+    @property
+    def native_value(self) -> Optional[float]:
+        """Return the median latency."""
+        return None if self._profile is None else self._profile.get("p50_ms")
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the rest of the profile and the learned frame gap."""
+        attributes: dict[str, Any] = {
+            "frame_gap_ms": round(self.coordinator.timing.frame_gap(self.coordinator.blaster.key) * 1000, 1)
+        }
+        if (profile := self._profile) is not None:
+            attributes.update({key: value for key, value in profile.items() if key != "p50_ms"})
+        return attributes
@@ -0,0 +1,322 @@
+"""Services for RewIRe."""
+import asyncio
+import functools
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+from homeassistant.const import ATTR_ENTITY_ID, ATTR_STATE, ATTR_TEMPERATURE, STATE_OFF, STATE_ON
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
+from homeassistant.exceptions import HomeAssistantError
+
+from .codes import normalize_code
+from .const import (
+    ACTION_TYPES,
+    ATTR_BRIGHTNESS,
+    ATTR_CODE,
+    ATTR_COUNT,
+    ATTR_DIRECTION,
+    ATTR_FAN_MODE,
+    ATTR_HVAC_MODE,
+    ATTR_INTERVAL,
+    ATTR_MAX_DURATION,
+    ATTR_OSCILLATING,
+    ATTR_PERCENTAGE,
+    ATTR_SWING_MODE,
+    ATTR_TARGETS,
+    ATTR_VALUE,
+    CONF_ACTION_NAME,
+    CONF_ACTION_TYPE,
+    CONF_ACTIONS,
+    CONF_DEVICE_TYPE,
+    CONF_PROFILE,
+    DEFAULT_CALIBRATION_COUNT,
+    DEFAULT_HOLD_INTERVAL,
+    DEFAULT_HOLD_MAX_DURATION,
+    DIRECTION_DECREASE,
+    DIRECTION_INCREASE,
+    DOMAIN,
+    HOLD_MAX_DURATION_LIMIT,
+    MAX_CALIBRATION_COUNT,
+    SERVICE_CALIBRATE_BLASTER,
+    SERVICE_SET_MANY,
+    SERVICE_START_HOLD,
+    SERVICE_STOP_HOLD,
+    SERVICE_UPDATE_PROFILE,
+)
+from .entity import RewireEntity
+from .profiles import async_get_profiles, async_prune_codes
+from .trace import collect_spans
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _hvac_mode(value: Any) -> Any:
+    """Validate an HVAC mode, importing the climate platform only when a call has one."""
+    from homeassistant.components.climate import HVACMode  # pylint: disable=import-outside-toplevel
+
+    return vol.Coerce(HVACMode)(value)
+
+
+SET_MANY_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_TARGETS): vol.All(
+            cv.ensure_list,
+            [
+                vol.Schema(
+                    {
+                        vol.Required(ATTR_ENTITY_ID): cv.entity_id,
+                        vol.Optional(ATTR_STATE): vol.In([STATE_ON, STATE_OFF]),
+                        vol.Optional(ATTR_HVAC_MODE): _hvac_mode,
+                        vol.Optional(ATTR_TEMPERATURE): vol.Coerce(float),
+                        vol.Optional(ATTR_FAN_MODE): cv.string,
+                        vol.Optional(ATTR_SWING_MODE): cv.string,
+                        vol.Optional(ATTR_PERCENTAGE): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+                        vol.Optional(ATTR_OSCILLATING): cv.boolean,
+                        vol.Optional(ATTR_BRIGHTNESS): vol.All(vol.Coerce(int), vol.Range(min=0, max=255)),
+                        vol.Optional(ATTR_VALUE): vol.Coerce(float),
+                    }
+                )
+            ],
+        )
+    }
+)
+
+START_HOLD_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.entity_ids,
+        vol.Optional(ATTR_DIRECTION): vol.In([DIRECTION_INCREASE, DIRECTION_DECREASE]),
+        vol.Optional(ATTR_INTERVAL, default=DEFAULT_HOLD_INTERVAL): vol.All(
+            vol.Coerce(float), vol.Range(min=0.05, max=10)
+        ),
+        vol.Optional(ATTR_MAX_DURATION, default=DEFAULT_HOLD_MAX_DURATION): vol.All(
+            vol.Coerce(float), vol.Range(min=0.1, max=HOLD_MAX_DURATION_LIMIT)
+        ),
+    }
+)
+
+STOP_HOLD_SCHEMA = vol.Schema({vol.Required(ATTR_ENTITY_ID): cv.entity_ids})
+
+CALIBRATE_BLASTER_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.entity_id,
+        # Sent in its canonical form, like the stored codes
+        vol.Required(ATTR_CODE): normalize_code,
+        vol.Optional(ATTR_COUNT, default=DEFAULT_CALIBRATION_COUNT): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_CALIBRATION_COUNT)
+        ),
+    }
+)
+
+UPDATE_PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_PROFILE): cv.string,
+        vol.Optional("name"): cv.string,
+        vol.Required(CONF_ACTIONS): vol.All(
+            cv.ensure_list,
+            [
+                vol.Schema(
+                    {vol.Required(CONF_ACTION_NAME): cv.string, vol.Required(CONF_ACTION_TYPE): vol.In(ACTION_TYPES)},
+                    extra=vol.ALLOW_EXTRA,
+                )
+            ],
+        ),
+    }
+)
+
+Step = Callable[[], Awaitable[Any]]
+
+
+def _plan(entity: RewireEntity, target: dict[str, Any]) -> list[Step]:
+    """Return the entity calls that bring the entity to the target state, in order."""
+    domain = entity.entity_id.split(".", 1)[0]
+    state = target.get(ATTR_STATE)
+    steps: list[Step] = []
+
+    if state == STATE_OFF:
+        # Nothing else is meaningful once the device is off
+        if domain == "climate":
+            # The climate platform is loaded, it set up this entity
+            from homeassistant.components.climate import HVACMode  # pylint: disable=import-outside-toplevel
+
+            return [lambda: entity.async_set_hvac_mode(HVACMode.OFF)]
+        if domain in ("fan", "light", "switch"):
+            return [lambda: entity.async_turn_off()]
+        return []
+
+    if domain == "climate":
+        if ATTR_HVAC_MODE in target:
+            steps.append(lambda: entity.async_set_hvac_mode(target[ATTR_HVAC_MODE]))
+        elif state == STATE_ON:
+            steps.append(lambda: entity.async_turn_on())
+        if ATTR_TEMPERATURE in target:
+            steps.append(lambda: entity.async_set_temperature(temperature=target[ATTR_TEMPERATURE]))
+        if ATTR_FAN_MODE in target:
+            steps.append(lambda: entity.async_set_fan_mode(target[ATTR_FAN_MODE]))
+        if ATTR_SWING_MODE in target:
+            steps.append(lambda: entity.async_set_swing_mode(target[ATTR_SWING_MODE]))
+    elif domain == "fan":
+        if state == STATE_ON:
+            steps.append(lambda: entity.async_turn_on())
+        if ATTR_PERCENTAGE in target:
+            steps.append(lambda: entity.async_set_percentage(target[ATTR_PERCENTAGE]))
+        if ATTR_OSCILLATING in target:
+            steps.append(lambda: entity.async_oscillate(target[ATTR_OSCILLATING]))
+    elif domain == "light":
+        if state == STATE_ON or ATTR_BRIGHTNESS in target:
+            kwargs = {ATTR_BRIGHTNESS: target[ATTR_BRIGHTNESS]} if ATTR_BRIGHTNESS in target else {}
+            steps.append(lambda: entity.async_turn_on(**kwargs))
+    elif domain == "switch":
+        if state == STATE_ON:
+            steps.append(lambda: entity.async_turn_on())
+    elif domain == "number":
+        if ATTR_VALUE in target:
+            steps.append(lambda: entity.async_set_native_value(target[ATTR_VALUE]))
+    elif domain == "button":
+        steps.append(lambda: entity.async_press())
+
+    return steps
+
+
+async def _async_run_steps(steps: list[Step]) -> None:
+    """Run the steps of a plan in order."""
+    for step in steps:
+        await step()
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the RewIRe services."""
+
+    def find_entity(entity_id: str) -> Optional[RewireEntity]:
+        for coordinator in hass.data.get(DOMAIN, {}).values():
+            if (entity := coordinator.entities.get(entity_id)) is not None:
+                return entity
+        return None
+
+    async def run_group(group: list[tuple[RewireEntity, list[Step]]], call: ServiceCall) -> dict[str, Any]:
+        """Run the plans of all entities on one blaster, in order."""
+        results = {}
+        for entity, steps in group:
+            entity.async_set_context(call.context)
+            error = None
+            with collect_spans() as spans:
+                try:
+                    # One device command: the entity's state is written once, after the last step
+                    await entity.async_run_command(functools.partial(_async_run_steps, steps))
+                except HomeAssistantError as err:
+                    _LOGGER.error("Failed to set %s: %s", entity.entity_id, err)
+                    error = str(err)
+                except Exception as err:  # pylint: disable=broad-except
+                    # One broken target must not take the results of the others with it
+                    _LOGGER.exception("Unexpected error setting %s", entity.entity_id)
+                    error = str(err) or type(err).__name__
+            results[entity.entity_id] = {
+                "success": error is None and all(span.success for span in spans),
+                "commands": len(spans),
+            }
+            if error:
+                results[entity.entity_id]["error"] = error
+        return results
+
+    async def async_set_many(call: ServiceCall) -> ServiceResponse:
+        """Bring many entities to their target state, one task per blaster."""
+        results: dict[str, Any] = {}
+        groups: dict[str, list[tuple[RewireEntity, list[Step]]]] = {}
+
+        for target in call.data[ATTR_TARGETS]:
+            entity_id = target[ATTR_ENTITY_ID]
+            if (entity := find_entity(entity_id)) is None:
+                results[entity_id] = {"success": False, "commands": 0, "error": "unknown entity"}
+                continue
+            groups.setdefault(entity.coordinator.blaster.key, []).append((entity, _plan(entity, target)))
+
+        # Different blasters run concurrently; one blaster keeps the requested order
+        for group_results in await asyncio.gather(*(run_group(group, call) for group in groups.values())):
+            results.update(group_results)
+
+        return {"results": results}
+
+    async def async_start_hold(call: ServiceCall) -> None:
+        """Start repeating the code of buttons or the steps of numbers."""
+        interval = call.data[ATTR_INTERVAL]
+        max_duration = call.data[ATTR_MAX_DURATION]
+        # Imported here: only loaded platforms have entities to hold, and the integration loads this module
+        from .button import RewireButton  # pylint: disable=import-outside-toplevel
+        from .number import RewireNumber  # pylint: disable=import-outside-toplevel
+
+        # Check every target first: a bad one must not leave the holds of the others running
+        holds: list[tuple[RewireEntity, Callable[[], None]]] = []
+        for entity_id in call.data[ATTR_ENTITY_ID]:
+            entity = find_entity(entity_id)
+            if isinstance(entity, RewireButton):
+                holds.append((entity, functools.partial(entity.async_start_press_hold, interval, max_duration)))
+            elif isinstance(entity, RewireNumber):
+                if ATTR_DIRECTION not in call.data:
+                    raise HomeAssistantError(f"Holding {entity_id} needs a direction")
+                direction = 1 if call.data[ATTR_DIRECTION] == DIRECTION_INCREASE else -1
+                holds.append(
+                    (entity, functools.partial(entity.async_start_value_hold, direction, interval, max_duration))
+                )
+            else:
+                raise HomeAssistantError(f"{entity_id} is not a RewIRe button or number")
+
+        for entity, start in holds:
+            entity.async_set_context(call.context)
+            start()
+
+    async def async_stop_hold(call: ServiceCall) -> None:
+        """Stop running holds."""
+        for entity_id in call.data[ATTR_ENTITY_ID]:
+            if (entity := find_entity(entity_id)) is not None:
+                entity.async_stop_hold()
+
+    async def async_calibrate_blaster(call: ServiceCall) -> ServiceResponse:
+        """Measure the round-trip latency of the blaster of an entity."""
+        entity_id = call.data[ATTR_ENTITY_ID]
+        if (entity := find_entity(entity_id)) is None:
+            raise HomeAssistantError(f"{entity_id} is not a RewIRe entity")
+        coordinator = entity.coordinator
+        if not coordinator.transports:
+            raise HomeAssistantError(f"{entity_id} has no blaster action")
+        profile = await coordinator.blaster.async_calibrate(
+            coordinator.transports, call.data[ATTR_CODE], call.data[ATTR_COUNT], coordinator.retry_policy, call.context
+        )
+        return {"blaster": coordinator.blaster.key, **profile}
+
+    async def async_update_profile(call: ServiceCall) -> None:
+        """Replace the actions of a device profile and reload the devices using it."""
+        profiles = async_get_profiles(hass)
+        profile_id = call.data[CONF_PROFILE]
+        if (profile := profiles.get(profile_id)) is None:
+            raise HomeAssistantError(f"Unknown device profile {profile_id}")
+        try:
+            await profiles.async_save(
+                profile_id, call.data.get("name", profile["name"]), profile[CONF_DEVICE_TYPE], call.data[CONF_ACTIONS]
+            )
+        except vol.Invalid as err:
+            path = ".".join(str(part) for part in err.path)
+            raise HomeAssistantError(f"Invalid IR code in {path}: {err.msg}") from err
+        profiles.async_reload_entries(profile_id)
+        await async_prune_codes(hass)
+
+    hass.services.async_register(DOMAIN, SERVICE_START_HOLD, async_start_hold, schema=START_HOLD_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_STOP_HOLD, async_stop_hold, schema=STOP_HOLD_SCHEMA)
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CALIBRATE_BLASTER,
+        async_calibrate_blaster,
+        schema=CALIBRATE_BLASTER_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(DOMAIN, SERVICE_UPDATE_PROFILE, async_update_profile, schema=UPDATE_PROFILE_SCHEMA)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_MANY,
+        async_set_many,
+        schema=SET_MANY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
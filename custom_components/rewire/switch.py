@@ -1,11 +1,9 @@
-import copy
 import logging
-from typing import Any
+from typing import Any, Mapping
 
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers import script
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import (
@@ -16,15 +14,10 @@ from .const import (
     CONF_ACTION_CODE_ON,
     CONF_ACTION_NAME,
     CONF_ACTION_TYPE,
-    CONF_ACTIONS,
-    CONF_BLASTER_ACTION,
-    CONF_DEVICE_TYPE,
-    DEVICE_TYPE_AC,
-    DEVICE_TYPE_FAN,
     DOMAIN,
 )
 from .coordinator import RewireCoordinator
-from .entity import RewireEntity
+from .entity import RewireEntity, device_command
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,30 +29,18 @@ async def async_setup_entry(
 ) -> None:
     """Set up switch entity."""
     coordinator: RewireCoordinator = hass.data[DOMAIN][config_entry.entry_id]
-    actions = config_entry.data.get(CONF_ACTIONS, [])
-
-    device_type = config_entry.data.get(CONF_DEVICE_TYPE)
-
-    entities = []
-    for action in actions:
-        action_type = action.get(CONF_ACTION_TYPE)
-
-        # Determine if action is already handled by the main device entity
-        handled = False
-        if device_type in (DEVICE_TYPE_FAN, DEVICE_TYPE_AC, "light"):
-            if action_type == ACTION_TYPE_POWER:
-                handled = True
-
-        if not handled and action_type in (ACTION_TYPE_POWER, ACTION_TYPE_TOGGLE):
-            entities.append(RewireSwitch(coordinator, config_entry.entry_id, action))
 
+    # Power actions of devices with a main entity are left out, that entity sends them
+    entities = [
+        RewireSwitch(coordinator, config_entry.entry_id, action) for action in coordinator.device_profile.switches
+    ]
     async_add_entities(entities)
 
 
 class RewireSwitch(RewireEntity, SwitchEntity):
     """Switch representation of a button (or toggle)."""
 
-    def __init__(self, coordinator: RewireCoordinator, entry_id: str, action: dict[str, Any]) -> None:
+    def __init__(self, coordinator: RewireCoordinator, entry_id: str, action: Mapping[str, Any]) -> None:
         """Initialize the switch."""
         super().__init__(coordinator, entry_id)
         self._action = action
@@ -69,57 +50,43 @@ class RewireSwitch(RewireEntity, SwitchEntity):
         # Override unique_id and name for this specific entity
         self._attr_name = f"{coordinator.config_entry.data.get('name')} {self._action_name}"
         self._attr_unique_id = f"{DOMAIN}_{entry_id}_{self._action_name.lower().replace(' ', '_')}"
-        self._attr_is_on = False  # Optimistic state
-
-        # Load blaster config
-        self._blaster_actions = coordinator.config_entry.data.get(CONF_BLASTER_ACTION, [])
-
-    async def _send_code(self, code: str) -> None:
-        """Helper to send the IR code."""
-        if not self._blaster_actions or not code:
+        # Power switches share the device's power state (and its feedback); toggles keep their own
+        self._power = self._action_type == ACTION_TYPE_POWER
+        self._attr_is_on = False  # Optimistic state of a toggle
+
+    @property
+    def is_on(self) -> bool:
+        """Return the assumed state."""
+        if self._power:
+            return bool(self.coordinator.device_state.get("power"))
+        return bool(self._attr_is_on)
+
+    def _set_on(self, is_on: bool) -> None:
+        """Apply the state change of a code that was sent."""
+        if self._power:
+            self.coordinator.set_device_state({"power": is_on})
             return
+        self._attr_is_on = is_on
+        self.async_write_ha_state()
 
-        actions = copy.deepcopy(self._blaster_actions)
-
-        def inject_code(obj: Any) -> None:
-            if isinstance(obj, dict):
-                for key, value in obj.items():
-                    if key in ("command", "code", "value", "payload") and value == "IR_CODE":
-                        obj[key] = [code] if key == "command" else code
-                    elif isinstance(value, (dict, list)):
-                        inject_code(value)
-            elif isinstance(obj, list):
-                for item in obj:
-                    inject_code(item)
-
-        inject_code(actions)
-
-        for action in actions:
-            # Handle Direct Service Call (New Flow) or Fallback
-            if "service" in action:
-                try:
-                    domain, service_name = action["service"].split(".", 1)
-                    target = action.get("target")
-                    data = action.get("data")
-                    await self.hass.services.async_call(
-                        domain, service_name, service_data=data, target=target, blocking=True
-                    )
-                except Exception as err:
-                    _LOGGER.error("Failed call %s: %s", action["service"], err)
-            else:
-                try:
-                    script_obj = script.Script(self.hass, [action], self.name, DOMAIN)
-                    await script_obj.async_run()
-                except Exception as err:
-                    _LOGGER.error("Failed script: %s", err)
+    def _has_discrete_codes(self) -> bool:
+        """Return True if the switch has separate on and off codes."""
+        code_on = self._action.get(CONF_ACTION_CODE_ON)
+        code_off = self._action.get(CONF_ACTION_CODE_OFF)
+        return self._action_type == ACTION_TYPE_POWER and bool(code_on and code_off) and code_on != code_off
 
+    @device_command
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the entity on."""
         code = self._action.get(CONF_ACTION_CODE_ON) or self._action.get(CONF_ACTION_CODE)
-        await self._send_code(code)
-        self._attr_is_on = True
-        self.async_write_ha_state()
+        discrete = self._has_discrete_codes()
+        if discrete and self._is_redundant(self.is_on, True):
+            return
+        if not await self._send_code(code, discrete=discrete):
+            return
+        self._set_on(True)
 
+    @device_command
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the entity off."""
         if self._action_type == ACTION_TYPE_POWER:
@@ -133,6 +100,17 @@ class RewireSwitch(RewireEntity, SwitchEntity):
             # Toggle type
             code = self._action.get(CONF_ACTION_CODE)
 
-        await self._send_code(code)
-        self._attr_is_on = False
-        self.async_write_ha_state()
+        discrete = self._has_discrete_codes()
+        if discrete and self._is_redundant(self.is_on, False):
+            return
+        if not await self._send_code(code, discrete=discrete):
+            return
+        self._set_on(False)
+
+    @device_command
+    async def async_toggle(self, **kwargs: Any) -> None:
+        """Toggle the entity, deciding on the state once the device is free."""
+        if self.is_on:
+            await self.async_turn_off(**kwargs)
+        else:
+            await self.async_turn_on(**kwargs)
@@ -0,0 +1,156 @@
+"""Learned send timing and latency profiles for RewIRe blasters and devices."""
+import logging
+import statistics
+from typing import Any, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DATA_TIMING,
+    DEFAULT_FRAME_GAP,
+    FRAME_GAP_DECREASE_AFTER,
+    FRAME_GAP_STEP,
+    MAX_CODE_REPEATS,
+    MAX_FRAME_GAP,
+    MIN_FRAME_GAP,
+    REPEATS_DECREASE_AFTER,
+    TIMING_SAVE_DELAY,
+    TIMING_STORAGE_KEY,
+    TIMING_STORAGE_VERSION,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def latency_profile(samples: list[float], failures: int) -> dict[str, Any]:
+    """Summarize calibration round trips (in seconds) as a latency profile in ms."""
+
+    def ms(value: Optional[float]) -> Optional[float]:
+        return None if value is None else round(value * 1000, 1)
+
+    ordered = sorted(samples)
+    return {
+        "samples": len(samples),
+        "failures": failures,
+        "mean_ms": ms(statistics.fmean(ordered)) if ordered else None,
+        "p50_ms": ms(statistics.median(ordered)) if ordered else None,
+        "p95_ms": ms(ordered[min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))]) if ordered else None,
+        "max_ms": ms(ordered[-1]) if ordered else None,
+        "jitter_ms": ms(statistics.pstdev(ordered)) if ordered else None,
+        "calibrated_at": dt_util.utcnow().isoformat(),
+    }
+
+
+@callback
+def async_get_timing(hass: HomeAssistant) -> "AdaptiveTiming":
+    """Return the timing shared by all blasters and entries."""
+    if (timing := hass.data.get(DATA_TIMING)) is None:
+        timing = hass.data[DATA_TIMING] = AdaptiveTiming(hass)
+    return timing
+
+
+class AdaptiveTiming:
+    """Learns the smallest reliable frame gap per blaster and repeat count per device.
+
+    Both adapt AIMD-style: a lost frame backs off at once (the gap doubles, the
+    repeats go up by one), while a long run of clean sends tightens them by a
+    single step.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize with defaults until the stored values are loaded."""
+        self._store: Store[dict[str, Any]] = Store(hass, TIMING_STORAGE_VERSION, TIMING_STORAGE_KEY)
+        self._gaps: dict[str, float] = {}
+        self._repeats: dict[str, int] = {}
+        self._latency: dict[str, dict[str, Any]] = {}
+        # Clean sends since the last change, per blaster / device
+        self._gap_streaks: dict[str, int] = {}
+        self._repeat_streaks: dict[str, int] = {}
+        self._loaded = False
+
+    async def async_load(self) -> None:
+        """Load the learned values."""
+        if self._loaded:
+            return
+        self._loaded = True
+        if (data := await self._store.async_load()) is None:
+            return
+        self._gaps.update({key: float(gap) for key, gap in data.get("blasters", {}).items()})
+        self._repeats.update({key: int(repeats) for key, repeats in data.get("devices", {}).items()})
+        self._latency.update(data.get("latency", {}))
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Persist the learned values after a quiet period."""
+        self._store.async_delay_save(self._data_to_save, TIMING_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to store."""
+        return {"blasters": dict(self._gaps), "devices": dict(self._repeats), "latency": dict(self._latency)}
+
+    def frame_gap(self, blaster: str) -> float:
+        """Return the minimum gap between two frames on a blaster."""
+        return self._gaps.get(blaster, DEFAULT_FRAME_GAP)
+
+    def code_repeats(self, device: str) -> int:
+        """Return how often a discrete code is sent to a device."""
+        return self._repeats.get(device, 1)
+
+    def latency(self, blaster: str) -> Optional[dict[str, Any]]:
+        """Return the calibrated latency profile of a blaster, if any."""
+        return self._latency.get(blaster)
+
+    @callback
+    def async_set_latency(self, blaster: str, profile: dict[str, Any]) -> None:
+        """Store the latency profile of a calibration run."""
+        self._latency[blaster] = profile
+        self._async_schedule_save()
+
+    @callback
+    def async_record_frame(self, blaster: str, success: bool) -> None:
+        """Adapt the frame gap of a blaster to the outcome of a frame."""
+        gap = self.frame_gap(blaster)
+        if not success:
+            self._gap_streaks[blaster] = 0
+            new_gap = min(MAX_FRAME_GAP, max(gap * 2, MIN_FRAME_GAP))
+        else:
+            streak = self._gap_streaks[blaster] = self._gap_streaks.get(blaster, 0) + 1
+            if streak < FRAME_GAP_DECREASE_AFTER:
+                return
+            self._gap_streaks[blaster] = 0
+            new_gap = max(MIN_FRAME_GAP, round(gap - FRAME_GAP_STEP, 3))
+
+        if new_gap != gap:
+            _LOGGER.debug("Frame gap of blaster %s: %.3fs -> %.3fs", blaster, gap, new_gap)
+            self._gaps[blaster] = new_gap
+            self._async_schedule_save()
+
+    @callback
+    def async_record_delivery(self, device: str, delivered: bool) -> None:
+        """Adapt the repeats of a device to a command confirmed or contradicted by feedback."""
+        repeats = self.code_repeats(device)
+        if not delivered:
+            self._repeat_streaks[device] = 0
+            new_repeats = min(MAX_CODE_REPEATS, repeats + 1)
+        else:
+            streak = self._repeat_streaks[device] = self._repeat_streaks.get(device, 0) + 1
+            if streak < REPEATS_DECREASE_AFTER:
+                return
+            self._repeat_streaks[device] = 0
+            new_repeats = max(1, repeats - 1)
+
+        if new_repeats != repeats:
+            _LOGGER.debug("Code repeats of %s: %s -> %s", device, repeats, new_repeats)
+            self._repeats[device] = new_repeats
+            self._async_schedule_save()
+
+    def as_dict(self, blaster: str, device: str) -> dict[str, Any]:
+        """Return the learned values of a blaster and device for diagnostics."""
+        return {
+            "frame_gap": self.frame_gap(blaster),
+            "code_repeats": self.code_repeats(device),
+            "latency": self.latency(blaster),
+        }
@@ -0,0 +1,127 @@
+"""Per-command trace spans for RewIRe."""
+import functools
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator, Optional, TypeVar
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util.ulid import ulid_now
+
+from .const import EVENT_COMMAND, TRACE_BUFFER_SIZE
+
+_T = TypeVar("_T")
+
+# (entity method name, monotonic entry time) of the entity call currently running
+_CALL_ENTRY: ContextVar[Optional[tuple[str, float]]] = ContextVar("rewire_call_entry", default=None)
+# Receives the spans completed in the current context, see collect_spans()
+_COLLECTOR: ContextVar[Optional[list["CommandSpan"]]] = ContextVar("rewire_span_collector", default=None)
+
+
+def traced_command(func: Callable[..., Awaitable[_T]]) -> Callable[..., Awaitable[_T]]:
+    """Record the entry time of an entity command for the spans it produces."""
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> _T:
+        # Nested calls (e.g. turn_off -> set_hvac_mode) keep the outermost entry
+        if _CALL_ENTRY.get() is not None:
+            return await func(*args, **kwargs)
+
+        token = _CALL_ENTRY.set((func.__name__, time.monotonic()))
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _CALL_ENTRY.reset(token)
+
+    return wrapper
+
+
+@contextmanager
+def collect_spans() -> Iterator[list["CommandSpan"]]:
+    """Collect the spans completed by commands awaited inside the block."""
+    spans: list[CommandSpan] = []
+    token = _COLLECTOR.set(spans)
+    try:
+        yield spans
+    finally:
+        _COLLECTOR.reset(token)
+
+
+class CommandSpan:
+    """Timing of a single IR command from entity call to blaster completion."""
+
+    __slots__ = (
+        "trace_id",
+        "entity_id",
+        "call",
+        "entered",
+        "built",
+        "dispatched",
+        "completed",
+        "success",
+    )
+
+    def __init__(self, entity_id: Optional[str]) -> None:
+        """Open a span, inheriting the entry time of the running entity call."""
+        now = time.monotonic()
+        call, entered = _CALL_ENTRY.get() or ("direct", now)
+        self.trace_id = ulid_now()
+        self.entity_id = entity_id
+        self.call = call
+        self.entered = entered
+        self.built: Optional[float] = None
+        self.dispatched: Optional[float] = None
+        self.completed: Optional[float] = None
+        self.success = False
+
+    def mark_built(self) -> None:
+        """Record that the blaster payload has been built."""
+        self.built = time.monotonic()
+
+    def mark_dispatched(self) -> None:
+        """Record the first dispatch to the blaster."""
+        if self.dispatched is None:
+            self.dispatched = time.monotonic()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the span as event/diagnostics data (offsets in ms from entry)."""
+
+        def offset(stamp: Optional[float]) -> Optional[float]:
+            return None if stamp is None else round((stamp - self.entered) * 1000, 2)
+
+        return {
+            "trace_id": self.trace_id,
+            "entity_id": self.entity_id,
+            "call": self.call,
+            "build_ms": offset(self.built),
+            "dispatch_ms": offset(self.dispatched),
+            "total_ms": offset(self.completed),
+            "success": self.success,
+        }
+
+
+class CommandTracer:
+    """Collects completed spans in a bounded buffer and emits them as events."""
+
+    def __init__(self, hass: HomeAssistant, maxlen: int = TRACE_BUFFER_SIZE) -> None:
+        """Initialize the tracer."""
+        self.hass = hass
+        self._spans: deque[CommandSpan] = deque(maxlen=maxlen)
+
+    def start(self, entity_id: Optional[str]) -> CommandSpan:
+        """Open a span for a command about to be sent."""
+        return CommandSpan(entity_id)
+
+    def finish(self, span: CommandSpan, success: bool) -> None:
+        """Close a span, buffer it and fire the command event."""
+        span.completed = time.monotonic()
+        span.success = success
+        self._spans.append(span)
+        if (collector := _COLLECTOR.get()) is not None:
+            collector.append(span)
+        self.hass.bus.async_fire(EVENT_COMMAND, span.as_dict())
+
+    def export(self) -> list[dict[str, Any]]:
+        """Return buffered spans, oldest first."""
+        return [span.as_dict() for span in self._spans]
@@ -0,0 +1,261 @@
+"""Blaster transports for RewIRe.
+
+A transport sends one IR code through one configured blaster action. The
+action template is inspected once at setup: the shapes the config flow
+produces (remote.send_command, mqtt.publish, text/input_text.set_value) get an
+adapter that calls the target entity or integration directly, skipping the
+per-call schema validation of the service registry. Anything else goes
+through the generic service (or script) path.
+"""
+import abc
+import copy
+import logging
+from typing import Any, Optional
+
+import voluptuous as vol
+from homeassistant.components.remote import (
+    ATTR_COMMAND,
+    ATTR_DELAY_SECS,
+    ATTR_DEVICE,
+    ATTR_HOLD_SECS,
+    ATTR_NUM_REPEATS,
+    DEFAULT_HOLD_SECS,
+    DEFAULT_NUM_REPEATS,
+)
+from homeassistant.const import ATTR_DEVICE_ID, ATTR_ENTITY_ID
+from homeassistant.core import Context, HomeAssistant
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.entity_component import DATA_INSTANCES
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# Placeholder in blaster action templates that is replaced by the IR code
+CODE_PLACEHOLDER = "IR_CODE"
+
+REMOTE_DATA_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_COMMAND): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_DEVICE): cv.string,
+        vol.Optional(ATTR_NUM_REPEATS, default=DEFAULT_NUM_REPEATS): cv.positive_int,
+        vol.Optional(ATTR_DELAY_SECS): vol.Coerce(float),
+        vol.Optional(ATTR_HOLD_SECS, default=DEFAULT_HOLD_SECS): vol.Coerce(float),
+    }
+)
+
+MQTT_DATA_SCHEMA = vol.Schema(
+    {
+        vol.Required("topic"): cv.string,
+        vol.Required("payload"): CODE_PLACEHOLDER,
+        vol.Optional("qos", default=0): vol.All(vol.Coerce(int), vol.In([0, 1, 2])),
+        vol.Optional("retain", default=False): cv.boolean,
+    }
+)
+
+
+def _inject_code(obj: Any, code: str) -> None:
+    """Recursively inject IR code into action data."""
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            if key in ("command", "code", "value", "payload") and value == CODE_PLACEHOLDER:
+                obj[key] = [code] if key == "command" else code
+            elif isinstance(value, (dict, list)):
+                _inject_code(value, code)
+    elif isinstance(obj, list):
+        for item in obj:
+            _inject_code(item, code)
+
+
+class Transport:
+    """Sends IR codes through one blaster action."""
+
+    name = "generic"
+
+    def __init__(self, hass: HomeAssistant, action: dict[str, Any], script_name: str) -> None:
+        """Initialize the transport."""
+        self.hass = hass
+        self.action = action
+        self._script_name = script_name
+
+    def describe(self) -> str:
+        """Return a short description for logs."""
+        return str(self.action.get("service", self.action))
+
+    async def async_send(self, code: str, context: Optional[Context]) -> None:
+        """Send a code through the generic service or script path."""
+        action = copy.deepcopy(self.action)
+        _inject_code(action, code)
+
+        # Handle Service Call (preferred for new config flow)
+        if "service" in action:
+            domain, service_name = action["service"].split(".", 1)
+            await self.hass.services.async_call(
+                domain,
+                service_name,
+                service_data=action.get("data"),
+                target=action.get("target"),
+                context=context,
+                blocking=True,
+            )
+        # Fallback for Device Actions or other script syntax (Old Config)
+        else:
+            # Imported here: only legacy entries need the script engine
+            from homeassistant.helpers import script  # pylint: disable=import-outside-toplevel
+
+            script_obj = script.Script(self.hass, [action], self._script_name, DOMAIN)
+            await script_obj.async_run(context=context)
+
+
+class EntityTransport(Transport, abc.ABC):
+    """Calls a method of the target entities directly.
+
+    Falls back to the generic path while an entity is not loaded, so a blaster
+    integration that is still starting behaves like a service call would.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        action: dict[str, Any],
+        script_name: str,
+        domain: str,
+        entity_ids: list[str],
+    ) -> None:
+        """Initialize the transport."""
+        super().__init__(hass, action, script_name)
+        self._domain = domain
+        self._entity_ids = entity_ids
+
+    def _async_entities(self) -> Optional[list[Entity]]:
+        """Return the target entity objects, or None if one is not loaded."""
+        component = self.hass.data.get(DATA_INSTANCES, {}).get(self._domain)
+        if component is None:
+            return None
+        entities = []
+        for entity_id in self._entity_ids:
+            if (entity := component.get_entity(entity_id)) is None:
+                return None
+            entities.append(entity)
+        return entities
+
+    async def async_send(self, code: str, context: Optional[Context]) -> None:
+        """Send a code to every target entity."""
+        if (entities := self._async_entities()) is None:
+            await super().async_send(code, context)
+            return
+
+        for entity in entities:
+            # Like entity services, unavailable entities are skipped
+            if not entity.available:
+                continue
+            if context is not None:
+                entity.async_set_context(context)
+            await self._async_send_entity(entity, code)
+
+    @abc.abstractmethod
+    async def _async_send_entity(self, entity: Entity, code: str) -> None:
+        """Send a code to a single entity."""
+
+
+class RemoteTransport(EntityTransport):
+    """Sends codes with RemoteEntity.async_send_command."""
+
+    name = "remote"
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the transport with the validated command options."""
+        super().__init__(*args, **kwargs)
+        options = REMOTE_DATA_SCHEMA(self.action.get("data", {}))
+        options.pop(ATTR_COMMAND)
+        self._options = options
+
+    async def _async_send_entity(self, entity: Entity, code: str) -> None:
+        """Send a code to a single remote."""
+        await entity.async_send_command([code], **self._options)
+
+
+class TextTransport(EntityTransport):
+    """Sends codes with TextEntity/InputText.async_set_value."""
+
+    name = "text"
+
+    async def _async_send_entity(self, entity: Entity, code: str) -> None:
+        """Write a code to a single text entity."""
+        # Same checks as the text.set_value service
+        if self._domain == "text":
+            if not entity.min <= len(code) <= entity.max:
+                raise ValueError(f"IR code length must be between {entity.min} and {entity.max} characters")
+            if entity.pattern_cmp and not entity.pattern_cmp.match(code):
+                raise ValueError(f"IR code does not match pattern {entity.pattern}")
+        await entity.async_set_value(code)
+
+
+class MqttTransport(Transport):
+    """Publishes codes with mqtt.async_publish."""
+
+    name = "mqtt"
+
+    def __init__(self, *args: Any) -> None:
+        """Initialize the transport with the validated topic."""
+        super().__init__(*args)
+        data = MQTT_DATA_SCHEMA(self.action.get("data", {}))
+        self._topic = data["topic"]
+        self._qos = data["qos"]
+        self._retain = data["retain"]
+
+    async def async_send(self, code: str, context: Optional[Context]) -> None:
+        """Publish a code."""
+        # Imported here: MQTT is optional and heavy to import
+        from homeassistant.components import mqtt  # pylint: disable=import-outside-toplevel
+
+        await mqtt.async_publish(self.hass, self._topic, code, self._qos, self._retain)
+
+
+def _target_entity_ids(hass: HomeAssistant, target: dict[str, Any], domain: str) -> list[str]:
+    """Resolve the entities of `domain` referenced by an action target."""
+    entity_ids = cv.ensure_list(target.get(ATTR_ENTITY_ID))
+    if device_ids := cv.ensure_list(target.get(ATTR_DEVICE_ID)):
+        registry = er.async_get(hass)
+        for device_id in device_ids:
+            entity_ids.extend(
+                entry.entity_id for entry in er.async_entries_for_device(registry, device_id) if entry.domain == domain
+            )
+    return [entity_id for entity_id in entity_ids if entity_id.split(".", 1)[0] == domain]
+
+
+def _build_transport(hass: HomeAssistant, action: dict[str, Any], script_name: str) -> Transport:
+    """Return the fastest transport able to run a blaster action."""
+    service = action.get("service")
+    target = action.get("target") or {}
+    if not isinstance(service, str) or not isinstance(target, dict):
+        return Transport(hass, action, script_name)
+
+    # Other target kinds (areas, labels) need the service helper to resolve them
+    if set(target) - {ATTR_ENTITY_ID, ATTR_DEVICE_ID}:
+        return Transport(hass, action, script_name)
+
+    try:
+        if service == "remote.send_command":
+            if entity_ids := _target_entity_ids(hass, target, "remote"):
+                return RemoteTransport(hass, action, script_name, "remote", entity_ids)
+        elif service in ("text.set_value", "input_text.set_value"):
+            domain = service.split(".", 1)[0]
+            if entity_ids := _target_entity_ids(hass, target, domain):
+                return TextTransport(hass, action, script_name, domain, entity_ids)
+        elif service == "mqtt.publish":
+            # MQTT has no targets; the blaster device id only identifies the blaster
+            return MqttTransport(hass, action, script_name)
+    except vol.Invalid as err:
+        _LOGGER.debug("Using the service path for %s: %s", service, err)
+
+    return Transport(hass, action, script_name)
+
+
+def async_build_transports(hass: HomeAssistant, actions: list[dict[str, Any]], script_name: str) -> list[Transport]:
+    """Build the transports for the blaster actions of an entry."""
+    transports = [_build_transport(hass, action, script_name) for action in actions]
+    _LOGGER.debug("Blaster transports for %s: %s", script_name, [transport.name for transport in transports])
+    return transports
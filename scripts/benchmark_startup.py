@@ -0,0 +1,167 @@
+"""Import and startup benchmark for the RewIRe integration.
+
+Usage (from the repository root, with requirements_tests.txt installed):
+
+    python scripts/benchmark_startup.py [--entries 20] [--rounds 5] [--top 10]
+
+Import cost is measured in fresh interpreters with `python -X importtime`, on
+top of the modules a running Home Assistant has already loaded, so only what
+the integration adds is counted. Startup cost sets up the integration with a
+number of config entries in a test Home Assistant instance.
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+PACKAGE = "custom_components.rewire"
+# Modules imported when the integration sets up; the config flow only when a flow starts
+MODULES = [PACKAGE, f"{PACKAGE}.config_flow"]
+# Loaded by Home Assistant before any integration
+BASELINE = ["homeassistant.core", "homeassistant.config_entries", "homeassistant.helpers.entity_platform"]
+
+
+def _import_times(module: str) -> list[tuple[int, int, str]]:
+    """Return (self us, cumulative us, name) of every module `module` adds to the baseline."""
+    baseline = "".join(f"import {name}; " for name in BASELINE)
+    code = f"{baseline}import sys; sys.stderr.write('--\\n'); import {module}"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = []
+    for line in result.stderr.partition("--\n")[2].splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:") :].split("|")
+        times.append((int(own), int(cumulative), name.strip()))
+    return times
+
+
+def benchmark_imports(rounds: int, top: int) -> None:
+    """Print the import cost of the integration and its heaviest dependencies."""
+    for module in MODULES:
+        cumulative = []
+        heaviest: dict[str, list[int]] = {}
+        for _ in range(rounds):
+            times = _import_times(module)
+            cumulative.append(next(total for _, total, name in times if name == module))
+            for own, _, name in times:
+                heaviest.setdefault(name, []).append(own)
+
+        print(f"import {module}: {statistics.median(cumulative) / 1000:.1f} ms (median of {rounds})")
+        ranked = sorted(heaviest.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+        for name, own in ranked[:top]:
+            print(f"  {statistics.median(own) / 1000:8.1f} ms  {name}")
+
+
+async def _async_setup_entries(entries: int) -> float:
+    """Set up the integration with `entries` config entries and return the seconds taken."""
+    # Imported here: only the startup benchmark needs the test harness
+    from homeassistant.setup import async_setup_component
+    from pytest_homeassistant_custom_component.common import MockConfigEntry, async_test_home_assistant
+
+    from custom_components.rewire.const import (
+        ACTION_TYPE_BUTTON,
+        ACTION_TYPE_INC_DEC,
+        ACTION_TYPE_POWER,
+        CONF_ACTION_CODE,
+        CONF_ACTION_CODE_DEC,
+        CONF_ACTION_CODE_INC,
+        CONF_ACTION_NAME,
+        CONF_ACTION_TYPE,
+        CONF_ACTIONS,
+        CONF_BLASTER_ACTION,
+        CONF_DEVICE_TYPE,
+        CONF_POWER_OFF_CODE,
+        CONF_POWER_ON_CODE,
+        DEVICE_TYPE_LIGHT,
+        DOMAIN,
+    )
+
+    # Silence the "custom integration has not been tested" warning
+    logging.getLogger("homeassistant.loader").setLevel(logging.ERROR)
+
+    async with async_test_home_assistant() as hass:
+        # Let the loader find custom_components/ on sys.path (loader.DATA_CUSTOM_COMPONENTS)
+        hass.data.pop("custom_components", None)
+        await async_setup_component(hass, "homeassistant", {})
+        for index in range(entries):
+            MockConfigEntry(
+                domain=DOMAIN,
+                version=2,
+                data={
+                    "name": f"Device {index}",
+                    "blaster_device_id": f"blaster_{index % 4}",
+                    CONF_DEVICE_TYPE: DEVICE_TYPE_LIGHT,
+                    CONF_BLASTER_ACTION: [
+                        {
+                            "service": "remote.send_command",
+                            "target": {"entity_id": f"remote.blaster_{index % 4}"},
+                            "data": {"command": "IR_CODE"},
+                        }
+                    ],
+                    CONF_ACTIONS: [
+                        {
+                            CONF_ACTION_NAME: "Power",
+                            CONF_ACTION_TYPE: ACTION_TYPE_POWER,
+                            CONF_POWER_ON_CODE: "on",
+                            CONF_POWER_OFF_CODE: "off",
+                        },
+                        {
+                            CONF_ACTION_NAME: "Level",
+                            CONF_ACTION_TYPE: ACTION_TYPE_INC_DEC,
+                            CONF_ACTION_CODE_INC: "up",
+                            CONF_ACTION_CODE_DEC: "down",
+                        },
+                        {CONF_ACTION_NAME: "Mode", CONF_ACTION_TYPE: ACTION_TYPE_BUTTON, CONF_ACTION_CODE: "mode"},
+                    ],
+                },
+            ).add_to_hass(hass)
+
+        start = time.perf_counter()
+        assert await async_setup_component(hass, DOMAIN, {})
+        await hass.async_block_till_done()
+        elapsed = time.perf_counter() - start
+        await hass.async_stop(force=True)
+    return elapsed
+
+
+def benchmark_setup(entries: int, rounds: int) -> None:
+    """Print the time to set up the integration with many entries."""
+    # The first round also pays for importing the platforms
+    samples = [asyncio.run(_async_setup_entries(entries)) for _ in range(rounds + 1)]
+    print(f"cold setup of {entries} entries: {samples[0] * 1000:.1f} ms")
+    warm = samples[1:]
+    print(
+        f"warm setup of {entries} entries: {statistics.median(warm) * 1000:.1f} ms "
+        f"(median of {rounds}, {statistics.median(warm) / entries * 1000:.2f} ms per entry)"
+    )
+
+
+def main() -> None:
+    """Run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=20, help="config entries to set up")
+    parser.add_argument("--rounds", type=int, default=5, help="repetitions per measurement")
+    parser.add_argument("--top", type=int, default=10, help="heaviest imports to list")
+    parser.add_argument("--skip-setup", action="store_true", help="only measure imports")
+    args = parser.parse_args()
+
+    benchmark_imports(args.rounds, args.top)
+    if not args.skip_setup:
+        benchmark_setup(args.entries, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,87 @@
 """Global fixtures for rewire integration tests."""
+from typing import Any, Callable, Optional
 
 import pytest
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.rewire.const import (
+    ACTION_TYPE_TOGGLE,
+    CONF_ACTION_CODE,
+    CONF_ACTION_NAME,
+    CONF_ACTION_TYPE,
+    CONF_ACTIONS,
+    CONF_BLASTER_ACTION,
+    DOMAIN,
+)
+from custom_components.rewire.coordinator import RewireCoordinator
+from custom_components.rewire.switch import RewireSwitch
+
+TOGGLE_ACTION = {CONF_ACTION_NAME: "Light", CONF_ACTION_TYPE: ACTION_TYPE_TOGGLE, CONF_ACTION_CODE: "toggle_code"}
+BLASTER_ACTION = {"service": "remote.send_command", "data": {"command": "IR_CODE"}}
 
 
 @pytest.fixture(autouse=True)
 def auto_enable_custom_integrations(enable_custom_integrations):
     """Enable custom integrations defined in the test dir."""
     yield
+
+
+@pytest.fixture
+def make_coordinator(hass: HomeAssistant) -> Callable[..., RewireCoordinator]:
+    """Return a factory of coordinators for fresh entries that are not set up.
+
+    Keyword arguments other than the ones below are added to the entry data.
+    """
+
+    def make(
+        *,
+        name: str = "Test Device",
+        actions: Optional[list[dict[str, Any]]] = None,
+        blaster_actions: Optional[list[dict[str, Any]]] = None,
+        options: Optional[dict[str, Any]] = None,
+        attach: bool = False,
+        **data: Any,
+    ) -> RewireCoordinator:
+        config_entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={
+                "name": name,
+                CONF_BLASTER_ACTION: blaster_actions or [BLASTER_ACTION],
+                CONF_ACTIONS: actions or [TOGGLE_ACTION],
+                **data,
+            },
+            options=options or {},
+        )
+        coordinator = RewireCoordinator(hass, config_entry)
+        if attach:
+            coordinator.blaster.async_attach(config_entry, coordinator.async_update_listeners)
+        return coordinator
+
+    return make
+
+
+@pytest.fixture
+def make_switch(hass: HomeAssistant, make_coordinator: Callable[..., RewireCoordinator]) -> Callable[..., RewireSwitch]:
+    """Return a factory of switches whose state writes go nowhere.
+
+    A switch gets a fresh entry for its action unless a `coordinator` is passed;
+    other keyword arguments go to `make_coordinator`.
+    """
+
+    def make(
+        *,
+        action: dict[str, Any] = TOGGLE_ACTION,
+        entity_id: str = "switch.test_device_light",
+        coordinator: Optional[RewireCoordinator] = None,
+        **kwargs: Any,
+    ) -> RewireSwitch:
+        if coordinator is None:
+            coordinator = make_coordinator(actions=[action], **kwargs)
+        switch = RewireSwitch(coordinator, coordinator.config_entry.entry_id, action)
+        switch.hass = hass
+        switch.entity_id = entity_id
+        switch.async_write_ha_state = lambda: None
+        return switch
+
+    return make
@@ -0,0 +1,143 @@
+"""Simulated IR blaster for rewire tests and benchmarks.
+
+`FakeBlaster` registers the services RewIRe blaster actions call
+(remote.send_command, mqtt.publish, text/input_text.set_value) and turns every
+code into a frame on a timeline. Frames arrive after a configurable latency,
+may be dropped silently like a real IR frame that never reached the device,
+and collide when they arrive closer together than the minimum frame gap.
+"""
+import asyncio
+import random
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Union
+from unittest.mock import patch
+
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+
+# Frame outcomes
+RECEIVED = "received"
+DROPPED = "dropped"
+COLLIDED = "collided"
+
+Latency = Union[float, Callable[[random.Random], float]]
+
+
+def uniform(low: float, high: float) -> Callable[[random.Random], float]:
+    """Return a latency distribution uniform between low and high seconds."""
+    return lambda rng: rng.uniform(low, high)
+
+
+def normal(mean: float, stddev: float) -> Callable[[random.Random], float]:
+    """Return a normal latency distribution, cut off at zero."""
+    return lambda rng: max(0.0, rng.gauss(mean, stddev))
+
+
+@dataclass
+class Frame:
+    """One IR frame seen by the simulated blaster."""
+
+    time: float
+    service: str
+    target: Optional[str]
+    code: str
+    status: str = RECEIVED
+
+
+class FakeBlaster:
+    """In-process IR blaster recording a timeline of frames."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        *,
+        latency: Latency = 0.0,
+        drop_rate: float = 0.0,
+        fail_rate: float = 0.0,
+        min_gap: float = 0.0,
+        seed: Optional[int] = 0,
+    ) -> None:
+        """Initialize the blaster.
+
+        `drop_rate` frames are lost silently, `fail_rate` calls raise like a
+        blaster that reports an error, and frames arriving less than `min_gap`
+        seconds after the previous one collide with it.
+        """
+        self.hass = hass
+        self.latency = latency
+        self.drop_rate = drop_rate
+        self.fail_rate = fail_rate
+        self.min_gap = min_gap
+        self.frames: list[Frame] = []
+        self.calls = 0
+        self._rng = random.Random(seed)
+
+    def async_register(self, text_domains: tuple[str, ...] = ("text", "input_text")) -> None:
+        """Register the blaster services."""
+        self.hass.services.async_register("remote", "send_command", self._async_remote_send_command)
+        self.hass.services.async_register("mqtt", "publish", self._async_mqtt_publish)
+        for domain in text_domains:
+            self.hass.services.async_register(domain, "set_value", self._async_text_set_value)
+
+    def patch_mqtt(self) -> Any:
+        """Return a patch routing mqtt.async_publish, which MqttTransport calls directly, to the blaster."""
+
+        async def publish(hass: HomeAssistant, topic: str, payload: str, qos: int = 0, retain: bool = False) -> None:
+            await self.async_emit("mqtt.publish", topic, str(payload))
+
+        return patch("homeassistant.components.mqtt.async_publish", publish)
+
+    @property
+    def received(self) -> list[str]:
+        """Return the codes that reached the device, in arrival order."""
+        return [frame.code for frame in self.frames if frame.status == RECEIVED]
+
+    def received_by(self, target: str) -> list[str]:
+        """Return the codes that reached the device behind one target."""
+        return [frame.code for frame in self.frames if frame.status == RECEIVED and frame.target == target]
+
+    def count(self, status: str) -> int:
+        """Return the number of frames with an outcome."""
+        return sum(frame.status == status for frame in self.frames)
+
+    def _latency(self) -> float:
+        """Draw the latency of one call."""
+        return self.latency(self._rng) if callable(self.latency) else self.latency
+
+    async def async_emit(self, service: str, target: Optional[str], code: str) -> None:
+        """Emit one frame after the call latency."""
+        self.calls += 1
+        if (latency := self._latency()) > 0:
+            await asyncio.sleep(latency)
+        if self.fail_rate and self._rng.random() < self.fail_rate:
+            raise HomeAssistantError("Simulated blaster error")
+
+        frame = Frame(self.hass.loop.time(), service, target, code)
+        if self.drop_rate and self._rng.random() < self.drop_rate:
+            frame.status = DROPPED
+        elif self.frames and frame.time - self.frames[-1].time < self.min_gap:
+            # Overlapping frames garble each other
+            frame.status = COLLIDED
+            if self.frames[-1].status == RECEIVED:
+                self.frames[-1].status = COLLIDED
+        self.frames.append(frame)
+
+    async def _async_remote_send_command(self, call: ServiceCall) -> None:
+        """Handle remote.send_command."""
+        targets = cv.ensure_list(call.data.get(ATTR_ENTITY_ID)) or [None]
+        for target in targets:
+            for _ in range(call.data.get("num_repeats", 1)):
+                for code in cv.ensure_list(call.data["command"]):
+                    await self.async_emit("remote.send_command", target, code)
+
+    async def _async_mqtt_publish(self, call: ServiceCall) -> None:
+        """Handle mqtt.publish."""
+        await self.async_emit("mqtt.publish", call.data["topic"], str(call.data["payload"]))
+
+    async def _async_text_set_value(self, call: ServiceCall) -> None:
+        """Handle text.set_value and input_text.set_value."""
+        targets = cv.ensure_list(call.data.get(ATTR_ENTITY_ID)) or [None]
+        for target in targets:
+            await self.async_emit(f"{call.domain}.set_value", target, str(call.data["value"]))
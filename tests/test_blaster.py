@@ -0,0 +1,243 @@
+"""Test rewire blaster dispatch."""
+import asyncio
+from datetime import timedelta
+from typing import Callable
+
+import pytest
+from homeassistant.const import STATE_ON, STATE_UNAVAILABLE
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    async_capture_events,
+    async_fire_time_changed,
+)
+
+from custom_components.rewire.const import (
+    CIRCUIT_RESET_TIMEOUT,
+    CONF_BACKUP_BLASTERS,
+    CONF_BROADCAST_GROUP,
+    CONF_COMMAND_TIMEOUT,
+    CONF_MIRROR_MODE,
+    CONF_MIRROR_QUORUM,
+    CONF_RETRY_ATTEMPTS,
+    CONF_RETRY_BACKOFF,
+    DEFAULT_FRAME_GAP,
+    EVENT_COMMAND_FAILED,
+)
+from custom_components.rewire.coordinator import RewireCoordinator
+from custom_components.rewire.switch import RewireSwitch
+
+REMOTE_ACTION = {
+    "service": "remote.send_command",
+    "target": {"entity_id": "remote.blaster_1"},
+    "data": {"command": "IR_CODE"},
+}
+# Entry of the switches below: attached to blaster_1, sending through its remote entity
+ENTRY = {"blaster_device_id": "blaster_1", "blaster_actions": [REMOTE_ACTION], "attach": True}
+OPTIONS = {CONF_RETRY_ATTEMPTS: 2, CONF_RETRY_BACKOFF: 0.0, CONF_COMMAND_TIMEOUT: 1.0}
+
+
+def _register_flaky_service(hass: HomeAssistant, failures: int) -> list[ServiceCall]:
+    """Register a send_command service that fails `failures` times first."""
+    calls: list[ServiceCall] = []
+
+    async def handle(call: ServiceCall) -> None:
+        calls.append(call)
+        if len(calls) <= failures:
+            raise HomeAssistantError("blaster busy")
+
+    hass.services.async_register("remote", "send_command", handle)
+    return calls
+
+
+async def test_transient_failure_is_retried(hass: HomeAssistant, make_switch: Callable[..., RewireSwitch]):
+    """Test that a transient failure is retried and the state still flips."""
+    calls = _register_flaky_service(hass, failures=1)
+    switch = make_switch(**ENTRY, options=OPTIONS)
+
+    await switch.async_turn_on()
+
+    assert len(calls) == 2
+    assert switch.is_on is True
+    # A transport error is not a lost frame: the frame gap stays put
+    assert switch.coordinator.timing.frame_gap(switch.coordinator.blaster.key) == DEFAULT_FRAME_GAP
+
+
+async def test_exhausted_retries_keep_state(hass: HomeAssistant, make_switch: Callable[..., RewireSwitch]):
+    """Test that a lost command fires a failure event and keeps the old state."""
+    calls = _register_flaky_service(hass, failures=10)
+    events = async_capture_events(hass, EVENT_COMMAND_FAILED)
+    switch = make_switch(**ENTRY, options=OPTIONS)
+
+    await switch.async_turn_on()
+    await hass.async_block_till_done()
+
+    assert len(calls) == 3
+    assert switch.is_on is False
+    assert len(events) == 1
+    assert events[0].data["attempts"] == 3
+    assert events[0].data["entity_id"] == "switch.test_device_light"
+
+
+async def test_circuit_opens_after_repeated_failures(hass: HomeAssistant, make_switch: Callable[..., RewireSwitch]):
+    """Test that repeated lost commands open the breaker and fail fast."""
+    calls = _register_flaky_service(hass, failures=100)
+    switch = make_switch(**ENTRY, options={**OPTIONS, CONF_RETRY_ATTEMPTS: 0})
+
+    for _ in range(3):
+        await switch.async_turn_on()
+    assert len(calls) == 3
+    assert switch.available is False
+
+    # Breaker is open: the blaster is not called at all
+    await switch.async_turn_on()
+    assert len(calls) == 3
+
+    # After the reset timeout a trial command is let through
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=CIRCUIT_RESET_TIMEOUT + 1))
+    assert switch.available is True
+
+
+async def test_unavailable_blaster_parks_commands(hass: HomeAssistant, make_switch: Callable[..., RewireSwitch]):
+    """Test that commands wait for an unavailable blaster to come back."""
+    hass.states.async_set("remote.blaster_1", STATE_UNAVAILABLE)
+    calls = _register_flaky_service(hass, failures=0)
+    switch = make_switch(**ENTRY, options=OPTIONS)
+    assert switch.available is False
+
+    task = hass.async_create_task(switch.async_turn_on())
+    await asyncio.sleep(0)
+    assert not calls
+
+    hass.states.async_set("remote.blaster_1", STATE_ON)
+    await task
+
+    assert len(calls) == 1
+    assert switch.is_on is True
+    assert switch.available is True
+
+
+async def test_broadcast_group_merges_identical_codes(hass: HomeAssistant, make_switch: Callable[..., RewireSwitch]):
+    """Test that identical codes of a broadcast group are transmitted once."""
+    calls: list[ServiceCall] = []
+
+    async def handle(call: ServiceCall) -> None:
+        calls.append(call)
+        # Keep the transmission in flight while the other members send
+        await asyncio.sleep(0.01)
+
+    hass.services.async_register("remote", "send_command", handle)
+    fans = [make_switch(**ENTRY, options={**OPTIONS, CONF_BROADCAST_GROUP: "fans"}) for _ in range(3)]
+    loner = make_switch(**ENTRY, options=OPTIONS)
+
+    await asyncio.gather(*(fan.async_turn_on() for fan in fans))
+    assert len(calls) == 1
+    assert all(fan.is_on for fan in fans)
+
+    # Entries outside the group still send their own frame
+    await loner.async_turn_on()
+    assert len(calls) == 2
+
+
+async def test_broadcast_group_sends_repeats_of_one_entry(
+    hass: HomeAssistant, make_switch: Callable[..., RewireSwitch]
+):
+    """Test that a member sending the same toggle code twice in a row sends two frames."""
+    calls = _register_flaky_service(hass, failures=0)
+    switch = make_switch(**ENTRY, options={**OPTIONS, CONF_BROADCAST_GROUP: "fans"})
+
+    await switch.async_turn_on()
+    await switch.async_turn_off()
+
+    assert len(calls) == 2
+    assert switch.is_on is False
+
+
+async def test_failover_to_backup_blaster(hass: HomeAssistant, make_switch: Callable[..., RewireSwitch]):
+    """Test that commands fail over to a backup blaster and avoid a broken primary."""
+    calls: list[str] = []
+
+    async def handle(call: ServiceCall) -> None:
+        calls.append(call.data["device_id"])
+        if call.data["device_id"] == "blaster_1":
+            raise HomeAssistantError("blaster jammed")
+
+    hass.services.async_register("remote", "send_command", handle)
+    switch = make_switch(
+        blaster_device_id="blaster_1",
+        blaster_actions=[
+            {"service": "remote.send_command", "target": {"device_id": "blaster_1"}, "data": {"command": "IR_CODE"}}
+        ],
+        options={CONF_RETRY_ATTEMPTS: 0, CONF_BACKUP_BLASTERS: ["blaster_2"]},
+    )
+    switch.coordinator.async_attach_blasters()
+
+    await switch.async_turn_on()
+    assert calls == ["blaster_1", "blaster_2"]
+    assert switch.is_on is True
+
+    # The backup answered faster than the primary's estimate, so it is preferred now
+    calls.clear()
+    await switch.async_turn_off()
+    assert calls == ["blaster_2"]
+    assert switch.available is True
+
+
+async def test_mqtt_primary_gets_no_backup(
+    make_coordinator: Callable[..., RewireCoordinator], caplog: pytest.LogCaptureFixture
+):
+    """Test that an action without a device or entity target is not copied as a backup of the same topic."""
+    coordinator = make_coordinator(
+        blaster_device_id="blaster_1",
+        blaster_actions=[{"service": "mqtt.publish", "data": {"topic": "ir/blaster_1/send"}}],
+        options={CONF_BACKUP_BLASTERS: ["blaster_2"]},
+    )
+
+    assert len(coordinator.pool) == 1
+    assert "Skipping backup blaster blaster_2" in caplog.text
+
+
+async def test_mirror_mode_dispatches_concurrently(hass: HomeAssistant, make_switch: Callable[..., RewireSwitch]):
+    """Test that mirror mode sends through all actions at once and needs only the quorum."""
+    started: list[str] = []
+    finished: list[str] = []
+
+    async def slow(call: ServiceCall) -> None:
+        started.append("slow")
+        await asyncio.sleep(0.1)
+        finished.append("slow")
+
+    async def broken(call: ServiceCall) -> None:
+        started.append("broken")
+        # The slow action is already in flight: the actions do not wait for each other
+        assert "slow" in started and not finished
+        raise HomeAssistantError("emitter unplugged")
+
+    hass.services.async_register("ir", "slow", slow)
+    hass.services.async_register("ir", "broken", broken)
+    actions = [
+        {"service": "ir.slow", "data": {"code": "IR_CODE"}},
+        {"service": "ir.broken", "data": {"code": "IR_CODE"}},
+    ]
+    failed = async_capture_events(hass, EVENT_COMMAND_FAILED)
+
+    switch = make_switch(
+        **{**ENTRY, "blaster_actions": actions}, options={**OPTIONS, CONF_RETRY_ATTEMPTS: 0, CONF_MIRROR_MODE: True}
+    )
+    await switch.async_turn_on()
+    await hass.async_block_till_done()
+
+    assert switch.is_on
+    assert started == ["slow", "broken"]
+    assert len(failed) == 1
+
+    # With a quorum of two the broken action fails the command
+    switch = make_switch(
+        **{**ENTRY, "blaster_actions": actions},
+        options={**OPTIONS, CONF_RETRY_ATTEMPTS: 0, CONF_MIRROR_MODE: True, CONF_MIRROR_QUORUM: 2},
+    )
+    await switch.async_turn_on()
+    await hass.async_block_till_done()
+
+    assert not switch.is_on
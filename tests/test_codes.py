@@ -0,0 +1,221 @@
+"""Test rewire IR code normalization and the code store."""
+import base64
+from typing import Any
+
+import pytest
+import voluptuous as vol
+from homeassistant import config_entries, data_entry_flow
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_mock_service
+
+from custom_components.rewire.codes import code_hash, normalize_code, normalize_codes
+from custom_components.rewire.const import (
+    ACTION_TYPE_BUTTON,
+    CODE_STORAGE_KEY,
+    CODE_STORAGE_VERSION,
+    CONF_ACTION_CODE,
+    CONF_ACTION_NAME,
+    CONF_ACTION_TYPE,
+    CONF_ACTIONS,
+    CONF_BLASTER_ACTION,
+    CONF_CODE_HASHES,
+    CONF_DEVICE_TYPE,
+    CONF_MACRO_DELAY,
+    CONF_MACRO_STEPS,
+    DOMAIN,
+)
+
+BLASTER_ACTION = [{"service": "remote.send_command", "data": {"command": "IR_CODE"}}]
+
+
+@pytest.mark.parametrize(
+    ("code", "canonical"),
+    [
+        (" power_on ", "power_on"),
+        ("B64:JgBQAAAB\nKJITEhM=", "b64:JgBQAAABKJITEhM="),
+        ("b64:JgBQAAABKJITEhM", "b64:JgBQAAABKJITEhM="),
+        ("JgBQAAABKJIT\nEhMSEhMS", "JgBQAAABKJITEhMSEhMS"),
+        ("0000 006d 0001 0000  0155 00aa", "0000 006D 0001 0000 0155 00AA"),
+        ("9000,-4500,  560, -560", "9000,-4500,  560, -560"),
+        (" 9000 -4500 +560 ", "9000 -4500 +560"),
+        # Raw timings that all happen to be four digits are not Pronto
+        ("9000 4500 1560 1560 1560 1560", "9000 4500 1560 1560 1560 1560"),
+        # Payloads that are not base64 keep their line breaks and tabs
+        ('{\n\t"code": "power_on"\n}', '{\n\t"code": "power_on"\n}'),
+        ("power_on\r\n", "power_on"),
+    ],
+)
+def test_normalize_code(code: str, canonical: str):
+    """Test that every supported code format is brought into its canonical form."""
+    assert normalize_code(code) == canonical
+    assert normalize_code(canonical) == canonical
+
+
+@pytest.mark.parametrize(
+    "code", ["", "   ", "b64:Jg*A", "b64:", "0000 006d 0002 0000 0155 00aa", "9000,0,560", "a\x00b"]
+)
+def test_normalize_invalid_code(code: str):
+    """Test that malformed codes are rejected."""
+    with pytest.raises(vol.Invalid):
+        normalize_code(code)
+
+
+def test_normalize_codes_of_actions():
+    """Test that actions and macro steps get canonical codes and hashes, and errors their path."""
+    data = normalize_codes(
+        {
+            CONF_ACTIONS: [
+                {CONF_ACTION_NAME: "Mute", CONF_ACTION_CODE: " mute "},
+                {
+                    CONF_ACTION_NAME: "Movie",
+                    CONF_MACRO_STEPS: [{CONF_ACTION_CODE: "tv_on ", CONF_MACRO_DELAY: 1.0}],
+                },
+            ]
+        }
+    )
+
+    mute, movie = data[CONF_ACTIONS]
+    assert mute[CONF_ACTION_CODE] == "mute"
+    assert mute[CONF_CODE_HASHES] == {CONF_ACTION_CODE: code_hash("mute")}
+    assert CONF_CODE_HASHES not in movie
+    assert movie[CONF_MACRO_STEPS][0][CONF_CODE_HASHES] == {CONF_ACTION_CODE: code_hash("tv_on")}
+
+    with pytest.raises(vol.Invalid) as err:
+        normalize_codes({CONF_ACTIONS: [{CONF_MACRO_STEPS: [{CONF_ACTION_CODE: "b64:*"}]}]})
+    assert err.value.path == [CONF_ACTIONS, 0, CONF_MACRO_STEPS, 0, CONF_ACTION_CODE]
+
+
+async def test_setup_normalizes_stored_codes(hass: HomeAssistant):
+    """Test that setup normalizes codes once and refuses entries with malformed ones."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        data={
+            "name": "TV",
+            CONF_BLASTER_ACTION: BLASTER_ACTION,
+            CONF_ACTIONS: [
+                {CONF_ACTION_NAME: "Mute", CONF_ACTION_TYPE: ACTION_TYPE_BUTTON, CONF_ACTION_CODE: "b64:JgBQ\nAAAB"}
+            ],
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    # The entry keeps the hash; the canonical code is in the code store
+    action = entry.data[CONF_ACTIONS][0]
+    assert CONF_ACTION_CODE not in action
+    assert action[CONF_CODE_HASHES] == {CONF_ACTION_CODE: code_hash("b64:JgBQAAAB")}
+    assert hass.data[DOMAIN][entry.entry_id].config[CONF_ACTIONS][0][CONF_ACTION_CODE] == "b64:JgBQAAAB"
+
+    broken = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        data={
+            "name": "Radio",
+            CONF_BLASTER_ACTION: BLASTER_ACTION,
+            CONF_ACTIONS: [
+                {CONF_ACTION_NAME: "Mute", CONF_ACTION_TYPE: ACTION_TYPE_BUTTON, CONF_ACTION_CODE: "b64:*"},
+            ],
+        },
+    )
+    broken.add_to_hass(hass)
+    assert not await hass.config_entries.async_setup(broken.entry_id)
+    assert broken.state is ConfigEntryState.SETUP_ERROR
+
+
+async def test_config_flow_rejects_invalid_code(hass: HomeAssistant):
+    """Test that the config flow shows a form error for a malformed code and stores the canonical one."""
+    result = await hass.config_entries.flow.async_init(DOMAIN, context={"source": config_entries.SOURCE_USER})
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"name": "TV", CONF_DEVICE_TYPE: "other"}
+    )
+    result = await hass.config_entries.flow.async_configure(result["flow_id"], {"blaster_device_id": "blaster_1"})
+    result = await hass.config_entries.flow.async_configure(result["flow_id"], {"selection": "remote.send_command"})
+    result = await hass.config_entries.flow.async_configure(result["flow_id"], {"add_more": True})
+    result = await hass.config_entries.flow.async_configure(result["flow_id"], {CONF_ACTION_TYPE: ACTION_TYPE_BUTTON})
+    assert result["step_id"] == "configure_action"
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_ACTION_NAME: "Mute", CONF_ACTION_CODE: "b64:Jg*A"}
+    )
+    assert result["type"] == data_entry_flow.FlowResultType.FORM
+    assert result["errors"] == {CONF_ACTION_CODE: "invalid_ir_code"}
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_ACTION_NAME: "Mute", CONF_ACTION_CODE: "b64:JgBQAAAB"}
+    )
+    assert result["step_id"] == "actions"
+    result = await hass.config_entries.flow.async_configure(result["flow_id"], {"add_more": False})
+    result = await hass.config_entries.flow.async_configure(result["flow_id"], {})
+    assert result["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    assert result["data"][CONF_ACTIONS][0][CONF_CODE_HASHES] == {CONF_ACTION_CODE: code_hash("b64:JgBQAAAB")}
+
+
+async def test_codes_move_to_the_code_store(hass: HomeAssistant, hass_storage: dict[str, Any]):
+    """Test that inline codes are migrated into the store, shared, compressed and pruned with their entries."""
+    calls = async_mock_service(hass, "remote", "send_command")
+    long_code = "b64:" + base64.b64encode(bytes(range(16)) * 20).decode()
+    entries = []
+    for name in ("TV", "Radio"):
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            version=2,
+            data={
+                "name": name,
+                CONF_BLASTER_ACTION: BLASTER_ACTION,
+                CONF_ACTIONS: [
+                    {CONF_ACTION_NAME: "Mute", CONF_ACTION_TYPE: ACTION_TYPE_BUTTON, CONF_ACTION_CODE: long_code},
+                    {CONF_ACTION_NAME: name, CONF_ACTION_TYPE: ACTION_TYPE_BUTTON, CONF_ACTION_CODE: name.lower()},
+                ],
+            },
+        )
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        entries.append(entry)
+    await hass.async_block_till_done()
+
+    stored = hass_storage[CODE_STORAGE_KEY]["data"]
+    assert stored["codes"] == {code_hash("tv"): "tv", code_hash("radio"): "radio"}
+    # One copy for both entries, and smaller than the code itself
+    assert list(stored["compressed"]) == [code_hash(long_code)]
+    assert len(stored["compressed"][code_hash(long_code)]) < len(long_code)
+
+    await hass.services.async_call("button", "press", {"entity_id": "button.tv_mute"}, blocking=True)
+    assert calls[-1].data["command"] == [long_code]
+
+    assert await hass.config_entries.async_remove(entries[0].entry_id)
+    assert set(hass_storage[CODE_STORAGE_KEY]["data"]["codes"]) == {code_hash("radio")}
+    assert list(hass_storage[CODE_STORAGE_KEY]["data"]["compressed"]) == [code_hash(long_code)]
+
+
+async def test_setup_loads_codes_from_the_store(hass: HomeAssistant, hass_storage: dict[str, Any]):
+    """Test that an entry holding only hashes gets its codes from the store."""
+    calls = async_mock_service(hass, "remote", "send_command")
+    hass_storage[CODE_STORAGE_KEY] = {
+        "version": CODE_STORAGE_VERSION,
+        "key": CODE_STORAGE_KEY,
+        "data": {"codes": {code_hash("mute"): "mute"}, "compressed": {}},
+    }
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        data={
+            "name": "TV",
+            CONF_BLASTER_ACTION: BLASTER_ACTION,
+            CONF_ACTIONS: [
+                {
+                    CONF_ACTION_NAME: "Mute",
+                    CONF_ACTION_TYPE: ACTION_TYPE_BUTTON,
+                    CONF_CODE_HASHES: {CONF_ACTION_CODE: code_hash("mute")},
+                }
+            ],
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    await hass.services.async_call("button", "press", {"entity_id": "button.tv_mute"}, blocking=True)
+    assert calls[-1].data["command"] == ["mute"]
@@ -3,7 +3,11 @@ from unittest.mock import patch
 
 from homeassistant import config_entries, data_entry_flow
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_mock_service
 
+from custom_components.rewire.capabilities import async_get_capability_index
 from custom_components.rewire.const import (
     CONF_ACTIONS,
     CONF_BLASTER_ACTION,
@@ -98,3 +102,44 @@ async def test_no_actions_error(hass: HomeAssistant):
     assert result["type"] == data_entry_flow.RESULT_TYPE_FORM
     assert result["step_id"] == "actions"
     assert result["errors"] == {"base": "no_actions"}
+
+
+async def test_blaster_capabilities_are_cached_and_ranked(hass: HomeAssistant):
+    """Test that the blaster action step offers the device's send service first and rescans only on changes."""
+    async_mock_service(hass, "remote", "learn_command")
+    async_mock_service(hass, "remote", "send_command")
+    blaster_entry = MockConfigEntry(domain="broadlink")
+    blaster_entry.add_to_hass(hass)
+    device = dr.async_get(hass).async_get_or_create(
+        config_entry_id=blaster_entry.entry_id, identifiers={("broadlink", "rm4")}
+    )
+    entity_registry = er.async_get(hass)
+    entity_registry.async_get_or_create("remote", "broadlink", "rm4", device_id=device.id)
+
+    result = await hass.config_entries.flow.async_init(DOMAIN, context={"source": config_entries.SOURCE_USER})
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"name": "TV", CONF_DEVICE_TYPE: "other"}
+    )
+    result = await hass.config_entries.flow.async_configure(result["flow_id"], {"blaster_device_id": device.id})
+    assert result["step_id"] == "blaster_action"
+    options = result["data_schema"].schema["selection"].config["options"]
+    assert [option["value"] for option in options] == ["remote.send_command", "remote.learn_command"]
+
+    index = async_get_capability_index(hass)
+    capabilities = index.async_get(device.id)
+    assert capabilities.transports == {"remote"}
+    assert index.async_get(device.id) is capabilities
+
+    # A new text entity on the device is picked up
+    entity_registry.async_get_or_create("text", "broadlink", "rm4_code", device_id=device.id)
+    await hass.async_block_till_done()
+    capabilities = index.async_get(device.id)
+    assert [option["value"] for option in capabilities.options()] == ["text.broadlink_rm4_code"]
+
+    # Services of unrelated domains keep the cache, services of the device's domains drop it
+    async_mock_service(hass, "light", "turn_on")
+    await hass.async_block_till_done()
+    assert index.async_get(device.id) is capabilities
+    async_mock_service(hass, "remote", "send_ir")
+    await hass.async_block_till_done()
+    assert index.async_get(device.id).send_services == ("remote.send_command", "remote.send_ir", "remote.learn_command")
@@ -0,0 +1,85 @@
+"""Test rewire against the simulated blaster."""
+import asyncio
+from typing import Callable
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.rewire.const import CONF_COMMAND_TIMEOUT, CONF_RETRY_ATTEMPTS, CONF_RETRY_BACKOFF
+from custom_components.rewire.switch import RewireSwitch
+
+from .fake_blaster import COLLIDED, DROPPED, FakeBlaster, uniform
+
+OPTIONS = {CONF_RETRY_ATTEMPTS: 0, CONF_RETRY_BACKOFF: 0.0, CONF_COMMAND_TIMEOUT: 5.0}
+
+
+async def test_frame_gap_prevents_collisions(hass: HomeAssistant, make_switch: Callable[..., RewireSwitch]):
+    """Test that concurrent commands are spaced so no frames collide."""
+    blaster = FakeBlaster(hass, latency=uniform(0.0, 0.02), min_gap=0.05)
+    blaster.async_register()
+    switch = make_switch(
+        blaster_actions=[
+            {
+                "service": "remote.send_command",
+                "target": {"entity_id": "remote.blaster"},
+                "data": {"command": "IR_CODE"},
+            }
+        ],
+        options=OPTIONS,
+    )
+
+    await asyncio.gather(*(switch.async_toggle() for _ in range(4)))
+
+    assert blaster.received_by("remote.blaster") == ["toggle_code"] * 4
+    assert blaster.count(COLLIDED) == 0
+
+
+async def test_close_frames_collide(hass: HomeAssistant):
+    """Test that the simulated blaster garbles frames sent too close together."""
+    blaster = FakeBlaster(hass, min_gap=0.05)
+    blaster.async_register()
+
+    await asyncio.gather(
+        hass.services.async_call("remote", "send_command", {"command": ["a"]}, blocking=True),
+        hass.services.async_call("remote", "send_command", {"command": ["b"]}, blocking=True),
+    )
+
+    assert blaster.count(COLLIDED) == 2
+    assert blaster.received == []
+
+
+async def test_mqtt_and_text_blasters(hass: HomeAssistant, make_switch: Callable[..., RewireSwitch]):
+    """Test that MQTT and text blaster actions reach the simulated blaster."""
+    blaster = FakeBlaster(hass)
+    blaster.async_register()
+    mqtt_switch = make_switch(
+        blaster_actions=[{"service": "mqtt.publish", "data": {"topic": "ir/send", "payload": "IR_CODE"}}],
+        options=OPTIONS,
+    )
+    text_switch = make_switch(
+        blaster_actions=[
+            {"service": "text.set_value", "target": {"entity_id": "text.blaster"}, "data": {"value": "IR_CODE"}}
+        ],
+        options=OPTIONS,
+    )
+
+    with blaster.patch_mqtt():
+        await mqtt_switch.async_turn_on()
+    await text_switch.async_turn_on()
+
+    assert [(frame.service, frame.target) for frame in blaster.frames] == [
+        ("mqtt.publish", "ir/send"),
+        ("text.set_value", "text.blaster"),
+    ]
+
+
+async def test_dropped_frames_are_silent(hass: HomeAssistant, make_switch: Callable[..., RewireSwitch]):
+    """Test that a dropped frame looks delivered to the sender, like real IR."""
+    blaster = FakeBlaster(hass, drop_rate=1.0)
+    blaster.async_register()
+    switch = make_switch(options=OPTIONS)
+
+    await switch.async_turn_on()
+
+    assert switch.is_on
+    assert blaster.count(DROPPED) == 1
+    assert blaster.received == []
@@ -0,0 +1,113 @@
+"""Test rewire sensor feedback."""
+from homeassistant.const import STATE_OFF, STATE_ON
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_mock_service
+
+from custom_components.rewire.const import (
+    ACTION_TYPE_POWER,
+    CONF_ACTION_CODE_OFF,
+    CONF_ACTION_CODE_ON,
+    CONF_ACTION_NAME,
+    CONF_ACTION_TYPE,
+    CONF_ACTIONS,
+    CONF_BLASTER_ACTION,
+    CONF_DEVICE_TYPE,
+    CONF_FEEDBACK_POWER_ENTITY,
+    CONF_FEEDBACK_POWER_THRESHOLD,
+    CONF_POWER_OFF_CODE,
+    CONF_POWER_ON_CODE,
+    CONF_SUPPRESS_REDUNDANT,
+    DEVICE_TYPE_LIGHT,
+    DOMAIN,
+)
+
+
+async def test_power_meter_corrects_and_suppresses(hass: HomeAssistant):
+    """Test that a power meter corrects the light state and skips needless codes."""
+    calls = async_mock_service(hass, "remote", "send_command")
+    hass.states.async_set("sensor.lamp_power", "0")
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        data={
+            "name": "Lamp",
+            CONF_DEVICE_TYPE: DEVICE_TYPE_LIGHT,
+            CONF_BLASTER_ACTION: [{"service": "remote.send_command", "data": {"command": "IR_CODE"}}],
+            CONF_ACTIONS: [
+                {
+                    CONF_ACTION_NAME: "Power",
+                    CONF_ACTION_TYPE: ACTION_TYPE_POWER,
+                    CONF_POWER_ON_CODE: "on_code",
+                    CONF_POWER_OFF_CODE: "off_code",
+                }
+            ],
+        },
+        options={CONF_FEEDBACK_POWER_ENTITY: "sensor.lamp_power", CONF_FEEDBACK_POWER_THRESHOLD: 5},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    assert hass.states.get("light.lamp").state == STATE_OFF
+
+    # Someone used the physical remote
+    hass.states.async_set("sensor.lamp_power", "42.5")
+    await hass.async_block_till_done()
+    assert hass.states.get("light.lamp").state == STATE_ON
+
+    # Already confirmed on: no code is needed
+    await hass.services.async_call("light", "turn_on", {"entity_id": "light.lamp"}, blocking=True)
+    assert calls == []
+
+    await hass.services.async_call("light", "turn_off", {"entity_id": "light.lamp"}, blocking=True)
+    assert [call.data["command"] for call in calls] == [["off_code"]]
+    assert hass.states.get("light.lamp").state == STATE_OFF
+
+    # The meter still reads the old value: turning on again must send the code
+    await hass.services.async_call("light", "turn_on", {"entity_id": "light.lamp"}, blocking=True)
+    assert [call.data["command"] for call in calls] == [["off_code"], ["on_code"]]
+
+
+async def test_power_meter_corrects_power_switch(hass: HomeAssistant):
+    """Test that a device without a main entity follows its power meter through its power switch."""
+    calls = async_mock_service(hass, "remote", "send_command")
+    hass.states.async_set("sensor.tv_power", "0")
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=3,
+        data={
+            "name": "TV",
+            CONF_DEVICE_TYPE: "other",
+            CONF_BLASTER_ACTION: [{"service": "remote.send_command", "data": {"command": "IR_CODE"}}],
+            CONF_ACTIONS: [
+                {
+                    CONF_ACTION_NAME: "Power",
+                    CONF_ACTION_TYPE: ACTION_TYPE_POWER,
+                    CONF_ACTION_CODE_ON: "on_code",
+                    CONF_ACTION_CODE_OFF: "off_code",
+                }
+            ],
+        },
+        options={
+            CONF_FEEDBACK_POWER_ENTITY: "sensor.tv_power",
+            CONF_FEEDBACK_POWER_THRESHOLD: 5,
+            CONF_SUPPRESS_REDUNDANT: True,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    await hass.services.async_call("switch", "turn_on", {"entity_id": "switch.tv_power"}, blocking=True)
+    hass.states.async_set("sensor.tv_power", "80")
+    await hass.async_block_till_done()
+    assert hass.states.get("switch.tv_power").state == STATE_ON
+
+    # Turned off with the physical remote
+    hass.states.async_set("sensor.tv_power", "0.5")
+    await hass.async_block_till_done()
+    assert hass.states.get("switch.tv_power").state == STATE_OFF
+
+    # The switch knows the TV is off, so turning it on is not redundant
+    await hass.services.async_call("switch", "turn_on", {"entity_id": "switch.tv_power"}, blocking=True)
+    assert [call.data["command"] for call in calls] == [["on_code"], ["on_code"]]
+    assert hass.states.get("switch.tv_power").state == STATE_ON
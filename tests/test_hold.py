@@ -0,0 +1,86 @@
+"""Test rewire hold-to-repeat."""
+import asyncio
+from typing import Callable
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import async_mock_service
+
+from custom_components.rewire.button import RewireButton
+from custom_components.rewire.const import (
+    ACTION_TYPE_BUTTON,
+    CONF_ACTION_CODE,
+    CONF_ACTION_CODE_DEC,
+    CONF_ACTION_CODE_INC,
+    CONF_ACTION_NAME,
+    CONF_ACTION_TYPE,
+    CONF_MAX_VALUE,
+    CONF_MIN_VALUE,
+    DEFAULT_FRAME_GAP,
+)
+from custom_components.rewire.coordinator import RewireCoordinator
+from custom_components.rewire.number import RewireNumber
+
+BUTTON = {CONF_ACTION_NAME: "Volume Up", CONF_ACTION_TYPE: ACTION_TYPE_BUTTON, CONF_ACTION_CODE: "vol_up"}
+NUMBER = {
+    CONF_ACTION_NAME: "Level",
+    CONF_ACTION_CODE_INC: "inc_code",
+    CONF_ACTION_CODE_DEC: "dec_code",
+    CONF_MIN_VALUE: 0,
+    CONF_MAX_VALUE: 7,
+}
+# Above the default frame gap the blaster enforces
+INTERVAL = DEFAULT_FRAME_GAP + 0.02
+
+
+async def test_button_hold_repeats_until_stopped(
+    hass: HomeAssistant, make_coordinator: Callable[..., RewireCoordinator]
+):
+    """Test that a held button repeats its code and stops immediately."""
+    calls = async_mock_service(hass, "remote", "send_command")
+    coordinator = make_coordinator(name="TV", actions=[BUTTON, NUMBER])
+    button = RewireButton(coordinator, coordinator.config_entry.entry_id, BUTTON)
+    button.hass = hass
+    button.entity_id = "button.tv_volume_up"
+
+    button.async_start_press_hold(INTERVAL, 5)
+    await asyncio.sleep(INTERVAL * 2.5)
+    assert button.async_stop_hold() is True
+    sent = len(calls)
+    assert sent >= 2
+
+    await asyncio.sleep(INTERVAL * 1.5)
+    assert len(calls) == sent
+    assert button.async_stop_hold() is False
+
+
+async def test_button_hold_max_duration(hass: HomeAssistant, make_coordinator: Callable[..., RewireCoordinator]):
+    """Test that a hold nobody stops ends after its maximum duration."""
+    calls = async_mock_service(hass, "remote", "send_command")
+    coordinator = make_coordinator(name="TV", actions=[BUTTON, NUMBER])
+    button = RewireButton(coordinator, coordinator.config_entry.entry_id, BUTTON)
+    button.hass = hass
+    button.entity_id = "button.tv_volume_up"
+
+    button.async_start_press_hold(INTERVAL, INTERVAL * 2.5)
+    await asyncio.sleep(INTERVAL * 4)
+
+    assert len(calls) == 3
+    assert button.async_stop_hold() is False
+
+
+async def test_number_hold_stops_at_limit(hass: HomeAssistant, make_coordinator: Callable[..., RewireCoordinator]):
+    """Test that holding a number steps it until its maximum."""
+    calls = async_mock_service(hass, "remote", "send_command")
+    coordinator = make_coordinator(name="TV", actions=[BUTTON, NUMBER])
+    number = RewireNumber(coordinator, coordinator.config_entry.entry_id, NUMBER)
+    number.hass = hass
+    number.entity_id = "number.tv_level"
+    number.async_write_ha_state = lambda: None
+    assert number.native_value == 3.5
+
+    number.async_start_value_hold(1, INTERVAL, 5)
+    await asyncio.sleep(INTERVAL * 4)
+
+    assert number.native_value == 6.5
+    assert [call.data["command"] for call in calls] == [["inc_code"]] * 3
+    assert number.async_stop_hold() is False
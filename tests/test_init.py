@@ -1,10 +1,133 @@
 """Test component setup."""
+import subprocess
+import sys
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import UnitOfTemperature
+from homeassistant.core import HomeAssistant
 from homeassistant.setup import async_setup_component
+from homeassistant.util.unit_system import US_CUSTOMARY_SYSTEM
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_mock_service
 
-from custom_components.rewire.const import DOMAIN
+from custom_components.rewire.codes import code_hash
+from custom_components.rewire.const import (
+    ACTION_TYPE_OSCILLATE,
+    ACTION_TYPE_POWER,
+    ACTION_TYPE_TEMP,
+    CODE_STORAGE_KEY,
+    CODE_STORAGE_VERSION,
+    CONF_ACTION_TYPE,
+    CONF_ACTIONS,
+    CONF_BLASTER_ACTION,
+    CONF_CODE_HASHES,
+    CONF_DEVICE_TYPE,
+    CONF_MAX_SPEED,
+    CONF_MAX_TEMP,
+    CONF_MIN_SPEED,
+    CONF_MIN_TEMP,
+    CONF_OSCILLATE_CODE,
+    CONF_POWER_ON_CODE,
+    CONF_TEMP_DEC_CODE,
+    CONF_TEMP_INC_CODE,
+    CONF_TEMP_UNIT,
+    DEVICE_TYPE_AC,
+    DEVICE_TYPE_FAN,
+    DOMAIN,
+)
+from custom_components.rewire.migration import migrate_legacy_config
 
 
 async def test_async_setup(hass):
     """Test the component gets setup."""
     setup = await async_setup_component(hass, DOMAIN, {})
     assert setup is True
+
+
+async def test_migrate_legacy_entry(hass: HomeAssistant, hass_storage: dict[str, Any]):
+    """Test that top-level codes and ranges of an old entry move into actions, hashes included."""
+    calls = async_mock_service(hass, "remote", "send_command")
+    hass.config.units = US_CUSTOMARY_SYSTEM
+    hass_storage[CODE_STORAGE_KEY] = {
+        "version": CODE_STORAGE_VERSION,
+        "key": CODE_STORAGE_KEY,
+        "data": {"codes": {code_hash("on_code"): "on_code"}, "compressed": {}},
+    }
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=1,
+        data={
+            "name": "AC",
+            CONF_DEVICE_TYPE: DEVICE_TYPE_AC,
+            CONF_BLASTER_ACTION: [{"service": "remote.send_command", "data": {"command": "IR_CODE"}}],
+            CONF_CODE_HASHES: {CONF_POWER_ON_CODE: code_hash("on_code")},
+            CONF_TEMP_INC_CODE: "temp_up",
+            CONF_TEMP_DEC_CODE: "temp_down",
+            CONF_MIN_TEMP: 60,
+            CONF_MAX_TEMP: 86,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert entry.version == 3
+    assert CONF_CODE_HASHES not in entry.data
+    power, temperature = entry.data[CONF_ACTIONS]
+    assert power[CONF_ACTION_TYPE] == ACTION_TYPE_POWER
+    assert power[CONF_CODE_HASHES] == {CONF_POWER_ON_CODE: code_hash("on_code")}
+    assert temperature[CONF_ACTION_TYPE] == ACTION_TYPE_TEMP
+    assert (temperature[CONF_MIN_TEMP], temperature[CONF_TEMP_UNIT]) == (60, "fahrenheit")
+
+    await hass.services.async_call("climate", "turn_on", {"entity_id": "climate.ac"}, blocking=True)
+    assert calls[-1].data["command"] == ["on_code"]
+    assert hass.states.get("climate.ac").attributes["min_temp"] == 60
+
+
+def test_migrate_keeps_settings_without_codes():
+    """Test that ranges of an action without codes are left in place rather than dropped."""
+    data = migrate_legacy_config(
+        {
+            "name": "Fan",
+            CONF_DEVICE_TYPE: DEVICE_TYPE_FAN,
+            CONF_POWER_ON_CODE: "on_code",
+            CONF_MIN_SPEED: 1,
+            CONF_MAX_SPEED: 3,
+        },
+        UnitOfTemperature.CELSIUS,
+    )
+
+    assert [action[CONF_ACTION_TYPE] for action in data[CONF_ACTIONS]] == [ACTION_TYPE_POWER]
+    assert (data[CONF_MIN_SPEED], data[CONF_MAX_SPEED]) == (1, 3)
+
+
+def test_migrate_oscillate_only_for_fans():
+    """Test that only fans get an oscillate action; legacy ACs never read the code."""
+    legacy = {CONF_POWER_ON_CODE: "on_code", CONF_OSCILLATE_CODE: "swing"}
+
+    fan = migrate_legacy_config({CONF_DEVICE_TYPE: DEVICE_TYPE_FAN, **legacy}, UnitOfTemperature.CELSIUS)
+    assert [action[CONF_ACTION_TYPE] for action in fan[CONF_ACTIONS]] == [ACTION_TYPE_POWER, ACTION_TYPE_OSCILLATE]
+
+    ac = migrate_legacy_config({CONF_DEVICE_TYPE: DEVICE_TYPE_AC, **legacy}, UnitOfTemperature.CELSIUS)
+    assert [action[CONF_ACTION_TYPE] for action in ac[CONF_ACTIONS]] == [ACTION_TYPE_POWER]
+    assert ac[CONF_OSCILLATE_CODE] == "swing"
+
+
+async def test_migrate_refuses_newer_entry(hass: HomeAssistant):
+    """Test that an entry from a newer version is not set up."""
+    entry = MockConfigEntry(domain=DOMAIN, version=4, data={"name": "AC"})
+    entry.add_to_hass(hass)
+    assert not await hass.config_entries.async_setup(entry.entry_id)
+    assert entry.state is ConfigEntryState.MIGRATION_ERROR
+
+
+def test_import_loads_no_platform():
+    """Test that importing the integration (and its services) leaves the entity platforms unloaded."""
+    platforms = ("climate", "fan", "light", "number", "button")
+    code = (
+        "import sys, custom_components.rewire; "
+        f"print(sorted(m for m in sys.modules if m.rsplit('.', 1)[-1] in {platforms!r} "
+        "and m.startswith(('custom_components.rewire.', 'homeassistant.components.'))))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,57 @@
+"""Test rewire macros."""
+import pytest
+import voluptuous as vol
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_mock_service
+
+from custom_components.rewire.button import RewireMacroButton
+from custom_components.rewire.const import (
+    ACTION_TYPE_MACRO,
+    CONF_ACTION_NAME,
+    CONF_ACTION_TYPE,
+    CONF_BLASTER_ACTION,
+    CONF_MACRO_STEPS,
+    DOMAIN,
+)
+from custom_components.rewire.coordinator import RewireCoordinator
+from custom_components.rewire.macro import compile_macro, parse_macro
+
+
+def test_parse_and_compile():
+    """Test that macro text compiles into offsets from the start."""
+    steps = parse_macro("tv_on\nwait 2\ninput_hdmi\n\nwait 0.5\nwait 0.5\nvol_up\n")
+
+    assert compile_macro(steps) == ((0.0, "tv_on"), (2.0, "input_hdmi"), (3.0, "vol_up"))
+
+
+@pytest.mark.parametrize("text", ["", "wait 1\ntv_on", "tv_on\nwait soon", "tv_on\nwait -1"])
+def test_parse_invalid(text: str):
+    """Test that malformed macros are rejected."""
+    with pytest.raises(vol.Invalid):
+        parse_macro(text)
+
+
+async def test_macro_press_sends_codes_in_order(hass: HomeAssistant):
+    """Test that pressing a macro button sends every code in order."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "name": "TV",
+            CONF_BLASTER_ACTION: [{"service": "remote.send_command", "data": {"command": "IR_CODE"}}],
+        },
+    )
+    coordinator = RewireCoordinator(hass, config_entry)
+    action = {
+        CONF_ACTION_NAME: "Movie Night",
+        CONF_ACTION_TYPE: ACTION_TYPE_MACRO,
+        CONF_MACRO_STEPS: parse_macro("tv_on\nwait 0.01\ninput_hdmi\nvol_up"),
+    }
+    button = RewireMacroButton(coordinator, config_entry.entry_id, action)
+    button.hass = hass
+    button.entity_id = "button.tv_movie_night"
+    calls = async_mock_service(hass, "remote", "send_command")
+
+    await button.async_press()
+
+    assert [call.data["command"] for call in calls] == [["tv_on"], ["input_hdmi"], ["vol_up"]]
+    assert {span["call"] for span in coordinator.tracer.export()} == {"async_press"}
@@ -0,0 +1,186 @@
+"""Test rewire device profiles."""
+from typing import Any
+
+import pytest
+from homeassistant import config_entries, data_entry_flow
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_mock_service
+
+from custom_components.rewire.codes import code_hash
+from custom_components.rewire.const import (
+    ACTION_TYPE_BUTTON,
+    ACTION_TYPE_INC_DEC,
+    ACTION_TYPE_POWER,
+    ACTION_TYPE_SPEED,
+    CODE_STORAGE_KEY,
+    CODE_STORAGE_VERSION,
+    CONF_ACTION_CODE,
+    CONF_ACTION_NAME,
+    CONF_ACTION_TYPE,
+    CONF_ACTIONS,
+    CONF_BLASTER_ACTION,
+    CONF_CODE_HASHES,
+    CONF_DEVICE_TYPE,
+    CONF_MAX_SPEED,
+    CONF_MIN_SPEED,
+    CONF_POWER_ON_CODE,
+    CONF_PROFILE,
+    CONF_SPEED_DEC_CODE,
+    CONF_SPEED_INC_CODE,
+    CONF_SPEED_STEP,
+    DOMAIN,
+    PROFILE_STORAGE_KEY,
+    PROFILE_STORAGE_VERSION,
+    SERVICE_UPDATE_PROFILE,
+)
+from custom_components.rewire.device_profile import DeviceProfile
+
+
+def _seed_profile(hass_storage: dict[str, Any]) -> None:
+    """Store a "tv" profile with a Mute button and its code."""
+    hass_storage[CODE_STORAGE_KEY] = {
+        "version": CODE_STORAGE_VERSION,
+        "key": CODE_STORAGE_KEY,
+        "data": {"codes": {code_hash("mute"): "mute"}, "compressed": {}},
+    }
+    hass_storage[PROFILE_STORAGE_KEY] = {
+        "version": PROFILE_STORAGE_VERSION,
+        "key": PROFILE_STORAGE_KEY,
+        "data": {
+            "profiles": {
+                "tv": {
+                    "name": "TV",
+                    CONF_DEVICE_TYPE: "other",
+                    CONF_ACTIONS: [
+                        {
+                            CONF_ACTION_NAME: "Mute",
+                            CONF_ACTION_TYPE: ACTION_TYPE_BUTTON,
+                            CONF_CODE_HASHES: {CONF_ACTION_CODE: code_hash("mute")},
+                        }
+                    ],
+                }
+            }
+        },
+    }
+
+
+async def _async_setup_entry(hass: HomeAssistant, name: str, **data: Any) -> MockConfigEntry:
+    """Set up a device on its own remote."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        data={
+            "name": name,
+            CONF_BLASTER_ACTION: [
+                {
+                    "service": "remote.send_command",
+                    "target": {"entity_id": f"remote.{name.lower()}"},
+                    "data": {"command": "IR_CODE"},
+                }
+            ],
+            **data,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+async def test_entries_share_a_profile(hass: HomeAssistant, hass_storage: dict[str, Any]):
+    """Test that entries of a profile share its actions and are reloaded, alone, when it changes."""
+    calls = async_mock_service(hass, "remote", "send_command")
+    _seed_profile(hass_storage)
+    bedroom = await _async_setup_entry(hass, "Bedroom", **{CONF_PROFILE: "tv"})
+    kitchen = await _async_setup_entry(hass, "Kitchen", **{CONF_PROFILE: "tv"})
+    radio = await _async_setup_entry(
+        hass,
+        "Radio",
+        **{CONF_ACTIONS: [{CONF_ACTION_NAME: "Mute", CONF_ACTION_TYPE: ACTION_TYPE_BUTTON, CONF_ACTION_CODE: "hush"}]},
+    )
+
+    coordinators = hass.data[DOMAIN]
+    assert coordinators[bedroom.entry_id].config[CONF_ACTIONS] is coordinators[kitchen.entry_id].config[CONF_ACTIONS]
+    assert coordinators[bedroom.entry_id].device_profile is coordinators[kitchen.entry_id].device_profile
+    await hass.services.async_call("button", "press", {"entity_id": "button.kitchen_mute"}, blocking=True)
+    assert calls[-1].data == {"entity_id": "remote.kitchen", "command": ["mute"]}
+
+    radio_coordinator = coordinators[radio.entry_id]
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_UPDATE_PROFILE,
+        {
+            CONF_PROFILE: "tv",
+            CONF_ACTIONS: [
+                {CONF_ACTION_NAME: "Mute", CONF_ACTION_TYPE: ACTION_TYPE_BUTTON, CONF_ACTION_CODE: " mute2 "}
+            ],
+        },
+        blocking=True,
+    )
+    await hass.async_block_till_done()
+
+    for name in ("bedroom", "kitchen"):
+        await hass.services.async_call("button", "press", {"entity_id": f"button.{name}_mute"}, blocking=True)
+        assert calls[-1].data == {"entity_id": f"remote.{name}", "command": ["mute2"]}
+    # Devices without the profile keep running
+    assert hass.data[DOMAIN][radio.entry_id] is radio_coordinator
+    # The old code is no longer used by anything
+    assert set(hass_storage[CODE_STORAGE_KEY]["data"]["codes"]) == {code_hash("mute2"), code_hash("hush")}
+
+
+async def test_config_flow_with_profile(hass: HomeAssistant, hass_storage: dict[str, Any]):
+    """Test that a device added with a profile skips the actions and only references it."""
+    _seed_profile(hass_storage)
+    result = await hass.config_entries.flow.async_init(DOMAIN, context={"source": config_entries.SOURCE_USER})
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"name": "Office", CONF_DEVICE_TYPE: "fan", CONF_PROFILE: "tv"}
+    )
+    result = await hass.config_entries.flow.async_configure(result["flow_id"], {"blaster_device_id": "blaster_1"})
+    result = await hass.config_entries.flow.async_configure(result["flow_id"], {"selection": "remote.send_command"})
+    assert result["step_id"] == "initial_state"
+
+    result = await hass.config_entries.flow.async_configure(result["flow_id"], {})
+    assert result["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    assert result["data"][CONF_PROFILE] == "tv"
+    assert result["data"][CONF_DEVICE_TYPE] == "other"
+    assert CONF_ACTIONS not in result["data"]
+
+
+def test_device_profile_parses_once():
+    """Test that codes, lookup tables and per-platform actions are parsed into an immutable profile."""
+    profile = DeviceProfile(
+        {
+            CONF_DEVICE_TYPE: "fan",
+            CONF_ACTIONS: [
+                {CONF_ACTION_NAME: "Power", CONF_ACTION_TYPE: ACTION_TYPE_POWER, CONF_POWER_ON_CODE: "on"},
+                {
+                    CONF_ACTION_NAME: "Speed",
+                    CONF_ACTION_TYPE: ACTION_TYPE_SPEED,
+                    CONF_SPEED_INC_CODE: "up",
+                    CONF_SPEED_DEC_CODE: "down",
+                    CONF_MIN_SPEED: 2,
+                    CONF_MAX_SPEED: 8,
+                    CONF_SPEED_STEP: 2,
+                },
+                {CONF_ACTION_NAME: "Fan speed", CONF_ACTION_TYPE: ACTION_TYPE_INC_DEC},
+                {CONF_ACTION_NAME: "Timer", CONF_ACTION_TYPE: ACTION_TYPE_INC_DEC},
+            ],
+        }
+    )
+
+    # A single power code is a toggle
+    assert (profile.power_on_code, profile.power_off_code, profile.power_discrete) == ("on", None, False)
+    assert profile.speed_levels == (2, 4, 6, 8)
+    assert profile.fan_modes == ("1", "2", "3", "4")
+    assert profile.fan_mode_index["3"] == 2
+    assert profile.speed_percentage(8) == 100
+    assert profile.speed_percentage(1) == 0
+    assert profile.percentage_speed(100) == 8
+    # The fan entity covers its power and speed; only the timer gets an entity of its own
+    assert profile.switches == ()
+    assert [action[CONF_ACTION_NAME] for action, _ in profile.numbers] == ["Timer"]
+
+    with pytest.raises(AttributeError):
+        profile.power_on_code = "off"
+    with pytest.raises(TypeError):
+        profile.numbers[0][0][CONF_ACTION_NAME] = "Sleep"
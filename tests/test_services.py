@@ -0,0 +1,193 @@
+"""Test rewire services."""
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.entity_component import DATA_INSTANCES
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_mock_service
+
+from custom_components.rewire.const import (
+    ACTION_TYPE_BUTTON,
+    ACTION_TYPE_TOGGLE,
+    CONF_ACTION_CODE,
+    CONF_ACTION_NAME,
+    CONF_ACTION_TYPE,
+    CONF_ACTIONS,
+    CONF_BLASTER_ACTION,
+    CONF_DEVICE_TYPE,
+    DOMAIN,
+    SERVICE_CALIBRATE_BLASTER,
+    SERVICE_SET_MANY,
+    SERVICE_START_HOLD,
+)
+
+
+async def _setup_entry(hass: HomeAssistant, name: str, blaster: str) -> None:
+    """Set up an "other" device with a single toggle on the given blaster."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        data={
+            "name": name,
+            CONF_DEVICE_TYPE: "other",
+            "blaster_device_id": blaster,
+            CONF_BLASTER_ACTION: [
+                {
+                    "service": "remote.send_command",
+                    "target": {"entity_id": f"remote.{blaster}"},
+                    "data": {"command": "IR_CODE"},
+                }
+            ],
+            CONF_ACTIONS: [
+                {CONF_ACTION_NAME: "Power", CONF_ACTION_TYPE: ACTION_TYPE_TOGGLE, CONF_ACTION_CODE: f"{name}_code"}
+            ],
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_set_many_runs_blasters_in_parallel(hass: HomeAssistant):
+    """Test that set_many keeps order per blaster and overlaps blasters."""
+    in_flight: dict[str, int] = {}
+    max_in_flight = 0
+    calls: list[tuple[str, str]] = []
+
+    async def handle(call: ServiceCall) -> None:
+        nonlocal max_in_flight
+        blaster = call.data["entity_id"]
+        calls.append((blaster, call.data["command"][0]))
+        in_flight[blaster] = in_flight.get(blaster, 0) + 1
+        max_in_flight = max(max_in_flight, sum(in_flight.values()))
+        assert in_flight[blaster] == 1
+        await asyncio.sleep(0.01)
+        in_flight[blaster] -= 1
+
+    hass.services.async_register("remote", "send_command", handle)
+
+    await _setup_entry(hass, "tv", "blaster_a")
+    await _setup_entry(hass, "amp", "blaster_a")
+    await _setup_entry(hass, "fan", "blaster_b")
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SET_MANY,
+        {
+            "targets": [
+                {"entity_id": "switch.tv_power", "state": "on"},
+                {"entity_id": "switch.amp_power", "state": "on"},
+                {"entity_id": "switch.fan_power", "state": "on"},
+                {"entity_id": "switch.missing", "state": "on"},
+            ]
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+    results = response["results"]
+    assert results["switch.tv_power"] == {"success": True, "commands": 1}
+    assert results["switch.fan_power"] == {"success": True, "commands": 1}
+    assert results["switch.missing"]["success"] is False
+
+    blaster_a = [code for blaster, code in calls if blaster == "remote.blaster_a"]
+    assert blaster_a == ["tv_code", "amp_code"]
+    assert max_in_flight == 2
+    assert hass.states.get("switch.amp_power").state == "on"
+
+
+async def test_set_many_reports_unexpected_errors_per_entity(hass: HomeAssistant):
+    """Test that an unexpected error of one target is reported for it while the others are still set."""
+    calls = async_mock_service(hass, "remote", "send_command")
+    await _setup_entry(hass, "tv", "blaster_a")
+    await _setup_entry(hass, "amp", "blaster_a")
+    tv = hass.data[DATA_INSTANCES]["switch"].get_entity("switch.tv_power")
+    tv.async_turn_on = AsyncMock(side_effect=ValueError("bad state"))
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SET_MANY,
+        {
+            "targets": [
+                {"entity_id": "switch.tv_power", "state": "on"},
+                {"entity_id": "switch.amp_power", "state": "on"},
+            ]
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+    results = response["results"]
+    assert results["switch.tv_power"] == {"success": False, "commands": 0, "error": "bad state"}
+    assert results["switch.amp_power"] == {"success": True, "commands": 1}
+    assert [call.data["command"] for call in calls] == [["amp_code"]]
+
+
+async def test_start_hold_checks_every_target_first(hass: HomeAssistant):
+    """Test that a target that can't be held keeps the holds of the others from starting."""
+    calls = async_mock_service(hass, "remote", "send_command")
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=3,
+        data={
+            "name": "TV",
+            CONF_DEVICE_TYPE: "other",
+            CONF_BLASTER_ACTION: [{"service": "remote.send_command", "data": {"command": "IR_CODE"}}],
+            CONF_ACTIONS: [
+                {CONF_ACTION_NAME: "Volume Up", CONF_ACTION_TYPE: ACTION_TYPE_BUTTON, CONF_ACTION_CODE: "vol_up"},
+                {CONF_ACTION_NAME: "Power", CONF_ACTION_TYPE: ACTION_TYPE_TOGGLE, CONF_ACTION_CODE: "power"},
+            ],
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    with pytest.raises(HomeAssistantError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_START_HOLD,
+            {"entity_id": ["button.tv_volume_up", "switch.tv_power"], "interval": 0.1},
+            blocking=True,
+        )
+    await asyncio.sleep(0.25)
+
+    assert not calls
+    assert hass.data[DATA_INSTANCES]["button"].get_entity("button.tv_volume_up").async_stop_hold() is False
+
+
+async def test_calibrate_blaster(hass: HomeAssistant):
+    """Test that calibration measures the blaster and feeds the latency sensor."""
+    calls = async_mock_service(hass, "remote", "send_command")
+    await _setup_entry(hass, "tv", "blaster_a")
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_CALIBRATE_BLASTER,
+        {"entity_id": "switch.tv_power", "code": "b64:JgBQAAAB\nKJITEhM", "count": 3},
+        blocking=True,
+        return_response=True,
+    )
+    await hass.async_block_till_done()
+
+    # The code is sent in the canonical form a stored code would have
+    assert [call.data["command"] for call in calls] == [["b64:JgBQAAABKJITEhM="]] * 3
+    assert response["blaster"] == "blaster_a"
+    assert response["samples"] == 3
+    assert response["failures"] == 0
+
+    state = hass.states.get("sensor.tv_blaster_latency")
+    assert float(state.state) == response["p50_ms"]
+    assert state.attributes["p95_ms"] == response["p95_ms"]
+
+    with pytest.raises(vol.Invalid):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_CALIBRATE_BLASTER,
+            {"entity_id": "switch.tv_power", "code": "0000 006d 0002 0000 0155 00aa"},
+            blocking=True,
+            return_response=True,
+        )
@@ -0,0 +1,256 @@
+"""Test the shared device state of rewire entries."""
+import asyncio
+from unittest.mock import patch
+
+from homeassistant.core import Event, HomeAssistant
+from homeassistant.helpers.entity import Entity
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_mock_service
+
+from custom_components.rewire.const import (
+    ACTION_TYPE_POWER,
+    ACTION_TYPE_SPEED,
+    ACTION_TYPE_TOGGLE,
+    CONF_ACTION_CODE,
+    CONF_ACTION_CODE_OFF,
+    CONF_ACTION_CODE_ON,
+    CONF_ACTION_NAME,
+    CONF_ACTION_TYPE,
+    CONF_ACTIONS,
+    CONF_BLASTER_ACTION,
+    CONF_DEVICE_TYPE,
+    CONF_MAX_SPEED,
+    CONF_MIN_SPEED,
+    CONF_POWER_OFF_CODE,
+    CONF_POWER_ON_CODE,
+    CONF_SPEED_DEC_CODE,
+    CONF_SPEED_INC_CODE,
+    DEVICE_TYPE_AC,
+    DEVICE_TYPE_FAN,
+    DOMAIN,
+    EVENT_COMMAND,
+    SERVICE_SET_MANY,
+)
+from custom_components.rewire.coordinator import RewireCoordinator
+from custom_components.rewire.diagnostics import async_get_config_entry_diagnostics
+from custom_components.rewire.fan import RewireFan
+
+BLASTER_ACTION = [{"service": "remote.send_command", "data": {"command": "IR_CODE"}}]
+
+
+async def test_climate_fan_mode_and_fan_speed_number_share_state(hass: HomeAssistant):
+    """Test that the AC fan mode and its Fan Speed number never drift apart."""
+    calls = async_mock_service(hass, "remote", "send_command")
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        data={
+            "name": "AC",
+            CONF_DEVICE_TYPE: DEVICE_TYPE_AC,
+            CONF_BLASTER_ACTION: BLASTER_ACTION,
+            CONF_POWER_ON_CODE: "on_code",
+            CONF_POWER_OFF_CODE: "off_code",
+            CONF_SPEED_INC_CODE: "speed_up",
+            CONF_SPEED_DEC_CODE: "speed_down",
+            CONF_MIN_SPEED: 1,
+            CONF_MAX_SPEED: 3,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    await hass.services.async_call("climate", "turn_on", {"entity_id": "climate.ac"}, blocking=True)
+    assert hass.states.get("climate.ac").attributes["fan_mode"] == "1"
+    assert float(hass.states.get("number.ac_fan_speed").state) == 1
+
+    await hass.services.async_call(
+        "number", "set_value", {"entity_id": "number.ac_fan_speed", "value": 3}, blocking=True
+    )
+    await hass.async_block_till_done()
+    assert float(hass.states.get("number.ac_fan_speed").state) == 2
+    assert hass.states.get("climate.ac").attributes["fan_mode"] == "2"
+
+    # The climate already knows the speed the number set: one step, no correction codes
+    await hass.services.async_call(
+        "climate", "set_fan_mode", {"entity_id": "climate.ac", "fan_mode": "3"}, blocking=True
+    )
+    await hass.async_block_till_done()
+    assert hass.states.get("climate.ac").attributes["fan_mode"] == "3"
+    assert float(hass.states.get("number.ac_fan_speed").state) == 3
+    assert [call.data["command"] for call in calls] == [["on_code"], ["speed_up"], ["speed_up"]]
+
+
+async def test_fan_initial_speed(hass: HomeAssistant):
+    """Test that a configured initial speed is mapped into the speed range."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "name": "Fan",
+            CONF_DEVICE_TYPE: DEVICE_TYPE_FAN,
+            CONF_BLASTER_ACTION: BLASTER_ACTION,
+            CONF_ACTIONS: [
+                {
+                    CONF_ACTION_NAME: "Speed",
+                    CONF_ACTION_TYPE: ACTION_TYPE_SPEED,
+                    CONF_SPEED_INC_CODE: "speed_up",
+                    CONF_SPEED_DEC_CODE: "speed_down",
+                    CONF_MIN_SPEED: 1,
+                    CONF_MAX_SPEED: 4,
+                }
+            ],
+            "initial_state": {"current_speed": 2},
+        },
+    )
+    coordinator = RewireCoordinator(hass, entry)
+    fan = RewireFan(coordinator, entry.entry_id)
+
+    assert fan.percentage == 50
+    assert coordinator.device_state["speed"] == 2
+
+
+async def test_multi_step_command_writes_state_once(hass: HomeAssistant):
+    """Test that the steps of one command are written once, and unchanged states not at all."""
+    async_mock_service(hass, "remote", "send_command")
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        data={
+            "name": "AC",
+            CONF_DEVICE_TYPE: DEVICE_TYPE_AC,
+            CONF_BLASTER_ACTION: BLASTER_ACTION,
+            CONF_POWER_ON_CODE: "on_code",
+            CONF_POWER_OFF_CODE: "off_code",
+            CONF_SPEED_INC_CODE: "speed_up",
+            CONF_SPEED_DEC_CODE: "speed_down",
+            CONF_MIN_SPEED: 1,
+            CONF_MAX_SPEED: 3,
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    writes: list[str] = []
+    write = Entity._async_write_ha_state
+
+    def counting_write(self: Entity) -> None:
+        writes.append(self.entity_id)
+        write(self)
+
+    with patch.object(Entity, "_async_write_ha_state", counting_write):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_SET_MANY,
+            {"targets": [{"entity_id": "climate.ac", "state": "on", "fan_mode": "2"}]},
+            blocking=True,
+        )
+        assert sorted(writes) == ["climate.ac", "number.ac_fan_speed"]
+        assert hass.states.get("climate.ac").attributes["fan_mode"] == "2"
+
+        writes.clear()
+        hass.data[DOMAIN][entry.entry_id].async_update_listeners()
+        assert writes == []
+
+
+async def test_command_listener_writes_state_of_another_device(hass: HomeAssistant):
+    """Test that a device command started by a command event listener writes its own state."""
+    async_mock_service(hass, "remote", "send_command")
+    for name in ("Lamp", "Heater"):
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            version=3,
+            data={
+                "name": name,
+                CONF_BLASTER_ACTION: BLASTER_ACTION,
+                CONF_ACTIONS: [
+                    {CONF_ACTION_NAME: "Power", CONF_ACTION_TYPE: ACTION_TYPE_TOGGLE, CONF_ACTION_CODE: "toggle"}
+                ],
+            },
+        )
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    async def turn_on_heater(event: Event) -> None:
+        if event.data["entity_id"] == "switch.lamp_power":
+            await hass.services.async_call("switch", "turn_on", {"entity_id": "switch.heater_power"}, blocking=True)
+
+    hass.bus.async_listen(EVENT_COMMAND, turn_on_heater)
+    await hass.services.async_call("switch", "turn_on", {"entity_id": "switch.lamp_power"}, blocking=True)
+    await hass.async_block_till_done()
+
+    assert hass.states.get("switch.lamp_power").state == "on"
+    assert hass.states.get("switch.heater_power").state == "on"
+
+
+async def test_task_started_by_a_command_waits_for_its_lock(hass: HomeAssistant):
+    """Test that a task created during a device command does not run under that command's lock."""
+    async_mock_service(hass, "remote", "send_command")
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=3,
+        data={
+            "name": "Lamp",
+            CONF_BLASTER_ACTION: BLASTER_ACTION,
+            CONF_ACTIONS: [
+                {CONF_ACTION_NAME: "Power", CONF_ACTION_TYPE: ACTION_TYPE_TOGGLE, CONF_ACTION_CODE: "toggle"}
+            ],
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    switch = hass.data[DOMAIN][entry.entry_id].entities["switch.lamp_power"]
+
+    order: list[str] = []
+    release = asyncio.Event()
+    spawned: list[asyncio.Task[None]] = []
+
+    async def inner() -> None:
+        order.append("inner")
+
+    async def outer() -> None:
+        spawned.append(hass.async_create_task(switch.async_run_command(inner)))
+        await asyncio.sleep(0)
+        await release.wait()
+        order.append("outer")
+
+    command = hass.async_create_task(switch.async_run_command(outer))
+    await asyncio.sleep(0.01)
+    assert order == []
+
+    release.set()
+    await command
+    await spawned[0]
+    assert order == ["outer", "inner"]
+
+
+async def test_power_switch_state_lives_in_coordinator(hass: HomeAssistant):
+    """Test that the power switch of a generic device and the device state never disagree."""
+    async_mock_service(hass, "remote", "send_command")
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=3,
+        data={
+            "name": "TV",
+            CONF_DEVICE_TYPE: "other",
+            CONF_BLASTER_ACTION: BLASTER_ACTION,
+            CONF_ACTIONS: [
+                {
+                    CONF_ACTION_NAME: "Power",
+                    CONF_ACTION_TYPE: ACTION_TYPE_POWER,
+                    CONF_ACTION_CODE_ON: "on_code",
+                    CONF_ACTION_CODE_OFF: "off_code",
+                }
+            ],
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    for service, state, power in (("turn_on", "on", True), ("turn_off", "off", False)):
+        await hass.services.async_call("switch", service, {"entity_id": "switch.tv_power"}, blocking=True)
+        diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+        assert hass.states.get("switch.tv_power").state == state
+        assert diagnostics["device_state"]["power"] is power
@@ -0,0 +1,248 @@
+"""Concurrency stress tests for rewire.
+
+Many simulated automations drive an AC and a TV on one blaster at once. The
+frames that reach the simulated blaster are then replayed through a model of
+the physical devices, which must end up where RewIRe believes they are.
+"""
+import asyncio
+import random
+from collections import defaultdict
+from typing import Any, Awaitable, Callable
+from unittest.mock import patch
+
+from homeassistant.const import STATE_ON
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.rewire.const import (
+    ACTION_TYPE_BUTTON,
+    ACTION_TYPE_INC_DEC,
+    ACTION_TYPE_POWER,
+    ACTION_TYPE_SPEED,
+    ACTION_TYPE_TEMP,
+    ACTION_TYPE_TOGGLE,
+    CONF_ACTION_CODE,
+    CONF_ACTION_CODE_DEC,
+    CONF_ACTION_CODE_INC,
+    CONF_ACTION_NAME,
+    CONF_ACTION_TYPE,
+    CONF_ACTIONS,
+    CONF_BLASTER_ACTION,
+    CONF_DEVICE_TYPE,
+    CONF_MAX_SPEED,
+    CONF_MAX_TEMP,
+    CONF_MAX_VALUE,
+    CONF_MIN_SPEED,
+    CONF_MIN_TEMP,
+    CONF_MIN_VALUE,
+    CONF_POWER_OFF_CODE,
+    CONF_POWER_ON_CODE,
+    CONF_SPEED_DEC_CODE,
+    CONF_SPEED_INC_CODE,
+    CONF_TEMP_DEC_CODE,
+    CONF_TEMP_INC_CODE,
+    DEVICE_TYPE_AC,
+    DOMAIN,
+    TIMING_STORAGE_KEY,
+    TIMING_STORAGE_VERSION,
+)
+from custom_components.rewire.entity import RewireEntity
+
+from .fake_blaster import COLLIDED, FakeBlaster, uniform
+
+AUTOMATIONS = 6
+STEPS = 4
+
+AC_TARGET = "remote.ac"
+TV_TARGET = "remote.tv"
+
+
+def _blaster_action(target: str) -> list[dict[str, Any]]:
+    """Return a blaster action sending through one remote of the shared blaster."""
+    return [{"service": "remote.send_command", "target": {"entity_id": target}, "data": {"command": "IR_CODE"}}]
+
+
+async def _async_setup(hass: HomeAssistant, hass_storage: dict[str, Any]) -> dict[str, MockConfigEntry]:
+    """Set up an AC and a TV on one blaster with the smallest learned frame gap."""
+    hass_storage[TIMING_STORAGE_KEY] = {
+        "version": TIMING_STORAGE_VERSION,
+        "key": TIMING_STORAGE_KEY,
+        "data": {"blasters": {"blaster_1": 0.04}},
+    }
+    ac = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        data={
+            "name": "AC",
+            "blaster_device_id": "blaster_1",
+            CONF_DEVICE_TYPE: DEVICE_TYPE_AC,
+            CONF_BLASTER_ACTION: _blaster_action(AC_TARGET),
+            CONF_ACTIONS: [
+                {
+                    CONF_ACTION_NAME: "Power",
+                    CONF_ACTION_TYPE: ACTION_TYPE_POWER,
+                    CONF_POWER_ON_CODE: "ac_on",
+                    CONF_POWER_OFF_CODE: "ac_off",
+                },
+                {
+                    CONF_ACTION_NAME: "Temperature",
+                    CONF_ACTION_TYPE: ACTION_TYPE_TEMP,
+                    CONF_TEMP_INC_CODE: "temp_up",
+                    CONF_TEMP_DEC_CODE: "temp_down",
+                    CONF_MIN_TEMP: 16,
+                    CONF_MAX_TEMP: 30,
+                },
+                {
+                    CONF_ACTION_NAME: "Fan",
+                    CONF_ACTION_TYPE: ACTION_TYPE_SPEED,
+                    CONF_SPEED_INC_CODE: "fan_up",
+                    CONF_SPEED_DEC_CODE: "fan_down",
+                    CONF_MIN_SPEED: 1,
+                    CONF_MAX_SPEED: 3,
+                },
+            ],
+        },
+    )
+    tv = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        data={
+            "name": "TV",
+            "blaster_device_id": "blaster_1",
+            CONF_BLASTER_ACTION: _blaster_action(TV_TARGET),
+            CONF_ACTIONS: [
+                {CONF_ACTION_NAME: "Power", CONF_ACTION_TYPE: ACTION_TYPE_TOGGLE, CONF_ACTION_CODE: "tv_power"},
+                {
+                    CONF_ACTION_NAME: "Volume",
+                    CONF_ACTION_TYPE: ACTION_TYPE_INC_DEC,
+                    CONF_ACTION_CODE_INC: "vol_up",
+                    CONF_ACTION_CODE_DEC: "vol_down",
+                    CONF_MIN_VALUE: 0,
+                    CONF_MAX_VALUE: 20,
+                },
+                {CONF_ACTION_NAME: "Mute", CONF_ACTION_TYPE: ACTION_TYPE_BUTTON, CONF_ACTION_CODE: "tv_mute"},
+            ],
+        },
+    )
+    for entry in (ac, tv):
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return {AC_TARGET: ac, TV_TARGET: tv}
+
+
+def _random_call(hass: HomeAssistant, rng: random.Random) -> Callable[[], Awaitable[Any]]:
+    """Return one random user or automation action."""
+
+    def call(domain: str, service: str, **data: Any) -> Callable[[], Awaitable[Any]]:
+        async def run() -> None:
+            try:
+                await hass.services.async_call(domain, service, data, blocking=True)
+            except HomeAssistantError:
+                # E.g. a temperature while the AC is off; automations carry on
+                pass
+
+        return run
+
+    choices = [
+        call("climate", "turn_on", entity_id="climate.ac"),
+        call("climate", "turn_off", entity_id="climate.ac"),
+        call("climate", "set_temperature", entity_id="climate.ac", temperature=rng.randint(16, 30)),
+        call("climate", "set_fan_mode", entity_id="climate.ac", fan_mode=str(rng.randint(1, 3))),
+        call("switch", "toggle", entity_id="switch.tv_power"),
+        call("number", "set_value", entity_id="number.tv_volume", value=rng.randint(0, 20)),
+        call("button", "press", entity_id="button.tv_mute"),
+    ]
+    return rng.choice(choices)
+
+
+async def _async_run_automation(hass: HomeAssistant, seed: int) -> None:
+    """Run one automation: random calls, sometimes a burst of slider moves."""
+    rng = random.Random(seed)
+    for _ in range(STEPS):
+        if rng.random() < 0.2:
+            # Dragging a slider fires several values without waiting
+            values = [rng.randint(0, 20) for _ in range(3)]
+            await asyncio.gather(
+                *(
+                    hass.services.async_call(
+                        "number", "set_value", {"entity_id": "number.tv_volume", "value": value}, blocking=True
+                    )
+                    for value in values
+                )
+            )
+        else:
+            await _random_call(hass, rng)()
+        await asyncio.sleep(rng.uniform(0, 0.01))
+
+
+def _replay(codes: list[str]) -> dict[str, Any]:
+    """Return the physical state of the AC and TV after receiving codes, in order."""
+    state = {"ac_power": False, "temperature": 16, "speed": 1, "tv_power": False, "volume": 10, "muted": False}
+    for code in codes:
+        if code in ("ac_on", "ac_off"):
+            state["ac_power"] = code == "ac_on"
+        elif code in ("temp_up", "temp_down"):
+            state["temperature"] = max(16, min(30, state["temperature"] + (1 if code == "temp_up" else -1)))
+        elif code in ("fan_up", "fan_down"):
+            state["speed"] = max(1, min(3, state["speed"] + (1 if code == "fan_up" else -1)))
+        elif code == "tv_power":
+            state["tv_power"] = not state["tv_power"]
+        elif code in ("vol_up", "vol_down"):
+            state["volume"] = max(0, min(20, state["volume"] + (1 if code == "vol_up" else -1)))
+        elif code == "tv_mute":
+            state["muted"] = not state["muted"]
+    return state
+
+
+async def _async_stress(
+    hass: HomeAssistant, hass_storage: dict[str, Any], blaster: FakeBlaster
+) -> tuple[dict[str, MockConfigEntry], dict[str, list[str]]]:
+    """Run the automations and return the entries and the codes RewIRe sent per device."""
+    blaster.async_register()
+    entries = await _async_setup(hass, hass_storage)
+    targets = {entry.entry_id: target for target, entry in entries.items()}
+
+    # Codes the integration considers delivered, per device, in completion order
+    sent: dict[str, list[str]] = defaultdict(list)
+    transmit = RewireEntity._async_transmit
+
+    async def recording_transmit(self: RewireEntity, code: str, repeats: int, delay: float) -> bool:
+        success = await transmit(self, code, repeats, delay)
+        if success:
+            sent[targets[self.coordinator.config_entry.entry_id]].extend([code] * repeats)
+        return success
+
+    with patch.object(RewireEntity, "_async_transmit", recording_transmit):
+        await asyncio.gather(*(_async_run_automation(hass, seed) for seed in range(AUTOMATIONS)))
+        await hass.async_block_till_done()
+    return entries, sent
+
+
+async def test_concurrent_automations_keep_devices_in_sync(hass: HomeAssistant, hass_storage: dict[str, Any]):
+    """Test that no command is lost or reordered and the assumed state matches the devices."""
+    blaster = FakeBlaster(hass, latency=uniform(0.0, 0.01), min_gap=0.03)
+    entries, sent = await _async_stress(hass, hass_storage, blaster)
+
+    assert blaster.count(COLLIDED) == 0
+    for target in (AC_TARGET, TV_TARGET):
+        # Nothing lost, nothing reordered within a device
+        assert blaster.received_by(target) == sent[target]
+
+    physical = _replay(blaster.received)
+    ac_state = hass.data[DOMAIN][entries[AC_TARGET].entry_id].device_state
+    assert ac_state["power"] == physical["ac_power"]
+    assert ac_state["temperature"] == physical["temperature"]
+    assert ac_state["speed"] == physical["speed"]
+    assert (hass.states.get("switch.tv_power").state == STATE_ON) == physical["tv_power"]
+    assert float(hass.states.get("number.tv_volume").state) == physical["volume"]
+
+
+async def test_lost_frames_are_detected(hass: HomeAssistant, hass_storage: dict[str, Any]):
+    """Test that the harness notices frames the device never received."""
+    blaster = FakeBlaster(hass, drop_rate=0.3)
+    _, sent = await _async_stress(hass, hass_storage, blaster)
+
+    received = len(blaster.received_by(AC_TARGET)) + len(blaster.received_by(TV_TARGET))
+    assert received < len(sent[AC_TARGET]) + len(sent[TV_TARGET])
@@ -0,0 +1,65 @@
+"""Test rewire redundant-command suppression."""
+import asyncio
+from typing import Callable
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import async_mock_service
+
+from custom_components.rewire.const import (
+    ACTION_TYPE_POWER,
+    CONF_ACTION_CODE_OFF,
+    CONF_ACTION_CODE_ON,
+    CONF_ACTION_NAME,
+    CONF_ACTION_TYPE,
+    CONF_DEDUP_WINDOW,
+    CONF_SUPPRESS_REDUNDANT,
+)
+from custom_components.rewire.switch import RewireSwitch
+
+ACTION = {
+    CONF_ACTION_NAME: "Power",
+    CONF_ACTION_TYPE: ACTION_TYPE_POWER,
+    CONF_ACTION_CODE_ON: "on_code",
+    CONF_ACTION_CODE_OFF: "off_code",
+}
+
+
+async def test_redundant_command_is_suppressed(hass: HomeAssistant, make_switch: Callable[..., RewireSwitch]):
+    """Test that a discrete code matching the known state is not sent."""
+    calls = async_mock_service(hass, "remote", "send_command")
+    switch = make_switch(action=ACTION, options={CONF_SUPPRESS_REDUNDANT: True})
+
+    await switch.async_turn_on()
+    await switch.async_turn_on()
+    await switch.async_turn_off()
+
+    assert [call.data["command"] for call in calls] == [["on_code"], ["off_code"]]
+    assert switch.coordinator.suppressed == {"redundant": 1, "deduplicated": 0}
+
+
+async def test_redundant_command_sent_by_default(hass: HomeAssistant, make_switch: Callable[..., RewireSwitch]):
+    """Test that suppression is opt-in."""
+    calls = async_mock_service(hass, "remote", "send_command")
+    switch = make_switch(action=ACTION)
+
+    await switch.async_turn_on()
+    await switch.async_turn_on()
+
+    assert len(calls) == 2
+
+
+async def test_back_to_back_commands_are_deduplicated(hass: HomeAssistant, make_switch: Callable[..., RewireSwitch]):
+    """Test that identical concurrent commands within the window are sent once."""
+    calls = async_mock_service(hass, "remote", "send_command")
+    first = make_switch(action=ACTION, options={CONF_DEDUP_WINDOW: 2.0})
+    second = make_switch(action=ACTION, entity_id="switch.test_device_power_2", coordinator=first.coordinator)
+
+    await asyncio.gather(first.async_turn_on(), second.async_turn_on())
+    assert len(calls) == 1
+    assert first.is_on and second.is_on
+
+    # A different code in between ends the window for the first one
+    await first.async_turn_off()
+    await first.async_turn_on()
+    assert [call.data["command"] for call in calls] == [["on_code"], ["off_code"], ["on_code"]]
+    assert first.coordinator.suppressed == {"redundant": 0, "deduplicated": 1}
@@ -0,0 +1,61 @@
+"""Test rewire learned send timing."""
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.rewire.const import (
+    DEFAULT_FRAME_GAP,
+    DOMAIN,
+    FRAME_GAP_DECREASE_AFTER,
+    FRAME_GAP_STEP,
+    TIMING_STORAGE_KEY,
+    TIMING_STORAGE_VERSION,
+)
+from custom_components.rewire.coordinator import RewireCoordinator
+from custom_components.rewire.timing import AdaptiveTiming
+
+
+async def test_frame_gap_adapts(hass: HomeAssistant):
+    """Test that failures widen the frame gap and clean runs tighten it."""
+    timing = AdaptiveTiming(hass)
+    assert timing.frame_gap("blaster_1") == DEFAULT_FRAME_GAP
+
+    timing.async_record_frame("blaster_1", False)
+    assert timing.frame_gap("blaster_1") == DEFAULT_FRAME_GAP * 2
+
+    for _ in range(FRAME_GAP_DECREASE_AFTER):
+        timing.async_record_frame("blaster_1", True)
+    assert timing.frame_gap("blaster_1") == round(DEFAULT_FRAME_GAP * 2 - FRAME_GAP_STEP, 3)
+    assert timing.frame_gap("blaster_2") == DEFAULT_FRAME_GAP
+
+
+async def test_timing_is_loaded(hass: HomeAssistant, hass_storage: dict[str, Any]):
+    """Test that learned values survive a restart."""
+    hass_storage[TIMING_STORAGE_KEY] = {
+        "version": TIMING_STORAGE_VERSION,
+        "key": TIMING_STORAGE_KEY,
+        "data": {"blasters": {"blaster_1": 0.05}, "devices": {"entry_1": 2}},
+    }
+    timing = AdaptiveTiming(hass)
+    await timing.async_load()
+
+    assert timing.frame_gap("blaster_1") == 0.05
+    assert timing.code_repeats("entry_1") == 2
+    assert timing.code_repeats("entry_2") == 1
+
+
+async def test_feedback_contradiction_counts_as_lost_frame(hass: HomeAssistant):
+    """Test that a sensor contradicting a fresh command raises the repeats."""
+    config_entry = MockConfigEntry(domain=DOMAIN, data={"name": "Fan", "blaster_device_id": "blaster_1"})
+    coordinator = RewireCoordinator(hass, config_entry)
+    device = config_entry.entry_id
+
+    coordinator.set_device_state({"power": True})
+    coordinator.apply_feedback("power", False)
+    assert coordinator.timing.code_repeats(device) == 2
+    assert coordinator.timing.frame_gap("blaster_1") == DEFAULT_FRAME_GAP * 2
+
+    # Only the first report after a command is judged
+    coordinator.apply_feedback("power", True)
+    assert coordinator.timing.code_repeats(device) == 2
@@ -0,0 +1,51 @@
+"""Test rewire command tracing."""
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_capture_events, async_mock_service
+
+from custom_components.rewire.button import RewireButton
+from custom_components.rewire.const import (
+    CONF_ACTIONS,
+    CONF_BLASTER_ACTION,
+    DOMAIN,
+    EVENT_COMMAND,
+)
+from custom_components.rewire.coordinator import RewireCoordinator
+
+
+async def test_press_records_span(hass: HomeAssistant):
+    """Test that a button press produces a completed span and event."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "name": "Test Device",
+            CONF_BLASTER_ACTION: [
+                {
+                    "service": "remote.send_command",
+                    "data": {"device_id": "blaster_device_id", "command": "IR_CODE"},
+                }
+            ],
+            CONF_ACTIONS: [],
+        },
+    )
+    coordinator = RewireCoordinator(hass, config_entry)
+    button = RewireButton(coordinator, config_entry.entry_id, {"name": "Power", "ir_code": "code_on"})
+    button.hass = hass
+    button.entity_id = "button.test_device_power"
+
+    calls = async_mock_service(hass, "remote", "send_command")
+    events = async_capture_events(hass, EVENT_COMMAND)
+    await button.async_press()
+    await hass.async_block_till_done()
+
+    assert calls[0].data["command"] == ["code_on"]
+
+    traces = coordinator.tracer.export()
+    assert len(traces) == 1
+    span = traces[0]
+    assert span["entity_id"] == "button.test_device_power"
+    assert span["call"] == "async_press"
+    assert span["success"] is True
+    assert 0 <= span["build_ms"] <= span["dispatch_ms"] <= span["total_ms"]
+
+    assert len(events) == 1
+    assert events[0].data["trace_id"] == span["trace_id"]
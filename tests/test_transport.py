@@ -0,0 +1,113 @@
+"""Test rewire blaster transports."""
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from homeassistant.core import Context, HomeAssistant
+from homeassistant.helpers.entity_component import DATA_INSTANCES
+from pytest_homeassistant_custom_component.common import async_mock_service
+
+from custom_components.rewire.transport import (
+    EntityTransport,
+    MqttTransport,
+    RemoteTransport,
+    Transport,
+    async_build_transports,
+)
+
+REMOTE_ACTION = {
+    "service": "remote.send_command",
+    "target": {"entity_id": "remote.blaster"},
+    "data": {"command": "IR_CODE", "num_repeats": 2},
+}
+
+
+class FakeRemote:
+    """Remote entity recording the commands it was asked to send."""
+
+    available = True
+
+    def __init__(self) -> None:
+        """Initialize the fake remote."""
+        self.sent: list[tuple[list[str], dict[str, Any]]] = []
+        self.context = None
+
+    def async_set_context(self, context: Context) -> None:
+        """Record the context."""
+        self.context = context
+
+    async def async_send_command(self, command: list[str], **kwargs: Any) -> None:
+        """Record a command."""
+        self.sent.append((command, kwargs))
+
+
+class FakeComponent:
+    """Entity component holding fake entities."""
+
+    def __init__(self, entities: dict[str, Any]) -> None:
+        """Initialize the fake component."""
+        self._entities = entities
+
+    def get_entity(self, entity_id: str) -> Any:
+        """Return an entity by id."""
+        return self._entities.get(entity_id)
+
+
+async def test_remote_transport_calls_entity(hass: HomeAssistant):
+    """Test that remote.send_command targets call the entity directly."""
+    calls = async_mock_service(hass, "remote", "send_command")
+    remote = FakeRemote()
+    hass.data.setdefault(DATA_INSTANCES, {})["remote"] = FakeComponent({"remote.blaster": remote})
+
+    (transport,) = async_build_transports(hass, [REMOTE_ACTION], "Test")
+    assert isinstance(transport, RemoteTransport)
+
+    context = Context()
+    await transport.async_send("code_1", context)
+
+    assert not calls
+    assert remote.sent == [(["code_1"], {"num_repeats": 2, "hold_secs": 0})]
+    assert remote.context is context
+
+
+async def test_remote_transport_falls_back_while_not_loaded(hass: HomeAssistant):
+    """Test that the service path is used while the remote entity is not loaded."""
+    calls = async_mock_service(hass, "remote", "send_command")
+
+    (transport,) = async_build_transports(hass, [REMOTE_ACTION], "Test")
+    await transport.async_send("code_1", None)
+
+    assert len(calls) == 1
+    assert calls[0].data["command"] == ["code_1"]
+
+
+async def test_mqtt_transport(hass: HomeAssistant):
+    """Test that mqtt.publish actions with a fixed topic publish directly."""
+    action = {"service": "mqtt.publish", "data": {"topic": "ir/send", "payload": "IR_CODE"}}
+    (transport,) = async_build_transports(hass, [action], "Test")
+    assert isinstance(transport, MqttTransport)
+
+    with patch("homeassistant.components.mqtt.async_publish") as publish:
+        await transport.async_send("code_1", None)
+    publish.assert_called_once_with(hass, "ir/send", "code_1", 0, False)
+
+
+async def test_unknown_shapes_use_service_path(hass: HomeAssistant):
+    """Test that templates the adapters cannot validate use the generic path."""
+    actions = [
+        {"service": "mqtt.publish", "data": {"topic_template": "ir/{{ 1 }}", "payload": "IR_CODE"}},
+        {"service": "remote.send_command", "target": {"area_id": "living_room"}, "data": {"command": "IR_CODE"}},
+        {"service": "script.blast", "data": {"code": "IR_CODE"}},
+    ]
+    transports = async_build_transports(hass, actions, "Test")
+    assert [type(transport) for transport in transports] == [Transport, Transport, Transport]
+
+
+async def test_entity_transport_needs_send_entity(hass: HomeAssistant):
+    """Test that an entity transport without its per-entity send cannot be built."""
+
+    class IncompleteTransport(EntityTransport):
+        """Entity transport that forgot to send."""
+
+    with pytest.raises(TypeError):
+        IncompleteTransport(hass, REMOTE_ACTION, "Test", "remote", ["remote.blaster"])